@@ -0,0 +1,144 @@
+"""
+Cold-start benchmark: fresh interpreter -> first complete render of each page.
+
+Supabase is replaced by a local HTTP endpoint that answers every request with an empty result
+after a fixed delay, so the numbers show how much of a cold start waits on the network. For
+every page two fresh processes are measured:
+
+  - import:     importing the page module (plus streamlit_app's own imports); the number of
+                Supabase requests made here should be 0.
+  - first run:  a complete first run of streamlit_app.py with that page selected (AppTest),
+                including imports, client creation and the page's own queries.
+
+Run from the project root:
+
+    python benchmarks/cold_start.py [--latency 0.5]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import subprocess
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, PROJECT_ROOT)
+from config.constants import HOME, HR_PORTAL, APPLICANT_PORTAL, DASHBOARD, DATA_VISUALIZATION  # noqa: E402
+
+PAGE_MODULES = {
+    HOME: "app",
+    HR_PORTAL: "hide_sidebar.pages.hr_page",
+    APPLICANT_PORTAL: "hide_sidebar.pages.applicant_page",
+    DASHBOARD: "hide_sidebar.pages.dashboard",
+    DATA_VISUALIZATION: "hide_sidebar.pages.data_visualization_page",
+}
+
+HEAVY_MODULES = ["tensorflow", "torch", "transformers", "google.generativeai", "sklearn", "supabase"]
+
+_IMPORT_PROBE = """
+import sys, time, json, importlib
+start = time.perf_counter()
+import streamlit, ui.theme, config.constants
+importlib.import_module({module!r})
+print("__REPORT__" + json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "backends": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+_RUN_PROBE = """
+import sys, time, json
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app_test = AppTest.from_file("streamlit_app.py", default_timeout=120)
+app_test.session_state["selected_page"] = {page!r}
+app_test.run()
+print("__REPORT__" + json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "exceptions": len(app_test.exception),
+    "backends": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+class _SlowSupabase(BaseHTTPRequestHandler):
+    """Answers every PostgREST call with an empty result after `latency` seconds."""
+    latency = 0.5
+    request_count = 0
+    lock = threading.Lock()
+
+    def _reply(self):
+        with self.lock:
+            type(self).request_count += 1
+        time.sleep(self.latency)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        body = b"[]"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Range", "*/0")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PATCH = do_DELETE = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+def _run_probe(code: str, env: dict) -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJECT_ROOT, env=env, capture_output=True, text=True
+    )
+    for line in completed.stdout.splitlines():
+        if line.startswith("__REPORT__"):
+            return json.loads(line[len("__REPORT__"):])
+    return {"error": (completed.stderr.strip().splitlines() or ["no output"])[-1]}
+
+
+def _measure(code: str, env: dict) -> dict:
+    before = _SlowSupabase.request_count
+    report = _run_probe(code, env)
+    report["requests"] = _SlowSupabase.request_count - before
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold start to first render for each page.")
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated Supabase latency per request (s).")
+    args = parser.parse_args(argv)
+
+    _SlowSupabase.latency = args.latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SlowSupabase)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    env = dict(os.environ)
+    env["SUPABASE_URL"] = f"http://127.0.0.1:{server.server_port}"
+    env["SUPABASE_KEY"] = env.get("SUPABASE_KEY") or "eyJhbGciOiJIUzI1NiJ9.e30.benchmark"
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")]))
+    env.pop("INFERENCE_SERVER_ADDRESS", None)
+
+    print(f"Simulated Supabase latency: {args.latency:.2f}s per request\n")
+    print(f"{'Page':<24} {'Import (s)':>10} {'Reqs':>5}   {'First run (s)':>13} {'Reqs':>5}  Backends loaded on first run")
+    print("-" * 110)
+    try:
+        for page, module in PAGE_MODULES.items():
+            imported = _measure(_IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES), env)
+            first_run = _measure(_RUN_PROBE.format(page=page, heavy=HEAVY_MODULES), env)
+            if "error" in imported or "error" in first_run:
+                print(f"{page:<24} failed: {imported.get('error') or first_run.get('error')}")
+                continue
+            backends = ", ".join(first_run["backends"]) or "-"
+            print(f"{page:<24} {imported['seconds']:>10.2f} {imported['requests']:>5}   "
+                  f"{first_run['seconds']:>13.2f} {first_run['requests']:>5}  {backends}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Gemini bulk-screening benchmark: one request per resume vs. packed multi-resume requests.
+
+Screens the same resumes against one job both ways and reports requests, prompt/output tokens
+(from Gemini's usage metadata) and wall time per screened resume. Calls the live Gemini API,
+so it needs GEMINI_API_KEY and spends quota. Run from the project root:
+
+    python benchmarks/gemini_batching.py [--resumes 20]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.settings import setup_gemini  # noqa: E402
+from models import gemini_model  # noqa: E402
+from models.calibrate_runtime import sample_pairs  # noqa: E402
+
+
+def _count_usage(model_instance, usage):
+    """Wraps generate_content on this model instance to add up requests and reported tokens."""
+    generate_content = model_instance.generate_content
+
+    def counted(*args, **kwargs):
+        response = generate_content(*args, **kwargs)
+        metadata = getattr(response, "usage_metadata", None)
+        usage["requests"] += 1
+        usage["prompt_tokens"] += int(getattr(metadata, "prompt_token_count", 0) or 0)
+        usage["output_tokens"] += int(getattr(metadata, "candidates_token_count", 0) or 0)
+        return response
+    model_instance.generate_content = counted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare per-resume and packed Gemini screening.")
+    parser.add_argument("--resumes", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if not gemini_model.is_gemini_available():
+        print("Gemini is not available; set GEMINI_API_KEY and install google-generativeai first.")
+        return 1
+    pairs = sample_pairs(args.resumes, seed=0)
+    resume_texts = [resume_text for resume_text, _ in pairs]
+    job = {"Job Title": "Software Engineer", "Job Description": pairs[0][1], "Skills Required": "python, sql, docker"}
+
+    usage = {"requests": 0, "prompt_tokens": 0, "output_tokens": 0}
+    _count_usage(setup_gemini(), usage)
+
+    results = {}
+    for label in ("per-resume", "packed"):
+        before = dict(usage)
+        start = time.perf_counter()
+        if label == "per-resume":
+            analyses = [gemini_model.analyze_resume_with_gemini(text, job) for text in resume_texts]
+        else:
+            analyses = gemini_model.analyze_resumes_with_gemini_batch(resume_texts, job)
+        elapsed = time.perf_counter() - start
+        spent = {key: usage[key] - before[key] for key in usage}
+        failed = sum(1 for analysis in analyses if "error" in analysis)
+        results[label] = (elapsed, spent, failed)
+
+    print(f"\n{len(resume_texts)} resumes against one job")
+    print(f"{'Mode':<11} {'Requests':>8} {'Prompt tok/resume':>18} {'Output tok/resume':>18} {'s/resume':>9} {'Failed':>7}")
+    for label, (elapsed, spent, failed) in results.items():
+        print(f"{label:<11} {spent['requests']:>8} {spent['prompt_tokens'] / len(resume_texts):>18.0f} "
+              f"{spent['output_tokens'] / len(resume_texts):>18.0f} {elapsed / len(resume_texts):>9.2f} {failed:>7}")
+    single_tokens = results["per-resume"][1]["prompt_tokens"]
+    packed_tokens = results["packed"][1]["prompt_tokens"]
+    if packed_tokens:
+        print(f"\nPrompt tokens: {single_tokens / packed_tokens:.1f}x fewer; "
+              f"wall time: {results['per-resume'][0] / results['packed'][0]:.1f}x faster")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+LSTM tokenization benchmark: Keras texts_to_sequences + pad_sequences vs. FastLSTMTokenizer.
+
+Uses outputs/lstm_tokenizer.json when present. Otherwise it fits a Keras tokenizer on the bundled
+job dataset with the notebook's settings (num_words=20000, oov_token="<unk>"). It checks that both
+paths produce identical sequences and padded batches, then times them. Needs the Keras
+preprocessing module (TensorFlow, or the standalone keras-preprocessing package) for the reference.
+Run from the project root:
+
+    python benchmarks/lstm_tokenizer.py [--texts 2000] [--repeat 5]
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.custom_model_predictor import LSTM_TOKENIZER_PATH, MAX_SEQUENCE_LENGTH_RESUME_LSTM  # noqa: E402
+from models.lstm_tokenizer import FastLSTMTokenizer  # noqa: E402
+from models.calibrate_runtime import JOB_DATASET_PATH  # noqa: E402
+
+
+def _keras_text_module():
+    try:
+        from tensorflow.keras.preprocessing import text, sequence
+        return text, sequence
+    except ImportError:
+        from keras_preprocessing import text, sequence
+        return text, sequence
+
+
+def benchmark_texts(n_texts, seed=0):
+    """Job descriptions plus synthetic resumes with punctuation, casing and out-of-vocabulary noise."""
+    rng = np.random.default_rng(seed)
+    jobs = pd.read_csv(JOB_DATASET_PATH).fillna("")
+    pool = (jobs["Job Title"] + ". " + jobs["Job Description"] + "\nSkills: " + jobs["Skills Required"]).tolist()
+    texts = []
+    for _ in range(n_texts):
+        parts = [pool[i] for i in rng.integers(0, len(pool), size=rng.integers(1, 6))]
+        texts.append(" ".join(parts).replace("Python", "PYTHON/py3.11").replace("team", "team—Zürich"))
+    return texts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare Keras and vectorized LSTM tokenization.")
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    keras_text, keras_sequence = _keras_text_module()
+    texts = benchmark_texts(args.texts)
+    if os.path.exists(LSTM_TOKENIZER_PATH):
+        with open(LSTM_TOKENIZER_PATH, encoding="utf-8") as f:
+            tokenizer_json = f.read()
+    else:
+        print(f"{LSTM_TOKENIZER_PATH} not found; fitting a tokenizer on the job dataset instead.")
+        fitted = keras_text.Tokenizer(num_words=20000, oov_token="<unk>")
+        fitted.fit_on_texts(texts[: len(texts) // 2])  # the other half has unseen words
+        tokenizer_json = fitted.to_json()
+
+    keras_tokenizer = keras_text.tokenizer_from_json(tokenizer_json)
+    fast_tokenizer = FastLSTMTokenizer.from_json(tokenizer_json)
+    maxlen = MAX_SEQUENCE_LENGTH_RESUME_LSTM
+
+    def keras_path():
+        return keras_sequence.pad_sequences(keras_tokenizer.texts_to_sequences(texts), maxlen=maxlen,
+                                            padding="post", truncating="post")
+
+    buffer = np.zeros((len(texts), maxlen), dtype=np.int32)
+
+    def fast_path():
+        return fast_tokenizer.texts_to_padded(texts, maxlen, out=buffer)
+
+    identical_sequences = keras_tokenizer.texts_to_sequences(texts) == fast_tokenizer.texts_to_sequences(texts)
+    identical_padded = np.array_equal(keras_path(), fast_path())
+    print(f"Token-for-token identical: sequences={identical_sequences}, padded={identical_padded}")
+
+    timings = {}
+    for label, fn in (("keras", keras_path), ("fast", fast_path)):
+        runs = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            fn()
+            runs.append(time.perf_counter() - start)
+        timings[label] = min(runs)
+    n_words = sum(len(seq) for seq in fast_tokenizer.texts_to_sequences(texts))
+    print(f"{len(texts)} texts, {n_words} tokens, maxlen {maxlen}")
+    for label, seconds in timings.items():
+        print(f"  {label:<6} {seconds * 1000:9.1f} ms  ({len(texts) / seconds:,.0f} texts/s)")
+    print(f"Speedup: {timings['keras'] / timings['fast']:.1f}x")
+    return 0 if identical_sequences and identical_padded else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Rule-based scoring benchmark: per-pair _fallback_result vs. the skill bitset index.
+
+Scores a handful of resumes against 10k and 100k jobs. The jobs are drawn from the bundled job
+dataset, with extra synthetic skills so the vocabulary is catalog-sized. It checks that the
+bitset index gives results identical to rule_based_match, then reports the per-resume time of:
+the per-pair loop, the vectorized scores alone, and the vectorized scores plus full result dicts.
+Index build time is reported separately because the index is reused while the jobs are unchanged.
+Run from the project root:
+
+    python benchmarks/rule_based_scoring.py [--jobs 10000 100000] [--resumes 5]
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.matcher import rule_based_match  # noqa: E402
+from services.job_normalizer import normalize_jobs  # noqa: E402
+from services.skill_bitset import JobSkillIndex  # noqa: E402
+from models.calibrate_runtime import JOB_DATASET_PATH  # noqa: E402
+
+SYNTHETIC_SKILLS = 2000
+
+
+def synthetic_jobs(n_jobs, seed=0):
+    """Normalized job dicts: dataset rows with their skills plus a few catalog-wide synthetic skills."""
+    rng = np.random.default_rng(seed)
+    base = normalize_jobs(pd.read_csv(JOB_DATASET_PATH)).to_dict("records")
+    extra_skills = [f"skill-{i}" for i in range(SYNTHETIC_SKILLS)]
+    jobs = []
+    for row in rng.integers(0, len(base), size=n_jobs):
+        job = dict(base[row])
+        job["skills"] = list(job["skills"]) + list(rng.choice(extra_skills, size=rng.integers(0, 6), replace=False))
+        job["experience_min_years"] = int(rng.integers(0, 9))
+        jobs.append(job)
+    return jobs
+
+
+def synthetic_resumes(jobs, n_resumes, seed=1):
+    rng = np.random.default_rng(seed)
+    vocabulary = sorted({skill for job in jobs[:5000] for skill in job["skills"]})
+    return [{"skills": list(rng.choice(vocabulary, size=25, replace=False)),
+             "years_experience": int(rng.integers(0, 12))} for _ in range(n_resumes)]
+
+
+def _best_time(fn, repeat=3):
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return min(runs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare per-pair and bitset rule-based scoring.")
+    parser.add_argument("--jobs", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--resumes", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    all_identical = True
+    print(f"{'Jobs':>8} {'Build (s)':>10} {'Per-pair (ms)':>14} {'Bitset scores (ms)':>19} "
+          f"{'Bitset + dicts (ms)':>20} {'Speedup (scores)':>17} {'Identical':>10}")
+    for n_jobs in args.jobs:
+        jobs = synthetic_jobs(n_jobs)
+        resumes = synthetic_resumes(jobs, args.resumes)
+
+        start = time.perf_counter()
+        index = JobSkillIndex(jobs)
+        build_s = time.perf_counter() - start
+
+        identical = all(index.match_results(resume) == [rule_based_match(resume, job) for job in jobs]
+                        for resume in resumes[:2])
+        all_identical &= identical
+
+        per_pair = _best_time(lambda: [[rule_based_match(resume, job) for job in jobs] for resume in resumes], 1)
+        scores_only = _best_time(lambda: [index.score(resume) for resume in resumes])
+        with_dicts = _best_time(lambda: [index.match_results(resume) for resume in resumes], 1)
+
+        ms = [seconds / len(resumes) * 1000 for seconds in (per_pair, scores_only, with_dicts)]
+        print(f"{n_jobs:>8} {build_s:>10.2f} {ms[0]:>14.1f} {ms[1]:>19.2f} {ms[2]:>20.1f} "
+              f"{per_pair / scores_only:>16.0f}x {str(identical):>10}")
+    return 0 if all_identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
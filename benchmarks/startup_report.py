@@ -0,0 +1,91 @@
+"""
+Import-time and memory report for each startup configuration.
+
+Every configuration runs in a fresh interpreter, so module caches from one do not hide the
+cost of another. Reports wall time, resident memory (RSS) and which heavy backends ended up
+imported. Run from the project root:
+
+    python benchmarks/startup_report.py
+"""
+import os
+import sys
+import json
+import subprocess
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["tensorflow", "torch", "transformers", "google.generativeai"]
+
+# name -> (statements executed and timed in a fresh interpreter, extra environment)
+CONFIGURATIONS = {
+    "matcher, rule-based only": ("import services.matcher", {}),
+    "matcher + Gemini": (
+        "import services.matcher; from config.settings import setup_gemini", {}),
+    "matcher + LSTM": (
+        "import services.matcher; from models.custom_model_predictor import load_lstm_model_and_tokenizer; "
+        "load_lstm_model_and_tokenizer()", {}),
+    "matcher + Transformer": (
+        "import services.matcher; from models.custom_model_predictor import load_transformer_model_and_tokenizer; "
+        "load_transformer_model_and_tokenizer()", {}),
+    "matcher + all models": (
+        "import services.matcher; from config.settings import setup_gemini; "
+        "from models import custom_model_predictor as p; p.load_lstm_model_and_tokenizer(); "
+        "p.load_transformer_model_and_tokenizer()", {}),
+    "matcher via inference server": (
+        "import services.matcher", {"INFERENCE_SERVER_ADDRESS": "127.0.0.1:8765"}),
+    "all app pages": (
+        "from hide_sidebar.pages import hr_page, applicant_page, dashboard, data_visualization_page", {}),
+}
+
+_PROBE = """
+import sys, time, json, resource
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024.0 * 1024.0) if sys.platform == "darwin" else maxrss / 1024.0
+baseline = rss_mb()
+start = time.perf_counter()
+{statements}
+elapsed = time.perf_counter() - start
+print("__REPORT__" + json.dumps({{
+    "seconds": elapsed,
+    "rss_mb": rss_mb(),
+    "baseline_rss_mb": baseline,
+    "backends": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def run_configuration(statements: str, extra_env: dict) -> dict:
+    env = dict(os.environ, **extra_env)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")]))
+    probe = _PROBE.format(statements=statements.replace("; ", "\n"), heavy=HEAVY_MODULES)
+    completed = subprocess.run(
+        [sys.executable, "-c", probe], cwd=PROJECT_ROOT, env=env, capture_output=True, text=True
+    )
+    for line in completed.stdout.splitlines():
+        if line.startswith("__REPORT__"):
+            return json.loads(line[len("__REPORT__"):])
+    return {"error": (completed.stderr.strip().splitlines() or ["no output"])[-1]}
+
+
+def main():
+    print(f"{'Configuration':<32} {'Import (s)':>10} {'RSS (MB)':>9}  Backends imported")
+    print("-" * 90)
+    for name, (statements, extra_env) in CONFIGURATIONS.items():
+        report = run_configuration(statements, extra_env)
+        if "error" in report:
+            print(f"{name:<32} {'failed':>10} {'':>9}  {report['error']}")
+            continue
+        backends = ", ".join(report["backends"]) or "-"
+        print(f"{name:<32} {report['seconds']:>10.2f} {report['rss_mb']:>9.0f}  {backends}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Transformer bulk-scoring benchmark: unsorted batches vs. length-bucketed batches.
+
+Builds (resume, job) pairs whose resume lengths vary widely, the way bulk screening does,
+and scores them both ways at the same batch size. Reports throughput, padding efficiency and
+the largest score difference from unbatched predict_with_transformer. Needs the Transformer
+model in outputs/. Run from the project root:
+
+    python benchmarks/transformer_batching.py [--pairs 256] [--batch-size 16]
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models import custom_model_predictor as predictor  # noqa: E402
+from models.calibrate_runtime import sample_pairs  # noqa: E402
+
+
+def varied_length_pairs(n_pairs, seed=0):
+    """Resumes from a few sentences up to several times the 512-token window."""
+    rng = np.random.default_rng(seed)
+    pairs = []
+    for resume_text, job_text in sample_pairs(n_pairs, seed=seed):
+        repeat = int(rng.choice([1, 1, 2, 4, 8]))
+        resume_text = " ".join([resume_text] * repeat)
+        pairs.append((resume_text[:int(len(resume_text) * rng.uniform(0.05, 1.0))], job_text))
+    return pairs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare unsorted and length-bucketed Transformer batching.")
+    parser.add_argument("--pairs", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--check", type=int, default=32, help="Pairs also scored one by one to compare scores.")
+    args = parser.parse_args(argv)
+
+    if not predictor.load_transformer_model_and_tokenizer():
+        print("Transformer model not available; place it in outputs/ first.")
+        return 1
+    pairs = varied_length_pairs(args.pairs)
+    predictor.predict_batch_with_transformer(pairs[:args.batch_size], batch_size=args.batch_size)  # warm-up
+
+    results = {}
+    for label, bucket in (("unsorted", False), ("bucketed", True)):
+        start = time.perf_counter()
+        scores = predictor.predict_batch_with_transformer(pairs, batch_size=args.batch_size, bucket_by_length=bucket)
+        elapsed = time.perf_counter() - start
+        results[label] = (np.asarray(scores, dtype=np.float64), elapsed, predictor.get_last_batch_stats())
+
+    reference = np.asarray([predictor.predict_with_transformer(*pair) for pair in pairs[:args.check]])
+
+    print(f"\n{len(pairs)} pairs, batch size {args.batch_size}")
+    print(f"{'Mode':<10} {'Time (s)':>9} {'Pairs/s':>9} {'Padding eff.':>13} {'Max |diff| vs single':>22}")
+    for label, (scores, elapsed, stats) in results.items():
+        max_diff = float(np.max(np.abs(scores[:args.check] - reference)))
+        print(f"{label:<10} {elapsed:>9.2f} {len(pairs) / elapsed:>9.1f} "
+              f"{stats['padding_efficiency']:>12.1%} {max_diff:>22.2e}")
+    speedup = results["unsorted"][1] / results["bucketed"][1]
+    print(f"\nBucketed speedup: {speedup:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Shared secret for the scoring API (python -m services.http_api). When set, every request except
+# /health and /ready must send it in the X-API-Key header.
+SCORING_API_KEY = os.getenv("SCORING_API_KEY")
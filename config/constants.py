@@ -36,4 +36,141 @@ COMMON_SKILLS = {
     "GitHub", "JIRA", "Trello", "Slack", "Zoom", "Microsoft Teams", "Notion", "Tailwind CSS", "Tailwind","TypeScript",
     "TailwindCSS", "Figma", "Sketch", "Adobe XD", "Canva", "Power BI", "Tableau", "Looker", "QlikView",
     "PowerPoint", "Word", "Excel", "Google Analytics", "Google Ads", "Facebook Ads", "Instagram Ads",
-}
\ No newline at end of file
+}
+
+# Space-Saving sketch capacity for the "Top Missing Skills" dashboard panel.
+# Each (day, model) sketch keeps at most this many counters, regardless of history size.
+MISSING_SKILLS_SKETCH_CAPACITY = 200
+
+# Rows fetched per request when loading the jobs table (PostgREST returns at most 1000 by default).
+JOBS_PAGE_SIZE = 1000
+
+# Precomputed data-visualization artifacts, keyed by the jobs dataset version.
+VIZ_CACHE_DIR = "cache/visualizations"
+VIZ_CACHE_KEEP_VERSIONS = 2
+
+# Sparse TF-IDF candidate retrieval index over job postings.
+RETRIEVAL_INDEX_PATH = "cache/retrieval_index.npz"
+RETRIEVAL_HASH_FEATURES = 2 ** 20
+
+# Cascade matching: rule-based prefilter -> LSTM rerank -> Transformer/Gemini on the shortlist.
+CASCADE_PREFILTER_MIN_SCORE = 30   # Pairs scoring below this (rule-based, 0-100) are pruned
+CASCADE_PREFILTER_KEEP = 50        # At most this many pairs go on to the LSTM
+CASCADE_FINAL_K = 10               # At most this many pairs reach the expensive final model
+
+# Bi-encoder mode: job embeddings from the fine-tuned DistilBERT encoder, memory-mapped at startup.
+JOB_EMBEDDINGS_DIR = "cache/job_embeddings"
+EMBEDDING_BATCH_SIZE = 16
+EMBEDDING_ANN_MIN_JOBS = 20000   # Use the approximate (IVF) index by default above this many jobs
+EMBEDDING_ANN_N_PROBE = 8        # Number of IVF lists scanned per approximate query
+
+# Out-of-process inference service (python -m models.inference_server).
+INFERENCE_SERVER_HOST = "127.0.0.1"
+INFERENCE_SERVER_PORT = 8765
+INFERENCE_WORKERS = 2               # Worker processes, each owning its own copy of the models
+INFERENCE_WORKER_THREADS = None     # Intra-op threads per worker; None uses the model runtime profile
+INFERENCE_MAX_PENDING = 8           # Requests running or queued before new ones are rejected as busy
+INFERENCE_QUEUE_TIMEOUT_S = 2       # How long a request waits for a free slot before "busy"
+INFERENCE_REQUEST_TIMEOUT_S = 60
+
+# Model runtime settings (thread pools, batch sizes). Overridden by the calibrated profile
+# (python -m models.calibrate_runtime), which is in turn overridden by MODEL_* environment variables.
+MODEL_RUNTIME_PROFILE_PATH = "cache/model_runtime_profile.json"
+DEFAULT_INTER_OP_THREADS = 1
+DEFAULT_TORCH_INFERENCE_MODE = True
+DEFAULT_LSTM_BATCH_SIZE = 32
+DEFAULT_TRANSFORMER_BATCH_SIZE = 8
+
+# Transformer scoring of long inputs. "truncate" scores "resume [SEP] job" cut at 512 tokens (as
+# trained); "windowed" slides overlapping resume chunks past a fixed job-text budget and pools them.
+TRANSFORMER_SCORING_MODE = "truncate"
+WINDOW_JOB_TOKEN_BUDGET = 160      # Job-text tokens kept in every window
+WINDOW_OVERLAP_TOKENS = 64         # Resume tokens shared by consecutive windows
+WINDOW_POOLING = "max"             # "max", "mean" or "softmax" (score-weighted mean)
+
+# Compare-all-models mode: every model scores the same parsed resume concurrently
+COMPARE_MODEL_TIMEOUTS_S = {       # Per-model budget, counted from when that model starts running
+    MODEL_RULE_BASED: 5,
+    MODEL_LSTM_CUSTOM: 30,
+    MODEL_TRANSFORMER_CUSTOM: 60,
+    MODEL_GEMINI_PRO: 45,
+}
+COMPARE_QUEUED_POLL_S = 0.1        # How often a comparison checks whether its queued models have started
+COMPARE_MAX_QUEUED_S = 30          # A model still waiting for a pool thread this long after submission times out
+
+# Latency-budgeted matching (match_resume_to_job(..., deadline_ms=...)): a model that misses its
+# SLO is replaced by the best result ready (LSTM, else rule-based) and the result marked degraded.
+MODEL_LATENCY_SLO_MS = {
+    MODEL_GEMINI_PRO: 12000,
+    MODEL_TRANSFORMER_CUSTOM: 4000,
+    MODEL_LSTM_CUSTOM: 2000,
+}
+APPLICANT_MATCH_DEADLINE_MS = 12000  # Worst-case wait for a single-model analysis on the applicant page
+MATCH_FINISH_IN_BACKGROUND = True    # Let a late model finish and cache its result for the next request
+MATCH_RESULT_CACHE_SIZE = 512
+MATCH_RESULT_CACHE_TTL_S = 3600
+MATCH_MAX_WORKERS = 8                # Threads shared by comparisons and deadline-bound matches
+
+# Packed Gemini analysis for bulk screening (several resumes against one job per request)
+GEMINI_BATCH_TOKEN_BUDGET = 24000        # Estimated prompt tokens per packed request
+GEMINI_BATCH_MAX_RESUMES = 10
+GEMINI_MAX_OUTPUT_TOKENS = 8192          # Output limit of the configured Gemini model
+GEMINI_OUTPUT_TOKENS_PER_RESUME = 600    # Reserved per resume so the JSON array is never cut off
+GEMINI_RESUME_MAX_CHARS = 12000          # Compacted resume length sent to Gemini
+GEMINI_CHARS_PER_TOKEN = 4               # Used to estimate prompt tokens without an API call
+
+# Prediction history retention (python -m services.history_retention): monthly partitions older
+# than the retention window are archived to Parquet files here, then detached from the table.
+PREDICTION_HISTORY_RETENTION_MONTHS = 12
+PREDICTION_HISTORY_ARCHIVE_DIR = "archive/prediction_history"
+PREDICTION_HISTORY_PAGE_SIZE = 1000    # Rows fetched per request when reading a partition
+DASHBOARD_DEFAULT_RANGE_DAYS = 90       # Dashboard date range shown by default (only this window is loaded)
+
+# Prediction history export (dashboard and python -m services.history_export)
+PREDICTION_EXPORT_DIR = "exports"              # Where dashboard exports are written
+PREDICTION_EXPORT_ROW_GROUP_ROWS = 50000       # Rows buffered per Parquet row group (bounds export memory)
+PREDICTION_EXPORT_DOWNLOAD_MAX_MB = 200        # Larger dashboard exports are left on disk instead of offered for download
+PREDICTION_EXPORT_POLL_S = 1.0                 # Dashboard progress refresh interval while an export runs
+
+# Concurrent page reads (services.supabase_async): one async client with a pooled HTTP connection
+SUPABASE_ASYNC_MAX_CONNECTIONS = 10
+SUPABASE_QUERY_TIMEOUT_S = 15          # Default per-query timeout
+DASHBOARD_QUERY_TIMEOUTS_S = {         # Per-query overrides for the dashboard's reads
+    "oldest": 5,
+    "newest": 5,
+    "sketches": 5,                     # Optional panel: days without sketch rows are counted exactly
+}
+
+# Headless scoring API (python -m services.http_api)
+API_HOST = "127.0.0.1"                 # Loopback by default; other hosts require SCORING_API_KEY
+API_PORT = 8000
+API_WORKERS = 2                        # Uvicorn worker processes, each with its own models (or INFERENCE_SERVER_ADDRESS)
+API_REQUEST_TIMEOUT_S = 30             # Requests still running after this get a 504
+API_MAX_THREADS = 16                   # Threads per worker for blocking parse/score work
+API_BATCH_MAX_ITEMS = 100              # Pairs accepted per /match/batch request
+API_RANK_TOP_K = 10                    # Jobs returned by /rank unless the request asks otherwise
+API_RANK_MAX_TOP_K = 100               # Largest top_k a /rank request may ask for
+API_RANK_CANDIDATES = 500              # Jobs sharing most of the resume's skills (indexed query) that /rank cascades over
+API_PRELOAD_MODELS = [MODEL_LSTM_CUSTOM, MODEL_TRANSFORMER_CUSTOM]  # Loaded at startup; /ready waits for them
+API_MAX_UPLOAD_MB = 10                 # Larger resume uploads are rejected with 413
+
+# Background task queue (services.task_queue): SQLite-backed, run by python -m services.task_queue
+TASK_QUEUE_DB_PATH = "cache/task_queue.sqlite3"
+TASK_FILES_DIR = "cache/task_files"    # Uploaded files kept for queued tasks (and later re-scoring)
+TASK_WORKERS_IN_APP = 0                # Worker threads inside the Streamlit process; 0 keeps the work in dedicated workers
+TASK_MAX_ATTEMPTS = 3                  # Runs per task before it is marked failed
+TASK_RETRY_BACKOFF_S = 10              # Delay before the first retry, doubled on each further attempt
+TASK_POLL_INTERVAL_S = 1.0             # How often an idle worker checks for queued tasks
+TASK_HEARTBEAT_S = 10                  # Running tasks refresh their heartbeat this often
+TASK_STALE_AFTER_S = 60                # A running task without a heartbeat this long (dead worker) is requeued
+TASK_RETENTION_DAYS = 30               # Finished tasks and their files are purged after this many days
+TASK_UI_POLL_S = 2.0                   # How often pages refresh the status of their running tasks
+
+# Near-duplicate detection (services.minhash): MinHash signatures over word shingles, LSH banding
+MINHASH_NUM_PERM = 128                 # Signature length; must equal MINHASH_BANDS * rows per band
+MINHASH_BANDS = 16                     # 16 bands of 8 rows: pairs above ~0.7 similarity become candidates
+MINHASH_SHINGLE_WORDS = 5              # Words per shingle (resumes)
+JOB_MINHASH_SHINGLE_WORDS = 3          # Job postings are short (~50 words): smaller shingles keep a small edit a small change
+RESUME_NEAR_DUPLICATE_THRESHOLD = 0.9  # Estimated Jaccard similarity above which a resume reuses another's scores
+JOB_NEAR_DUPLICATE_THRESHOLD = 0.75    # ... above which an imported posting duplicates an existing one
+JOB_MINHASH_BANDS = 32                 # 32 bands of 4 rows: candidates from ~0.45, so matches near 0.75 are not missed
@@ -0,0 +1,43 @@
+import os
+import secrets
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# "host:port" of a running inference server (python -m models.inference_server).
+# When unset, the LSTM and Transformer models are loaded and run inside the app process.
+INFERENCE_SERVER_ADDRESS = os.getenv("INFERENCE_SERVER_ADDRESS")
+
+# Shared secret for the app <-> inference server connection. Connections are always authenticated
+# (multiprocessing.connection unpickles what it receives): without INFERENCE_SERVER_AUTHKEY, the
+# server generates a key file that only its user can read and apps on the same host use it.
+INFERENCE_SERVER_AUTHKEY = os.getenv("INFERENCE_SERVER_AUTHKEY")
+INFERENCE_SERVER_AUTHKEY_FILE = os.getenv("INFERENCE_SERVER_AUTHKEY_FILE", "cache/inference_server.key")
+
+
+def inference_authkey(create=False):
+    """
+    The connection secret as bytes: INFERENCE_SERVER_AUTHKEY, else the key file (generated with
+    owner-only permissions when `create` is set, as the server does). None if neither exists.
+    """
+    if INFERENCE_SERVER_AUTHKEY:
+        return INFERENCE_SERVER_AUTHKEY.encode("utf-8")
+    if not os.path.exists(INFERENCE_SERVER_AUTHKEY_FILE) and create:
+        os.makedirs(os.path.dirname(INFERENCE_SERVER_AUTHKEY_FILE) or ".", exist_ok=True)
+        fd = os.open(INFERENCE_SERVER_AUTHKEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(secrets.token_hex(32))
+    try:
+        with open(INFERENCE_SERVER_AUTHKEY_FILE) as f:
+            return f.read().strip().encode("utf-8") or None
+    except OSError:
+        return None
+
+
+def parse_address(address: str) -> tuple:
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+# Model processes sharing this host (Streamlit workers or inference workers). Without a calibrated
+# profile, each process gets cpu_count // MODEL_WORKERS_PER_HOST intra-op threads.
+MODEL_WORKERS_PER_HOST = int(os.getenv("MODEL_WORKERS_PER_HOST", "1"))
@@ -1,5 +1,4 @@
 from dotenv import load_dotenv
-import google.generativeai as genai
 import os
 
 
@@ -7,16 +6,26 @@ load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY environment variable is not set.")
+# Models configured with GEMINI_API_KEY, built on first use
+_default_model = None
 
 # Set up Gemini API
 def setup_gemini(api_key=None):
+    global _default_model
+    if api_key is None and _default_model is not None:
+        return _default_model
+
     api_key = api_key or GEMINI_API_KEY
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY environment variable is not set.")
+
+    import google.generativeai as genai
     genai.configure(api_key=api_key)
 
     model = genai.GenerativeModel(
         model_name="gemini-2.0-flash"
     )
-    
+
+    if api_key == GEMINI_API_KEY:
+        _default_model = model
     return model
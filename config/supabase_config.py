@@ -1,5 +1,5 @@
 import os
-from supabase import create_client, Client
+import threading
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -8,18 +8,33 @@ load_dotenv()
 SUPABASE_URL: str = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY: str = os.environ.get("SUPABASE_KEY") 
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise ValueError("Supabase URL and Key must be set in environment variables or .env file.")
+# The client is created on first use (not at import), so pages that never touch the
+# database do not pay for it and a cold start does not depend on Supabase.
+_supabase_client = None
+_supabase_client_lock = threading.Lock()
 
-# Initialize Supabase client
-try:
-    supabase_client: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-    print("Supabase client initialized successfully.")
-except Exception as e:
-    print(f"Error initializing Supabase client: {e}")
-    supabase_client = None
+
+def get_supabase_client():
+    """Return the shared Supabase client, creating it on first call. Returns None if it cannot be created."""
+    global _supabase_client
+    if _supabase_client is not None:
+        return _supabase_client
+
+    with _supabase_client_lock:
+        if _supabase_client is None:
+            if not SUPABASE_URL or not SUPABASE_KEY:
+                print("Supabase URL and Key must be set in environment variables or .env file.")
+                return None
+            try:
+                from supabase import create_client
+                _supabase_client = create_client(SUPABASE_URL, SUPABASE_KEY)
+                print("Supabase client initialized successfully.")
+            except Exception as e:
+                print(f"Error initializing Supabase client: {e}")
+                return None
+    return _supabase_client
 
 # You can also define table names as constants here
 JOBS_TABLE_NAME = "jobs"
 PREDICTION_HISTORY_TABLE_NAME = "prediction_history"
-
+MISSING_SKILL_SKETCHES_TABLE_NAME = "missing_skill_sketches"
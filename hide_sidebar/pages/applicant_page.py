@@ -1,6 +1,6 @@
 import streamlit as st
 from services.resume_parser import parse_resume 
-from services.matcher import match_resume_to_job
+from services.matcher import match_resume_to_job, get_model_availability, COMPARISON_MODELS
 from datetime import datetime
 import pandas as pd
 import time
@@ -16,50 +16,120 @@ from config.constants import (
     MODEL_LSTM_CUSTOM,
     MODEL_TRANSFORMER_CUSTOM,
     MODEL_RULE_BASED,
+    APPLICANT_MATCH_DEADLINE_MS,
+    TASK_UI_POLL_S,
     HOME
     # PREDICTION_HISTORY_CSV
 )
-from config.supabase_config import supabase_client, PREDICTION_HISTORY_TABLE_NAME
+from services.prediction_history import save_predictions
+from services.task_queue import submit_task, get_task, cancel_task, workers_alive
+from services.task_handlers import TASK_COMPARE_MODELS, run_model_comparison
 
 
 def save_prediction_to_supabase(resume_filename_str, job_title_str, analysis_result_dict, model_used_str):
     """Saves the prediction result to the Supabase prediction_history table."""
-    if not supabase_client:
-        st.error("Supabase client not initialized. Cannot save prediction.")
-        print("Supabase client not initialized in save_prediction_to_supabase.")
-        return False
-
-    new_entry = {
-        "timestamp": datetime.now().isoformat(), # ISO format for Supabase timestamp
-        "resume_name": resume_filename_str if resume_filename_str else "N/A",
-        "job_title": job_title_str if job_title_str else "N/A",
-        "model_used": model_used_str,
-        "match_score": analysis_result_dict.get('match_score', 0),
-        "skill_match_score": analysis_result_dict.get('skill_match', 0),
-        "experience_match_score": analysis_result_dict.get('experience_match', 0),
-        "missing_skills_count": len(analysis_result_dict.get('missing_skills', [])),
-        "missing_skills_list": ", ".join(analysis_result_dict.get('missing_skills', [])), # Store as comma-separated string
-        "suggestions": analysis_result_dict.get('suggestions', "")
-        # 'created_at' will be handled by Supabase default value
-    }
-    
-    try:
-        response = supabase_client.table(PREDICTION_HISTORY_TABLE_NAME).insert(new_entry).execute()
-        if response.data:
-            print(f"Prediction history saved to Supabase successfully. ID: {response.data[0].get('id')}")
-            return True
+    return save_predictions_to_supabase(resume_filename_str, job_title_str, {model_used_str: analysis_result_dict})
+
+
+def save_predictions_to_supabase(resume_filename_str, job_title_str, results_by_model):
+    """Saves one prediction_history row per model ({model_name: analysis_result_dict}) in a single insert."""
+    saved = save_predictions(resume_filename_str, job_title_str, results_by_model)
+    if not saved:
+        st.error("Failed to save prediction history to Supabase. See the server log for details.")
+    return saved
+
+
+COMPARISON_STATUS_LABELS = {
+    "ok": "✅ Done",
+    "timeout": "⏱️ Timed out (rule-based shown)",
+    "error": "⚠️ Failed (rule-based shown)",
+}
+
+
+def _show_comparison_outcome(placeholder, outcome):
+    """Fills one model's column of the live comparison."""
+    with placeholder.container():
+        st.metric(f"🎯 {outcome['model']}", f"{outcome['result'].get('match_score', 0)}%", delta_color="off")
+        st.caption(f"{COMPARISON_STATUS_LABELS[outcome['status']]} in {outcome['elapsed_s']:.1f} s")
+
+
+def _show_comparison_task(task_id):
+    """Live columns of a queued model comparison; once it has finished, its results replace them."""
+    task = get_task(task_id)
+    if task is None:
+        st.session_state.pop("comparison_task_applicant", None)
+        return
+    if task["status"] == "succeeded":
+        st.session_state.comparison_outcomes_applicant = task["result"]["outcomes"]
+        st.session_state.show_applicant_comparison = True
+        st.session_state.pop("comparison_task_applicant", None)
+        st.rerun()
+    if task["status"] in ("failed", "cancelled"):
+        st.session_state.pop("comparison_task_applicant", None)
+        if task["status"] == "failed":
+            st.error(f"❌ The model comparison failed: {task['error']}")
         else:
-            # print(f"Failed to save prediction to Supabase. Response: {response}")
-            error_message = "Unknown error."
-            if hasattr(response, 'error') and response.error:
-                error_message = response.error.message
-            st.error(f"Failed to save prediction history to Supabase: {error_message}")
-            print(f"Failed to save prediction to Supabase. Error: {error_message}, Full response: {response}")
-            return False
-    except Exception as e:
-        st.error(f"Exception while saving prediction history to Supabase: {e}")
-        print(f"Exception saving prediction to Supabase: {e}")
-        return False
+            st.warning("Model comparison cancelled.")
+        return
+
+    outcomes = (task["result"] or {}).get("outcomes", {})
+    models = task["payload"].get("models") or COMPARISON_MODELS
+    status_text = "⏳ Waiting for a worker..." if task["status"] == "queued" else f"⚖️ {task['message'] or 'Running all models in parallel...'}"
+    st.progress(len(outcomes) / len(models), text=status_text)
+    if task["status"] == "queued" and not workers_alive():
+        st.warning("No background worker is running, so this comparison will not start. Workers run with "
+                   "`python -m services.task_queue`; or cancel and compare again to run the models on this page.")
+    for result_column, model_name in zip(st.columns(len(models)), models):
+        placeholder = result_column.empty()
+        if model_name in outcomes:
+            _show_comparison_outcome(placeholder, outcomes[model_name])
+        else:
+            placeholder.info(f"⏳ {model_name}...")
+    if st.button("Cancel comparison", key="cancel_comparison_applicant"):
+        cancel_task(task_id)
+        st.rerun()
+
+
+def _show_model_comparison(comparison_outcomes):
+    """Side-by-side results of every model from the compare-all-models mode."""
+    st.markdown("---")
+    st.subheader("⚖️ Model Comparison")
+
+    comparison_df = pd.DataFrame([
+        {
+            "Model": model_name,
+            "Overall Match (%)": outcome["result"].get("match_score", 0),
+            "Skill Match (%)": outcome["result"].get("skill_match", 0),
+            "Experience Fit (%)": outcome["result"].get("experience_match", 0),
+            "Missing Skills": len(outcome["result"].get("missing_skills", [])),
+            "Status": COMPARISON_STATUS_LABELS[outcome["status"]],
+            "Time (s)": round(outcome["elapsed_s"], 2),
+        }
+        for model_name, outcome in comparison_outcomes.items()
+    ])
+    st.dataframe(comparison_df, use_container_width=True, hide_index=True)
+
+    fig_comparison = px.bar(
+        comparison_df, x="Model", y="Overall Match (%)", color="Model",
+        text="Overall Match (%)", range_y=[0, 100], title="Overall Match Score by Model"
+    )
+    st.plotly_chart(fig_comparison, use_container_width=True)
+
+    slowest = comparison_df["Time (s)"].max()
+    st.caption(f"All models ran in parallel: {slowest:.1f} s in total, "
+               f"vs. about {comparison_df['Time (s)'].sum():.1f} s one after another.")
+    if any(outcome["status"] != "ok" for outcome in comparison_outcomes.values()):
+        st.caption("Models that timed out or failed show the rule-based result and are not saved to the history.")
+
+    for model_name, outcome in comparison_outcomes.items():
+        with st.expander(f"💡 {model_name}: details"):
+            missing_skills_items = outcome["result"].get("missing_skills", [])
+            if missing_skills_items:
+                st.warning(f"**Missing Skills ({len(missing_skills_items)}):** {', '.join(missing_skills_items)}")
+            if outcome["result"].get("gemini_suitability_summary"):
+                st.info(outcome["result"]["gemini_suitability_summary"])
+            if outcome["result"].get("suggestions"):
+                st.markdown(f"**Suggestions:** {outcome['result']['suggestions']}")
 
 
 def run():
@@ -107,6 +177,11 @@ def run():
         "Custom Fine-tuned Transformer model for overall score.",
         "Basic rule-based matching for quick assessment."
     ]
+    model_availability = get_model_availability()
+    model_captions_list = [
+        caption if model_availability.get(model_name, True) else f"{caption} (Unavailable in this deployment: falls back to rule-based.)"
+        for model_name, caption in zip(model_options_list, model_captions_list)
+    ]
 
     if "applicant_model_choice_v2" not in st.session_state:
         st.session_state.applicant_model_choice_v2 = MODEL_GEMINI_PRO 
@@ -126,6 +201,11 @@ def run():
     elif selected_model_name == MODEL_TRANSFORMER_CUSTOM: st.info("Transformer model provides AI-driven overall score; detailed breakdown is rule-based.")
     else: st.info("Using rule-based matching for skills and experience.")
 
+    compare_models_mode = st.checkbox(
+        "⚖️ Compare all models (runs every model on the same resume in parallel)",
+        key="compare_all_models_applicant"
+    )
+
 
     with st.form("resume_upload_form_applicant"):
         resume_file_uploaded = st.file_uploader(
@@ -151,13 +231,45 @@ def run():
             if not parsed_resume_data or not parsed_resume_data.get("raw_text"):
                 st.error("❌ Could not parse the resume or extracted text is empty.")
                 progress_bar_analysis.empty()
+            elif compare_models_mode:
+                comparison_payload = {
+                    "resume": parsed_resume_data,
+                    "job": job_data_dict_selected,
+                    "resume_name": resume_file_uploaded.name,
+                    "models": COMPARISON_MODELS,
+                }
+                progress_bar_analysis.empty()
+                st.session_state.show_applicant_results_v2 = False
+                if workers_alive():
+                    # Parse once, then hand the models to the task queue; the page polls the task below
+                    st.session_state.comparison_task_applicant = submit_task(TASK_COMPARE_MODELS, comparison_payload)
+                    st.session_state.show_applicant_comparison = False
+                else:
+                    # No task worker would pick the task up: run the models in this script run instead
+                    st.caption("No background worker is running, so the models run on this page.")
+                    comparison_progress = st.progress(0, text="⚖️ Running all models in parallel...")
+                    placeholders = {model_name: result_column.empty() for result_column, model_name
+                                    in zip(st.columns(len(COMPARISON_MODELS)), COMPARISON_MODELS)}
+                    for model_name, placeholder in placeholders.items():
+                        placeholder.info(f"⏳ {model_name}...")
+
+                    def show_outcome(outcomes):
+                        latest = next(reversed(outcomes))
+                        _show_comparison_outcome(placeholders[latest], outcomes[latest])
+                        comparison_progress.progress(len(outcomes) / len(COMPARISON_MODELS), text=f"⚖️ {latest} finished")
+
+                    comparison = run_model_comparison(comparison_payload, show_outcome)
+                    st.session_state.comparison_outcomes_applicant = comparison["outcomes"]
+                    st.session_state.show_applicant_comparison = True
+                st.rerun()
             else:
                 with st.spinner(f"⚙️ Matching with {selected_model_name}..."):
                     progress_bar_analysis.progress(65, text=f"⚙️ Matching with {selected_model_name}...")
                     analysis_output = match_resume_to_job(
                         parsed_resume_data, 
                         job_data_dict_selected, 
-                        model_choice=selected_model_name 
+                        model_choice=selected_model_name,
+                        deadline_ms=APPLICANT_MATCH_DEADLINE_MS  # Bounded wait: degrades instead of blocking
                     )
                     time.sleep(0.2)
                 
@@ -170,19 +282,35 @@ def run():
                     resume_file_uploaded.name, 
                     job_data_dict_selected.get("Job Title", "N/A"),
                     analysis_output, 
-                    selected_model_name
+                    analysis_output.get("model_used", selected_model_name)  # The model whose score it is
                 )
                 
                 st.session_state.analysis_output_applicant = analysis_output
                 st.session_state.show_applicant_results_v2 = True
+                st.session_state.show_applicant_comparison = False
                 st.rerun()
 
+    comparison_task_id = st.session_state.get("comparison_task_applicant")
+    if comparison_task_id is not None:
+        comparison_task = get_task(comparison_task_id)
+        task_running = comparison_task is not None and comparison_task["status"] in ("queued", "running")
+        st.fragment(_show_comparison_task, run_every=TASK_UI_POLL_S if task_running else None)(comparison_task_id)
+
+    if st.session_state.get("show_applicant_comparison", False) and "comparison_outcomes_applicant" in st.session_state:
+        _show_model_comparison(st.session_state.comparison_outcomes_applicant)
+
     if st.session_state.get("show_applicant_results_v2", False) and "analysis_output_applicant" in st.session_state:
         analysis_output = st.session_state.analysis_output_applicant
-        model_used_for_display = st.session_state.applicant_model_choice_v2
+        model_used_for_display = analysis_output.get("model_used", st.session_state.applicant_model_choice_v2)
 
         st.markdown("---")
         st.subheader(f"📊 Match Results (using {model_used_for_display})")
+        if analysis_output.get("degraded"):
+            st.warning(f"⏱️ {analysis_output.get('degraded_from')} did not answer in time, so these are the "
+                       f"{model_used_for_display} results. Analyze again shortly to get the full result.")
+        if analysis_output.get("near_duplicate"):
+            st.info(f"♻️ These scores were reused from a near-identical resume analyzed for this job "
+                    f"({analysis_output['near_duplicate_similarity']:.0%} similar).")
 
         overall_score_val = analysis_output.get('match_score', 0)
         skill_score_val = analysis_output.get('skill_match', 0)
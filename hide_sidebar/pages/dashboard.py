@@ -2,35 +2,109 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import os 
-from datetime import datetime, time
-from config.supabase_config import supabase_client, PREDICTION_HISTORY_TABLE_NAME 
+from datetime import datetime, time, timedelta
+from config.supabase_config import PREDICTION_HISTORY_TABLE_NAME 
+from services.skill_sketch import sketch_rows_query, uncovered_days, missing_skills_query, top_missing_skills as top_missing_skills_from_sketches
+from services.supabase_async import run_queries
+from services.history_export import EXPORT_FORMATS, start_export_job, get_export_job, cancel_export_job
+from config.constants import DASHBOARD_DEFAULT_RANGE_DAYS, DASHBOARD_QUERY_TIMEOUTS_S, PREDICTION_EXPORT_DOWNLOAD_MAX_MB, PREDICTION_EXPORT_POLL_S
 # from config.constants import PREDICTION_HISTORY_CSV
 
-def load_prediction_history_from_supabase() -> pd.DataFrame:
-    """Loads prediction history from the Supabase table."""
-    if not supabase_client:
-        st.error("Supabase client not initialized. Cannot load prediction history.")
-        print("Supabase client not initialized in load_prediction_history_from_supabase.")
+# prediction_history columns the dashboard panels read; missing skills come from the sketches
+DASHBOARD_HISTORY_COLUMNS = ["id", "timestamp", "job_title", "model_used", "match_score",
+                             "skill_match_score", "experience_match_score", "missing_skills_count"]
+
+def load_prediction_history_bounds():
+    """(oldest, newest) prediction dates, or None if there is no history. Two index-only lookups, run concurrently."""
+    responses = run_queries({
+        "oldest": lambda client: client.table(PREDICTION_HISTORY_TABLE_NAME).select("timestamp")
+            .order("timestamp").limit(1),
+        "newest": lambda client: client.table(PREDICTION_HISTORY_TABLE_NAME).select("timestamp")
+            .order("timestamp", desc=True).limit(1),
+    }, timeouts=DASHBOARD_QUERY_TIMEOUTS_S)
+    if responses["oldest"] is None or responses["newest"] is None:
+        st.error("Error loading prediction history from Supabase. See the server log for details.")
+        return None
+    oldest, newest = responses["oldest"].data, responses["newest"].data
+    if not oldest or not newest:
+        return None
+    return pd.to_datetime(oldest[0]["timestamp"]).date(), pd.to_datetime(newest[0]["timestamp"]).date()
+
+
+def _prediction_history_frame(rows) -> pd.DataFrame:
+    """Prediction history rows as a DataFrame with parsed timestamps and numeric score columns."""
+    if not rows:
         return pd.DataFrame()
-    try:
-        response = supabase_client.table(PREDICTION_HISTORY_TABLE_NAME).select("*").order("timestamp", desc=True).execute()
-        if response.data:
-            df = pd.DataFrame(response.data)
-            # Convert timestamp from ISO string to datetime objects
-            df["timestamp"] = pd.to_datetime(df["timestamp"])
-            # Ensure numeric columns are numeric, handling potential errors
-            numeric_cols = ['match_score', 'skill_match_score', 'experience_match_score', 'missing_skills_count']
-            for col in numeric_cols:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0) # Coerce errors, fill NaN with 0
-            return df
+    df = pd.DataFrame(rows)
+    # Convert timestamp from ISO string to datetime objects
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    # Ensure numeric columns are numeric, handling potential errors
+    numeric_cols = ['match_score', 'skill_match_score', 'experience_match_score', 'missing_skills_count']
+    for col in numeric_cols:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0) # Coerce errors, fill NaN with 0
+    return df
+
+
+def load_dashboard_data(start_datetime, end_datetime):
+    """
+    Loads the prediction history (DASHBOARD_HISTORY_COLUMNS) between start_datetime and
+    end_datetime and the missing-skills sketch rows of those days (all models), concurrently.
+    The date range is applied in the database, where it prunes the monthly partitions and uses
+    the timestamp index.
+    Returns (history DataFrame, sketch rows or None if they could not be loaded).
+    """
+    def history_query(client):
+        return client.table(PREDICTION_HISTORY_TABLE_NAME).select(",".join(DASHBOARD_HISTORY_COLUMNS)) \
+            .gte("timestamp", start_datetime.isoformat()).lte("timestamp", end_datetime.isoformat()) \
+            .order("timestamp", desc=True)
+
+    responses = run_queries({
+        "history": history_query,
+        "sketches": lambda client: sketch_rows_query(client, start_datetime.date(), end_datetime.date()),
+    }, timeouts=DASHBOARD_QUERY_TIMEOUTS_S)
+    if responses["history"] is None:
+        st.error("Error loading prediction history from Supabase. See the server log for details.")
+        return pd.DataFrame(), None
+    sketch_rows = responses["sketches"].data if responses["sketches"] is not None else None
+    return _prediction_history_frame(responses["history"].data), sketch_rows
+
+
+def _show_export_status(export_id):
+    """Progress of a background export, then its download (or file path if it is too large to serve)."""
+    export_job = get_export_job(export_id)
+    if export_job is None:
+        return
+    if export_job["status"] == "running":
+        col_status, col_cancel = st.columns([4, 1])
+        col_status.info(f"Exporting... {export_job['rows']:,} rows written so far.")
+        if col_cancel.button("Cancel", key="dashboard_export_cancel"):
+            cancel_export_job(export_id)
+        return
+    if st.session_state.get("dashboard_export_shown") != (export_id, export_job["status"]):
+        # Finished since the last full run: rerun the page so the fragment stops polling
+        st.session_state["dashboard_export_shown"] = (export_id, export_job["status"])
+        st.rerun()
+
+    if export_job["status"] == "done":
+        size_mb = os.path.getsize(export_job["path"]) / (1024 * 1024)
+        if size_mb <= PREDICTION_EXPORT_DOWNLOAD_MAX_MB:
+            with open(export_job["path"], "rb") as export_file:
+                st.download_button(
+                    label=f"⬇️ Download {export_job['rows']:,} Predictions ({export_job['format'].upper()}, {size_mb:.2f} MB)",
+                    data=export_file,
+                    file_name=os.path.basename(export_job["path"]),
+                    mime="text/csv" if export_job["format"] == "csv" else "application/octet-stream",
+                )
         else:
-            # print(f"No data in prediction history table or error in response: {response}") 
-            return pd.DataFrame()
-    except Exception as e:
-        st.error(f"Error loading prediction history from Supabase: {e}")
-        print(f"Error loading prediction history from Supabase: {e}")
-        return pd.DataFrame()
+            st.success(f"Exported {export_job['rows']:,} predictions ({size_mb:.0f} MB) to `{export_job['path']}` "
+                       f"on the server. That is too large to download through the browser; copy the file directly "
+                       f"or use `python -m services.history_export`.")
+    elif export_job["status"] == "cancelled":
+        st.warning("Export cancelled.")
+    else:
+        st.error("Export failed. See the server log for details.")
+
 
 def run():
     st.title("📊 Dashboard: Prediction Insights & Model Comparison")
@@ -54,23 +128,23 @@ def run():
     #     return
 
      # === Load Data from Supabase ===
-    df = load_prediction_history_from_supabase()
+    history_bounds = load_prediction_history_bounds()
 
-    if df.empty:
+    if history_bounds is None:
         st.info("Prediction history is currently empty. Analyze some resumes in the Applicant Portal to see data here.")
         return
 
     # === Sidebar Filters ===
     st.sidebar.header("📂 Filter Data")
     
-    # Date Range Filter
-    min_date = df["timestamp"].min().date() if not df.empty else datetime.now().date()
-    max_date = df["timestamp"].max().date() if not df.empty else datetime.now().date()
+    # Date Range Filter (defaults to the most recent DASHBOARD_DEFAULT_RANGE_DAYS)
+    min_date, max_date = history_bounds
+    default_start_date = max(min_date, max_date - timedelta(days=DASHBOARD_DEFAULT_RANGE_DAYS))
     
     
     selected_date_range = st.sidebar.date_input(
         "Select Date Range",
-        value=(min_date, max_date),
+        value=(default_start_date, max_date),
         min_value=min_date,
         max_value=max_date,
         # format="YYYY-MM-DD" # For Streamlit versions that support it
@@ -80,6 +154,11 @@ def run():
     # Convert to datetime for comparison, ensuring end_date covers the whole day
     start_datetime = datetime.combine(start_date, time.min) 
     end_datetime = datetime.combine(end_date, time.max) 
+
+    df, sketch_rows = load_dashboard_data(start_datetime, end_datetime)
+    if df.empty:
+        st.info("No predictions in the selected date range.")
+        return
     df["timestamp"] = df["timestamp"].dt.tz_localize(None)  # Make timestamp naive
 
     # Job Title Filter
@@ -224,31 +303,50 @@ def run():
     st.subheader("🎯 Skill Analysis (from Rule-Based Component)")
 
     # === Top Missing Skills (Overall for filtered data) ===
-    if 'missing_skills_list' in filtered_df.columns:
-        # Explode the comma-separated skills into individual rows
-        # Ensure missing_skills_list is treated as string and handle potential NaN/float values
-        skills_series = filtered_df["missing_skills_list"].astype(str).str.split(", ").explode().str.strip()
-        # Filter out empty strings that might result from empty lists or splitting "nan"
-        skills_series = skills_series[skills_series != "" ]
-        
-        if not skills_series.empty:
-            top_missing_skills = skills_series.value_counts().head(10).reset_index()
-            top_missing_skills.columns = ["Skill", "Frequency"]
-            
-            st.write("Top 10 Most Frequently Missing Skills (across all models in filtered data):")
-            st.dataframe(top_missing_skills, use_container_width=True, hide_index=True)
+    # Served from the per-day/per-model sketches where they exist; only the days without a sketch,
+    # and the job title filter (not part of the sketch key), are counted exactly, from a query
+    # for just those days' missing skills.
+    skill_sketch_rows = sketch_rows if selected_job == "All" else None
+    skill_model = None if selected_model_filter == "All" else selected_model_filter
+    uncovered = uncovered_days(filtered_df, skill_sketch_rows, model_used=skill_model)
+    exact_rows = []
+    if not uncovered.empty:
+        responses = run_queries({
+            "missing_skills": lambda client: missing_skills_query(
+                client, uncovered, job_title=None if selected_job == "All" else selected_job),
+        }, timeouts=DASHBOARD_QUERY_TIMEOUTS_S)
+        if responses["missing_skills"] is not None:
+            exact_rows = responses["missing_skills"].data
         else:
-            st.info("No missing skills data to display for the current filters.")
+            st.warning("Could not load missing skills for days without a sketch; counts cover the sketched days only.")
+    top_missing_skills = pd.DataFrame(
+        top_missing_skills_from_sketches(skill_sketch_rows, uncovered, exact_rows, model_used=skill_model),
+        columns=["Skill", "Frequency"]
+    )
+
+    if not top_missing_skills.empty:
+        st.write("Top 10 Most Frequently Missing Skills (across all models in filtered data):")
+        st.dataframe(top_missing_skills, use_container_width=True, hide_index=True)
     else:
-        st.info("'missing_skills_list' column not found in history.")
+        st.info("No missing skills data to display for the current filters.")
 
-    # === Download Option ===
+    # === Export ===
     st.markdown("---")
-    if not df.empty: # Offer download of the original, unfiltered dataframe
-        csv_export = df.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="⬇️ Download Full Prediction History (CSV)",
-            data=csv_export,
-            file_name="full_prediction_history.csv",
-            mime="text/csv",
+    st.subheader("⬇️ Export Predictions")
+    st.caption("Exports every prediction matching the date range, job title and model filters. "
+               "Rows are streamed from the database page by page in the background, so large exports "
+               "do not block the dashboard.")
+    export_format = st.radio("Format", EXPORT_FORMATS, horizontal=True, key="dashboard_export_format")
+    if st.button("Start Export", key="dashboard_export_start"):
+        st.session_state["dashboard_export_id"] = start_export_job(
+            export_format, start_datetime, end_datetime,
+            job_title=None if selected_job == "All" else selected_job,
+            model_used=None if selected_model_filter == "All" else selected_model_filter,
         )
+
+    export_id = st.session_state.get("dashboard_export_id")
+    export_job = get_export_job(export_id) if export_id else None
+    if export_job:
+        # Poll only while the export runs; the fragment reruns the page once it finishes
+        st.fragment(_show_export_status,
+                    run_every=PREDICTION_EXPORT_POLL_S if export_job["status"] == "running" else None)(export_id)
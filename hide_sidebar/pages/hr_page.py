@@ -1,8 +1,124 @@
 import streamlit as st
 from datetime import date, datetime 
 from services import job_service 
+from services.task_queue import submit_task, save_task_files, list_tasks, cancel_task
+from services.task_handlers import (
+    TASK_SCREEN_RESUMES,
+    TASK_RESCORE_JOB,
+    TASK_IMPORT_JOBS_CSV,
+    TASK_LABELS
+)
+from config.constants import (
+    MODEL_TRANSFORMER_CUSTOM,
+    MODEL_GEMINI_PRO,
+    MODEL_LSTM_CUSTOM,
+    MODEL_RULE_BASED,
+    TASK_UI_POLL_S
+)
 import pandas as pd 
 
+HR_TASK_KINDS = (TASK_SCREEN_RESUMES, TASK_RESCORE_JOB, TASK_IMPORT_JOBS_CSV)
+HR_TASKS_SHOWN = 10  # Most recent background tasks listed on the page
+ACTIVE_TASK_STATUSES = ("queued", "running")
+
+
+def _screening_ref(job_id):
+    return f"job:{job_id}"
+
+
+def _submit_rescore(job_id, changed):
+    """
+    Queues re-scoring of the resumes from the job's last screening, if it has one and the edit
+    `changed` (job_service.job_changed_artifacts) what one of its cascade stages reads.
+    Returns the task id or None.
+    """
+    screenings = [task for task in list_tasks(ref=_screening_ref(job_id), statuses=("succeeded",), limit=HR_TASKS_SHOWN)
+                  if task["kind"] in (TASK_SCREEN_RESUMES, TASK_RESCORE_JOB)]
+    if not screenings:
+        return None
+    last_screening = screenings[0]
+    if not changed & {MODEL_RULE_BASED, MODEL_LSTM_CUSTOM, last_screening["payload"]["final_model"]}:
+        return None
+    payload = dict(last_screening["payload"], rescore_of=last_screening["id"])
+    return submit_task(TASK_RESCORE_JOB, payload, ref=_screening_ref(job_id), files_dir=last_screening["files_dir"])
+
+
+def _hr_tasks():
+    return [task for task in list_tasks(limit=HR_TASKS_SHOWN * 3) if task["kind"] in HR_TASK_KINDS][:HR_TASKS_SHOWN]
+
+
+def _show_task_result(task):
+    result = task["result"] or {}
+    if task["kind"] == TASK_IMPORT_JOBS_CSV:
+        st.success(f"Imported {result.get('inserted', 0)} jobs from {result.get('file_name') or 'the CSV file'}"
+                   f" ({result.get('failed', 0)} rejected).")
+        if result.get("duplicates"):
+            action = "skipped" if result.get("duplicates_skipped") else "imported anyway"
+            st.warning(f"{len(result['duplicates'])} near-duplicate posting(s) {action}.")
+            st.dataframe(pd.DataFrame(result["duplicates"]).rename(columns={
+                "row": "CSV Row", "job_title": "Job Title", "duplicate_of": "Near-Duplicate Of", "similarity": "Similarity",
+            }), use_container_width=True, hide_index=True)
+        return
+
+    ranked_df = pd.DataFrame(result.get("ranked", []))
+    if ranked_df.empty:
+        st.info("No resume could be screened.")
+    else:
+        ranked_df["missing_skills"] = ranked_df["missing_skills"].apply(lambda skills: ", ".join(skills))
+        st.dataframe(ranked_df.rename(columns={
+            "resume_name": "Resume", "match_score": "Overall Match (%)", "skill_match": "Skill Match (%)",
+            "experience_match": "Experience Fit (%)", "stage": "Stage Reached", "missing_skills": "Missing Skills",
+            "near_duplicate_of": "Near-Duplicate Of",
+        }), use_container_width=True, hide_index=True)
+        stage_counts = result.get("stage_counts", {})
+        st.caption(f"{stage_counts.get('prefilter', 0)} resumes prefiltered, {stage_counts.get('lstm', 0)} reranked "
+                   f"by the LSTM, {stage_counts.get('final', 0)} scored by {result.get('final_model')}.")
+        if stage_counts.get("near_duplicates"):
+            st.caption(f"{stage_counts['near_duplicates']} near-duplicate resume(s) were not scored again: "
+                       f"they share the scores of the resume under Near-Duplicate Of.")
+    if result.get("unparsed"):
+        st.warning(f"Could not read: {', '.join(result['unparsed'])}")
+
+
+def _show_background_tasks():
+    """Status, progress and results of the most recent HR tasks (refreshed while any of them is active)."""
+    tasks = _hr_tasks()
+    any_active = any(task["status"] in ACTIVE_TASK_STATUSES for task in tasks)
+    if st.session_state.get("hr_tasks_active") and not any_active:
+        # Everything finished since the last full run: rerun the page so the fragment stops polling
+        st.session_state["hr_tasks_active"] = False
+        st.rerun()
+
+    if not tasks:
+        st.info("No background tasks yet.")
+        return
+    for task in tasks:
+        job_title = (task["result"] or {}).get("job_title")
+        title = f"#{task['id']} {TASK_LABELS.get(task['kind'], task['kind'])}"
+        if job_title:
+            title += f": {job_title}"
+        created = datetime.fromtimestamp(task["created_at"]).strftime("%Y-%m-%d %H:%M")
+        with st.expander(f"{title} ({task['status']}, {created})", expanded=task["status"] in ACTIVE_TASK_STATUSES):
+            if task["status"] in ACTIVE_TASK_STATUSES:
+                col_progress, col_cancel = st.columns([4, 1])
+                progress_total = task["progress_total"] or 0
+                with col_progress:
+                    if task["status"] == "queued":
+                        retry_note = f" (attempt {task['attempts'] + 1} of {task['max_attempts']})" if task["attempts"] else ""
+                        st.info(f"⏳ Waiting for a worker{retry_note}. Workers run with `python -m services.task_queue`.")
+                    else:
+                        st.progress(min(task["progress_done"] / progress_total, 1.0) if progress_total else 0.0,
+                                    text=task["message"] or "Running...")
+                if col_cancel.button("Cancel", key=f"hr_cancel_task_{task['id']}", disabled=task["cancel_requested"]):
+                    cancel_task(task["id"])
+                    st.rerun()
+            elif task["status"] == "succeeded":
+                _show_task_result(task)
+            elif task["status"] == "failed":
+                st.error(f"❌ Failed after {task['attempts']} attempt(s): {task['error']}")
+            else:
+                st.warning("Cancelled.")
+
 
 def run():
     st.title("🧑‍💼 HR Portal: Manage Job Postings")
@@ -55,12 +171,65 @@ def run():
                     else:
                         st.error("❌ Failed to add job. Please check console logs or try again.")
 
-    st.markdown("---")
-    st.subheader("📄 Existing Job Postings")
-    
     # Load jobs from Supabase via job_service
     job_df = job_service.load_jobs()
 
+    # === Bulk Resume Screening (background task) ===
+    with st.expander("📥 Bulk Resume Screening", expanded=False):
+        if job_df.empty or "id" not in job_df.columns:
+            st.info("Add a job posting first to screen resumes against it.")
+        else:
+            with st.form("bulk_screening_form_hr"):
+                job_labels = {row["id"]: f"ID: {row['id']} - {row.get('Job Title', 'N/A')} at {row.get('Company Name', 'N/A')}"
+                              for _, row in job_df.iterrows()}
+                screening_job_id = st.selectbox("Job Posting", list(job_labels), format_func=job_labels.get)
+                screening_files = st.file_uploader("Resumes (PDF, DOCX, DOC, TXT)", type=["pdf", "docx", "doc", "txt"],
+                                                   accept_multiple_files=True, key="bulk_screening_files_hr")
+                screening_model = st.selectbox("Final Model", [MODEL_TRANSFORMER_CUSTOM, MODEL_GEMINI_PRO],
+                                               help="Scores the shortlist left after the rule-based and LSTM stages.")
+                screening_submitted = st.form_submit_button("🚀 Screen Resumes")
+
+            if screening_submitted:
+                if not screening_files:
+                    st.warning("⚠️ Please upload at least one resume.")
+                else:
+                    files_dir, paths = save_task_files([(f.name, f.getvalue()) for f in screening_files])
+                    task_id = submit_task(TASK_SCREEN_RESUMES, {
+                        "job_id": int(screening_job_id),
+                        "final_model": screening_model,
+                        "resumes": [{"name": f.name, "path": path} for f, path in zip(screening_files, paths)],
+                    }, ref=_screening_ref(int(screening_job_id)), files_dir=files_dir)
+                    st.success(f"✅ Screening of {len(screening_files)} resumes queued as task #{task_id}. "
+                               f"You can close this page; results appear under Background Tasks.")
+
+    # === Import Jobs from CSV (background task) ===
+    with st.expander("📤 Import Jobs from CSV", expanded=False):
+        st.caption("Same columns as `data/job_dataset.csv`. Large files are imported in the background.")
+        with st.form("import_jobs_form_hr"):
+            jobs_csv_file = st.file_uploader("Jobs CSV", type=["csv"], key="import_jobs_csv_hr")
+            keep_duplicates = st.checkbox("Also import near-duplicates of existing postings (they are only listed)",
+                                          value=False, key="import_keep_duplicates_hr")
+            import_submitted = st.form_submit_button("📤 Import Jobs")
+        if import_submitted:
+            if not jobs_csv_file:
+                st.warning("⚠️ Please upload a CSV file.")
+            else:
+                files_dir, paths = save_task_files([(jobs_csv_file.name, jobs_csv_file.getvalue())])
+                task_id = submit_task(TASK_IMPORT_JOBS_CSV, {"path": paths[0], "file_name": jobs_csv_file.name,
+                                                             "keep_duplicates": keep_duplicates},
+                                      files_dir=files_dir)
+                st.success(f"✅ Import of {jobs_csv_file.name} queued as task #{task_id}.")
+
+    # === Background Tasks ===
+    st.markdown("---")
+    st.subheader("⏱️ Background Tasks")
+    tasks_active = any(task["status"] in ACTIVE_TASK_STATUSES for task in _hr_tasks())
+    st.session_state["hr_tasks_active"] = tasks_active
+    st.fragment(_show_background_tasks, run_every=TASK_UI_POLL_S if tasks_active else None)()
+
+    st.markdown("---")
+    st.subheader("📄 Existing Job Postings")
+
     if job_df.empty:
         st.info("No job postings found in the database. Add one using the form above.")
     else:
@@ -129,9 +298,13 @@ def run():
                     if save_changes_submitted:
                         with st.spinner(f"Updating Job ID: {db_job_id}..."):
                             # Pass the actual database job ID for update
-                            success = job_service.update_job(db_job_id, edited_job_data)
+                            previous_job = job_row_series.to_dict()
+                            success = job_service.update_job(db_job_id, edited_job_data, previous_job=previous_job)
                         if success:
                             st.success(f"✅ Job ID: {db_job_id} updated successfully!")
+                            # Resumes screened against the old posting are re-scored in the background,
+                            # if the edit changed a field the screening models read
+                            _submit_rescore(db_job_id, job_service.job_changed_artifacts(previous_job, edited_job_data))
                             st.rerun()
                         else:
                             st.error(f"❌ Failed to update Job ID: {db_job_id}. Check logs.")
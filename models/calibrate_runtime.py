@@ -0,0 +1,221 @@
+"""
+Calibrates the model runtime settings (models.runtime_config) for this host.
+
+For each candidate intra-op thread count, `--workers-per-host` probe processes run at the same
+time, the way Streamlit or inference workers share a box. Each probe loads the models, then
+measures single-request latency of predict_with_lstm/predict_with_transformer and the throughput
+of batched scoring at several batch sizes. The setting with the lowest p99 latency under that
+concurrency wins, and the resulting profile is written to MODEL_RUNTIME_PROFILE_PATH.
+
+    python -m models.calibrate_runtime --workers-per-host 4
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from datetime import datetime, timezone
+
+import numpy as np
+
+from config.constants import MODEL_RUNTIME_PROFILE_PATH
+from config.inference_config import MODEL_WORKERS_PER_HOST
+
+JOB_DATASET_PATH = os.path.join("data", "job_dataset.csv")
+DEFAULT_BATCH_SIZES = [1, 4, 8, 16, 32]
+
+
+def _thread_candidates(workers_per_host):
+    """Powers of two up to the host's cores, plus the even per-worker share of the cores."""
+    cpu_count = os.cpu_count() or 1
+    candidates = {max(1, cpu_count // workers_per_host)}
+    threads = 1
+    while threads <= cpu_count:
+        candidates.add(threads)
+        threads *= 2
+    return sorted(candidates)
+
+
+def sample_pairs(n_pairs, seed=0):
+    """(resume_text, job_text) pairs built from the bundled job dataset (synthetic text if it is missing)."""
+    rng = np.random.default_rng(seed)
+    if os.path.exists(JOB_DATASET_PATH):
+        import pandas as pd
+        jobs = pd.read_csv(JOB_DATASET_PATH).fillna("")
+        descriptions = (jobs["Job Description"] + "\n" + jobs["Skills Required"]).tolist()
+    else:
+        words = ["python", "sql", "docker", "team", "design", "cloud", "data", "react", "api", "testing"]
+        descriptions = [" ".join(rng.choice(words, size=rng.integers(50, 300))) for _ in range(200)]
+    picks = rng.integers(0, len(descriptions), size=(n_pairs, 2))
+    return [(descriptions[a] + "\n" + descriptions[b], descriptions[b]) for a, b in picks]
+
+
+# --- Probe process ---
+def _run_probe(config):
+    from models import custom_model_predictor as predictor
+
+    single = {"lstm": predictor.predict_with_lstm, "transformer": predictor.predict_with_transformer}
+    batched = {"lstm": predictor.predict_batch_with_lstm, "transformer": predictor.predict_batch_with_transformer}
+    loaders = {"lstm": predictor.load_lstm_model_and_tokenizer, "transformer": predictor.load_transformer_model_and_tokenizer}
+    models = [name for name in config["models"] if loaders[name]()]
+
+    pairs = sample_pairs(config["requests"] + max(config["batch_sizes"]) * 2, seed=config["seed"])
+    for name in models:  # warm-up
+        single[name](*pairs[0])
+
+    # Start measuring only once every probe is loaded, so they really compete for the cores
+    print("READY", flush=True)
+    sys.stdin.readline()
+
+    report = {}
+    for name in models:
+        latencies = []
+        for resume_text, job_text in pairs[:config["requests"]]:
+            start = time.perf_counter()
+            single[name](resume_text, job_text)
+            latencies.append(time.perf_counter() - start)
+
+        throughput = {}
+        for batch_size in config["batch_sizes"]:
+            batch_pairs = pairs[:batch_size * 2]
+            start = time.perf_counter()
+            batched[name](batch_pairs, batch_size=batch_size)
+            throughput[batch_size] = len(batch_pairs) / (time.perf_counter() - start)
+        report[name] = {"latencies": latencies, "throughput": throughput}
+    print("__REPORT__" + json.dumps(report), flush=True)
+
+
+# --- Calibration driver ---
+def _measure_setting(threads, inference_mode, args):
+    """Run `workers_per_host` concurrent probes with the given thread count; returns merged measurements."""
+    env = dict(os.environ)
+    env.update({
+        "MODEL_INTRA_OP_THREADS": str(threads),
+        "MODEL_INTER_OP_THREADS": "1",
+        "MODEL_TORCH_INFERENCE_MODE": "1" if inference_mode else "0",
+        "OMP_NUM_THREADS": str(threads),
+        "MKL_NUM_THREADS": str(threads),
+    })
+    probes = []
+    for worker in range(args.workers_per_host):
+        probe_config = {"models": args.models, "requests": args.requests,
+                        "batch_sizes": args.batch_sizes, "seed": worker}
+        probes.append(subprocess.Popen(
+            [sys.executable, "-m", "models.calibrate_runtime", "--probe", json.dumps(probe_config)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, env=env,
+        ))
+
+    for probe in probes:
+        for line in probe.stdout:
+            if line.startswith("READY"):
+                break
+    for probe in probes:
+        try:
+            probe.stdin.write("GO\n")
+            probe.stdin.flush()
+        except OSError:
+            print(f"Calibration probe {probe.pid} exited before measuring (threads={threads}).")
+
+    merged = {}
+    for probe in probes:
+        output, _ = probe.communicate()
+        for line in output.splitlines():
+            if not line.startswith("__REPORT__"):
+                continue
+            for name, measurements in json.loads(line[len("__REPORT__"):]).items():
+                entry = merged.setdefault(name, {"latencies": [], "throughput": {}})
+                entry["latencies"].extend(measurements["latencies"])
+                for batch_size, items_per_s in measurements["throughput"].items():
+                    entry["throughput"].setdefault(int(batch_size), []).append(items_per_s)
+
+    summary = {}
+    for name, entry in merged.items():
+        latencies = np.asarray(entry["latencies"]) * 1000.0
+        summary[name] = {
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+            # Host-wide items/s: every probe was scoring at the same time
+            "batch_throughput": {bs: float(np.sum(values)) for bs, values in entry["throughput"].items()},
+        }
+    return summary
+
+
+def _print_summary(threads, inference_mode, summary):
+    for name, stats in summary.items():
+        best_bs = max(stats["batch_throughput"], key=stats["batch_throughput"].get)
+        print(f"  threads={threads:<3} inference_mode={str(inference_mode):<5} {name:<12} "
+              f"p50={stats['p50_ms']:8.1f} ms  p99={stats['p99_ms']:8.1f} ms  "
+              f"best batch={best_bs} ({stats['batch_throughput'][best_bs]:.1f} items/s)")
+
+
+def _pick_batch_size(throughput, tolerance=0.05):
+    """Smallest batch size within `tolerance` of the best throughput (smaller batches, lower latency)."""
+    best = max(throughput.values())
+    return min(bs for bs, items_per_s in throughput.items() if items_per_s >= best * (1 - tolerance))
+
+
+def calibrate(args):
+    print(f"Calibrating on {os.cpu_count()} CPUs with {args.workers_per_host} concurrent model process(es)...")
+    results = []
+    for threads in args.threads:
+        summary = _measure_setting(threads, True, args)
+        if not summary:
+            print("No model could be loaded; nothing to calibrate.")
+            return None
+        _print_summary(threads, True, summary)
+        results.append({"threads": threads, "inference_mode": True, "summary": summary})
+
+    # Lowest combined p99 across the models wins
+    best = min(results, key=lambda r: sum(stats["p99_ms"] for stats in r["summary"].values()))
+    inference_mode = True
+    if "transformer" in best["summary"]:
+        without = _measure_setting(best["threads"], False, args)
+        _print_summary(best["threads"], False, without)
+        results.append({"threads": best["threads"], "inference_mode": False, "summary": without})
+        if without.get("transformer", {}).get("p99_ms", float("inf")) < best["summary"]["transformer"]["p99_ms"]:
+            inference_mode = False
+
+    profile = {
+        "intra_op_threads": best["threads"],
+        "inter_op_threads": 1,
+        "inference_mode": inference_mode,
+        "calibrated_at": datetime.now(timezone.utc).isoformat(),
+        "cpu_count": os.cpu_count(),
+        "workers_per_host": args.workers_per_host,
+        "measurements": results,
+    }
+    for name in ("lstm", "transformer"):
+        if name in best["summary"]:
+            profile[f"{name}_batch_size"] = _pick_batch_size(best["summary"][name]["batch_throughput"])
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+    print(f"Best profile: threads={profile['intra_op_threads']}, inference_mode={inference_mode}, "
+          f"lstm_batch_size={profile.get('lstm_batch_size')}, transformer_batch_size={profile.get('transformer_batch_size')}")
+    print(f"Written to {args.output}")
+    return profile
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark model runtime settings on this host and write the best profile.")
+    parser.add_argument("--workers-per-host", type=int, default=MODEL_WORKERS_PER_HOST,
+                        help="Model processes that will share this host (Streamlit or inference workers).")
+    parser.add_argument("--threads", type=int, nargs="+", help="Intra-op thread counts to try.")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES)
+    parser.add_argument("--requests", type=int, default=30, help="Single-pair requests timed per probe process.")
+    parser.add_argument("--models", nargs="+", default=["lstm", "transformer"], choices=["lstm", "transformer"])
+    parser.add_argument("--output", default=MODEL_RUNTIME_PROFILE_PATH)
+    parser.add_argument("--probe", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.probe:
+        _run_probe(json.loads(args.probe))
+        return 0
+    args.threads = args.threads or _thread_candidates(args.workers_per_host)
+    return 0 if calibrate(args) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
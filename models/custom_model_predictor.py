@@ -1,13 +1,23 @@
 import os
 import json
-import tensorflow as tf
-from tensorflow.keras.preprocessing.sequence import pad_sequences
-from tensorflow.keras.preprocessing.text import tokenizer_from_json
-from transformers import DistilBertTokenizerFast, DistilBertForSequenceClassification
-import torch
+import functools
+import importlib.util
 import numpy as np
 
-from config.constants import MODELS_OUTPUT_DIR
+from config.constants import (
+    MODELS_OUTPUT_DIR,
+    TRANSFORMER_SCORING_MODE,
+    WINDOW_JOB_TOKEN_BUDGET,
+    WINDOW_OVERLAP_TOKENS,
+    WINDOW_POOLING
+)
+from models import runtime_config
+from models.transformer_batching import schedule_batches, pad_batch, padding_stats
+from models.lstm_tokenizer import FastLSTMTokenizer
+
+# TensorFlow, PyTorch and transformers are imported only when the model that needs them is
+# first loaded: a deployment using only rule-based/Gemini scoring never pays for them, and a
+# missing backend makes that model unavailable instead of breaking the app at import time.
 
 # --- Constants and Globals ---
 LSTM_MODEL_FILENAME = "lstm_resume_matcher_model.keras"
@@ -18,6 +28,8 @@ LSTM_TOKENIZER_PATH = os.path.join(MODELS_OUTPUT_DIR, LSTM_TOKENIZER_FILENAME)
 TRANSFORMER_MODEL_DIR = "transformer_resume_matcher_model"
 TRANSFORMER_MODEL_PATH = os.path.join(MODELS_OUTPUT_DIR, TRANSFORMER_MODEL_DIR)
 
+MAX_SEQUENCE_LENGTH_TRANSFORMER = 512
+
 MAX_SEQUENCE_LENGTH_RESUME_LSTM = 500
 MAX_SEQUENCE_LENGTH_JOB_LSTM = 500
 
@@ -25,12 +37,67 @@ _loaded_lstm_model = None
 _loaded_lstm_tokenizer = None
 _loaded_transformer_model = None
 _loaded_transformer_tokenizer = None
-_transformer_device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+_transformer_device = None
+_last_batch_stats = {}
+
+# Backend modules, imported on first use
+_tf = None
+_torch = None
+
+
+def _backend_installed(*module_names) -> bool:
+    return all(importlib.util.find_spec(name) is not None for name in module_names)
+
+
+def is_lstm_available() -> bool:
+    """Cheap check (no imports): TensorFlow is installed and the LSTM model files exist."""
+    return _backend_installed("tensorflow") and os.path.exists(LSTM_MODEL_PATH) and os.path.exists(LSTM_TOKENIZER_PATH)
+
+
+def is_transformer_available() -> bool:
+    """Cheap check (no imports): PyTorch/transformers are installed and the model directory exists."""
+    return _backend_installed("torch", "transformers") and os.path.exists(TRANSFORMER_MODEL_PATH)
+
+
+def _import_tensorflow():
+    global _tf
+    if _tf is None:
+        try:
+            runtime_config.prepare_environment()
+            import tensorflow as tf
+            runtime_config.apply_tensorflow_settings(tf)
+            _tf = tf
+        except ImportError as e:
+            print(f"TensorFlow is not installed; LSTM model unavailable ({e}).")
+    return _tf
+
+
+def _import_torch():
+    global _torch, _transformer_device
+    if _torch is None:
+        try:
+            runtime_config.prepare_environment()
+            import torch
+            runtime_config.apply_torch_settings(torch)
+            _torch = torch
+            _transformer_device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        except ImportError as e:
+            print(f"PyTorch is not installed; Transformer model unavailable ({e}).")
+    return _torch
 
 # --- LSTM ---
 def load_lstm_model_and_tokenizer():
     global _loaded_lstm_model, _loaded_lstm_tokenizer
 
+    if _loaded_lstm_model is not None and _loaded_lstm_tokenizer is not None:
+        return True
+    if not os.path.exists(LSTM_MODEL_PATH):
+        print(f"LSTM model file not found at: {LSTM_MODEL_PATH}")
+        return False
+    tf = _import_tensorflow()
+    if tf is None:
+        return False
+
     if _loaded_lstm_model is None:
         if os.path.exists(LSTM_MODEL_PATH):
             try:
@@ -48,7 +115,7 @@ def load_lstm_model_and_tokenizer():
             try:
                 with open(LSTM_TOKENIZER_PATH, 'r', encoding='utf-8') as f:
                     tokenizer_data = f.read()
-                    _loaded_lstm_tokenizer = tokenizer_from_json(tokenizer_data)
+                    _loaded_lstm_tokenizer = FastLSTMTokenizer.from_json(tokenizer_data)
                 print("LSTM tokenizer loaded.")
             except Exception as e:
                 print(f"Failed to load LSTM tokenizer: {e}")
@@ -65,11 +132,8 @@ def predict_with_lstm(resume_text, job_text):
         return None
 
     try:
-        resume_seq = _loaded_lstm_tokenizer.texts_to_sequences([resume_text])
-        job_seq = _loaded_lstm_tokenizer.texts_to_sequences([job_text])
-
-        resume_padded = pad_sequences(resume_seq, maxlen=MAX_SEQUENCE_LENGTH_RESUME_LSTM, padding='post', truncating='post')
-        job_padded = pad_sequences(job_seq, maxlen=MAX_SEQUENCE_LENGTH_JOB_LSTM, padding='post', truncating='post')
+        resume_padded = _loaded_lstm_tokenizer.texts_to_padded([resume_text], MAX_SEQUENCE_LENGTH_RESUME_LSTM)
+        job_padded = _loaded_lstm_tokenizer.texts_to_padded([job_text], MAX_SEQUENCE_LENGTH_JOB_LSTM)
 
         prediction = _loaded_lstm_model.predict([resume_padded, job_padded], verbose=0)
         return float(np.clip(prediction[0][0] * 100.0, 0.0, 100.0))
@@ -77,6 +141,30 @@ def predict_with_lstm(resume_text, job_text):
         print(f"LSTM prediction error: {e}")
         return None
 
+def predict_batch_with_lstm(pairs, batch_size=None):
+    """
+    Scores many (resume_text, job_text) pairs in batched model calls.
+    Returns a list of scores (0-100) aligned with `pairs`, or None entries if the model is unavailable.
+    """
+    if not pairs:
+        return []
+    if not load_lstm_model_and_tokenizer():
+        print("LSTM model/tokenizer not available.")
+        return [None] * len(pairs)
+
+    batch_size = batch_size or runtime_config.get_runtime_config()["lstm_batch_size"]
+    try:
+        resume_padded = _loaded_lstm_tokenizer.texts_to_padded(
+            [resume_text for resume_text, _ in pairs], MAX_SEQUENCE_LENGTH_RESUME_LSTM)
+        job_padded = _loaded_lstm_tokenizer.texts_to_padded(
+            [job_text for _, job_text in pairs], MAX_SEQUENCE_LENGTH_JOB_LSTM)
+
+        predictions = _loaded_lstm_model.predict([resume_padded, job_padded], batch_size=batch_size, verbose=0)
+        return [float(score) for score in np.clip(predictions[:, 0] * 100.0, 0.0, 100.0)]
+    except Exception as e:
+        print(f"LSTM batch prediction error: {e}")
+        return [None] * len(pairs)
+
 # --- Transformer ---
 def load_transformer_model_and_tokenizer():
     global _loaded_transformer_model, _loaded_transformer_tokenizer
@@ -85,6 +173,16 @@ def load_transformer_model_and_tokenizer():
         print(f"Transformer model directory not found at {TRANSFORMER_MODEL_PATH}")
         return False
 
+    if _loaded_transformer_model is not None and _loaded_transformer_tokenizer is not None:
+        return True
+    if _import_torch() is None:
+        return False
+    try:
+        from transformers import DistilBertTokenizerFast, DistilBertForSequenceClassification
+    except ImportError as e:
+        print(f"transformers is not installed; Transformer model unavailable ({e}).")
+        return False
+
     if _loaded_transformer_model is None:
         try:
             _loaded_transformer_model = DistilBertForSequenceClassification.from_pretrained(TRANSFORMER_MODEL_PATH)
@@ -106,19 +204,152 @@ def load_transformer_model_and_tokenizer():
     return True
 
 def predict_with_transformer(resume_text, job_text):
+    if TRANSFORMER_SCORING_MODE == "windowed":
+        return predict_with_transformer_windowed(resume_text, job_text)
     if not load_transformer_model_and_tokenizer():
         print("Transformer model/tokenizer not available.")
         return None
 
     try:
         combined = resume_text + " [SEP] " + job_text
-        inputs = _loaded_transformer_tokenizer(combined, return_tensors="pt", padding=True, truncation=True, max_length=512)
+        inputs = _loaded_transformer_tokenizer(combined, return_tensors="pt", padding=True, truncation=True, max_length=MAX_SEQUENCE_LENGTH_TRANSFORMER)
         inputs = {k: v.to(_transformer_device) for k, v in inputs.items()}
 
-        with torch.no_grad():
+        with runtime_config.torch_inference_context(_torch):
             outputs = _loaded_transformer_model(**inputs)
             score = outputs.logits.item()
             return float(np.clip(score * 100.0, 0.0, 100.0))
     except Exception as e:
         print(f"Transformer prediction error: {e}")
         return None
+
+def _score_token_sequences(sequences, batch_size, bucket_by_length=True):
+    """
+    Runs the regression head over pre-tokenized sequences (lists of token ids, special tokens
+    included). Sequences are bucketed by length and each batch is padded to its own maximum;
+    scores (0-100, float32) come back in input order together with the padding statistics.
+    """
+    lengths = [len(seq) for seq in sequences]
+    batches = schedule_batches(lengths, batch_size, bucket_by_length=bucket_by_length)
+    pad_id = _loaded_transformer_tokenizer.pad_token_id or 0
+
+    scores = np.empty(len(sequences), dtype=np.float32)
+    with runtime_config.torch_inference_context(_torch):
+        for batch in batches:
+            input_ids, attention_mask = pad_batch([sequences[i] for i in batch], pad_id)
+            logits = _loaded_transformer_model(
+                input_ids=_torch.from_numpy(input_ids).to(_transformer_device),
+                attention_mask=_torch.from_numpy(attention_mask).to(_transformer_device),
+            ).logits[:, 0]
+            scores[batch] = logits.float().cpu().numpy()
+    return np.clip(scores * 100.0, 0.0, 100.0), padding_stats(lengths, batches)
+
+def get_last_batch_stats():
+    """Padding statistics of the most recent batched Transformer call in this process."""
+    return dict(_last_batch_stats)
+
+def predict_batch_with_transformer(pairs, batch_size=None, bucket_by_length=True):
+    """
+    Scores many (resume_text, job_text) pairs in batched forward passes.
+    Pairs are tokenized once without padding, bucketed by token length and padded per batch,
+    so mixed-length inputs (e.g. bulk screening) waste little compute on pad tokens.
+    Returns a list of scores (0-100) aligned with `pairs`, or None entries if the model is unavailable.
+    """
+    global _last_batch_stats
+    if TRANSFORMER_SCORING_MODE == "windowed":
+        return predict_batch_with_transformer_windowed(pairs, batch_size=batch_size)
+    if not pairs:
+        return []
+    if not load_transformer_model_and_tokenizer():
+        print("Transformer model/tokenizer not available.")
+        return [None] * len(pairs)
+
+    batch_size = batch_size or runtime_config.get_runtime_config()["transformer_batch_size"]
+    try:
+        combined = [resume_text + " [SEP] " + job_text for resume_text, job_text in pairs]
+        sequences = _loaded_transformer_tokenizer(combined, truncation=True, max_length=MAX_SEQUENCE_LENGTH_TRANSFORMER)["input_ids"]
+        scores, _last_batch_stats = _score_token_sequences(sequences, batch_size, bucket_by_length=bucket_by_length)
+        print(f"Transformer batch: {len(pairs)} pairs in {_last_batch_stats['batches']} batches, "
+              f"padding efficiency {_last_batch_stats['padding_efficiency']:.1%}")
+        return [float(score) for score in scores]
+    except Exception as e:
+        print(f"Transformer batch prediction error: {e}")
+        return [None] * len(pairs)
+
+# --- Transformer: sliding-window scoring of long resumes ---
+def _softmax_pool(window_scores, temperature=10.0):
+    """Score-weighted mean: close to the max, but a single outlier window counts for less."""
+    weights = np.exp((window_scores - window_scores.max()) / temperature)
+    return float(np.sum(weights * window_scores) / np.sum(weights))
+
+WINDOW_POOLING_FUNCTIONS = {
+    "max": lambda window_scores: float(np.max(window_scores)),
+    "mean": lambda window_scores: float(np.mean(window_scores)),
+    "softmax": _softmax_pool,
+}
+
+@functools.lru_cache(maxsize=1024)
+def _job_window_tokens(job_text, job_token_budget):
+    """Job-text token ids shared by every window of that job (cached across resumes and calls)."""
+    return tuple(_loaded_transformer_tokenizer(
+        job_text, add_special_tokens=False, truncation=True, max_length=job_token_budget
+    )["input_ids"])
+
+def _resume_windows(resume_ids, job_ids, overlap):
+    """[CLS] resume chunk [SEP] job [SEP] sequences covering the whole resume with overlapping chunks."""
+    cls_id, sep_id = _loaded_transformer_tokenizer.cls_token_id, _loaded_transformer_tokenizer.sep_token_id
+    chunk_len = MAX_SEQUENCE_LENGTH_TRANSFORMER - 3 - len(job_ids)
+    stride = max(1, chunk_len - overlap)
+    starts = list(range(0, max(len(resume_ids) - overlap, 1), stride))
+    return [[cls_id] + resume_ids[start:start + chunk_len] + [sep_id] + list(job_ids) + [sep_id] for start in starts]
+
+def predict_batch_with_transformer_windowed(pairs, batch_size=None, pooling=None,
+                                            job_token_budget=WINDOW_JOB_TOKEN_BUDGET, overlap=WINDOW_OVERLAP_TOKENS):
+    """
+    Scores (resume_text, job_text) pairs without dropping the end of long resumes: each resume
+    is split into overlapping chunks, every chunk is paired with the first `job_token_budget`
+    tokens of the job text, all windows of all pairs run as one length-bucketed batch, and each
+    pair's window scores are combined with `pooling` ("max", "mean", "softmax" or a callable).
+    Returns a list of scores (0-100) aligned with `pairs`, or None entries if the model is unavailable.
+    """
+    global _last_batch_stats
+    if not pairs:
+        return []
+    if not load_transformer_model_and_tokenizer():
+        print("Transformer model/tokenizer not available.")
+        return [None] * len(pairs)
+
+    pool = pooling if callable(pooling) else WINDOW_POOLING_FUNCTIONS[pooling or WINDOW_POOLING]
+    # Leave every window room for more new resume tokens than it shares with the previous one
+    job_token_budget = min(job_token_budget, MAX_SEQUENCE_LENGTH_TRANSFORMER - 3 - 2 * overlap)
+    batch_size = batch_size or runtime_config.get_runtime_config()["transformer_batch_size"]
+    try:
+        resume_token_ids = _loaded_transformer_tokenizer(
+            [resume_text for resume_text, _ in pairs], add_special_tokens=False, verbose=False
+        )["input_ids"]
+        windows, window_counts = [], []
+        for resume_ids, (_, job_text) in zip(resume_token_ids, pairs):
+            pair_windows = _resume_windows(resume_ids, _job_window_tokens(job_text, job_token_budget), overlap)
+            windows.extend(pair_windows)
+            window_counts.append(len(pair_windows))
+
+        window_scores, _last_batch_stats = _score_token_sequences(windows, batch_size)
+        if len(pairs) > 1:
+            print(f"Transformer windowed batch: {len(pairs)} pairs -> {len(windows)} windows, "
+                  f"padding efficiency {_last_batch_stats['padding_efficiency']:.1%}")
+        return [pool(scores) for scores in np.split(window_scores, np.cumsum(window_counts)[:-1])]
+    except Exception as e:
+        print(f"Transformer windowed prediction error: {e}")
+        return [None] * len(pairs)
+
+def predict_with_transformer_windowed(resume_text, job_text, pooling=None):
+    return predict_batch_with_transformer_windowed([(resume_text, job_text)], pooling=pooling)[0]
+
+def get_transformer_encoder():
+    """
+    Returns (tokenizer, encoder, device) for the fine-tuned DistilBERT without its regression head,
+    for embedding texts independently (bi-encoder mode). Returns None if the model is unavailable.
+    """
+    if not load_transformer_model_and_tokenizer():
+        return None
+    return _loaded_transformer_tokenizer, _loaded_transformer_model.distilbert, _transformer_device
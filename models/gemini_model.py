@@ -1,6 +1,52 @@
+import os
 import re
 import json
-from config.settings import setup_gemini 
+import time
+import importlib.util
+
+from config.constants import (
+    GEMINI_BATCH_TOKEN_BUDGET,
+    GEMINI_BATCH_MAX_RESUMES,
+    GEMINI_MAX_OUTPUT_TOKENS,
+    GEMINI_OUTPUT_TOKENS_PER_RESUME,
+    GEMINI_RESUME_MAX_CHARS,
+    GEMINI_CHARS_PER_TOKEN
+)
+
+# Token usage and timing of the last analyze_resumes_with_gemini_batch call
+_last_batch_stats = {}
+
+
+def is_gemini_available():
+    """Cheap check (no imports): the Gemini SDK is installed and an API key is configured."""
+    from dotenv import load_dotenv
+    load_dotenv()
+    return importlib.util.find_spec("google.generativeai") is not None and bool(os.getenv("GEMINI_API_KEY"))
+
+def _job_description_prompt_text(job_details_dict_input):
+    return f"""
+    Job Title: {job_details_dict_input.get("Job Title", "N/A")}
+    Company: {job_details_dict_input.get("Company Name", "N/A")}
+    Full Job Description: {job_details_dict_input.get("Job Description", "N/A")}
+    Location: {job_details_dict_input.get("Location", "N/A")}
+    Experience Level Required: {job_details_dict_input.get("Experience Level", "N/A")}
+    Skills Required: {job_details_dict_input.get("Skills Required", "N/A")}
+    Industry: {job_details_dict_input.get("Industry", "N/A")}
+    Employment Mode: {job_details_dict_input.get("Employment Mode","N/A")}
+    """
+
+
+def _response_text(response):
+    """Concatenated text parts of a Gemini response, stripped."""
+    response_text = ""
+    for part in response.parts:
+        try:
+            response_text += part.text
+        except ValueError:
+            print(f"Skipping a non-text part in Gemini response: {type(part)}")
+            continue
+    return response_text.strip()
+
 
 def analyze_resume_with_gemini(resume_text_input, job_details_dict_input):
     """
@@ -16,6 +62,8 @@ def analyze_resume_with_gemini(resume_text_input, job_details_dict_input):
         dict: A dictionary containing the analysis from Gemini, or an error dictionary.
     """
     try:
+        # Imported here so google.generativeai (and the API key check) load on first Gemini use
+        from config.settings import setup_gemini
         # Initialize the Gemini model instance
         model_instance = setup_gemini() 
         if not model_instance:
@@ -26,16 +74,7 @@ def analyze_resume_with_gemini(resume_text_input, job_details_dict_input):
         return {"error": f"Gemini setup failed: {e_setup}", "raw_response": ""}
 
     # Construct the job description prompt text
-    job_description_prompt_text = f"""
-    Job Title: {job_details_dict_input.get("Job Title", "N/A")}
-    Company: {job_details_dict_input.get("Company Name", "N/A")}
-    Full Job Description: {job_details_dict_input.get("Job Description", "N/A")}
-    Location: {job_details_dict_input.get("Location", "N/A")}
-    Experience Level Required: {job_details_dict_input.get("Experience Level", "N/A")}
-    Skills Required: {job_details_dict_input.get("Skills Required", "N/A")}
-    Industry: {job_details_dict_input.get("Industry", "N/A")}
-    Employment Mode: {job_details_dict_input.get("Employment Mode","N/A")}
-    """
+    job_description_prompt_text = _job_description_prompt_text(job_details_dict_input)
 
     prompt = (
         "You are an expert Talent Acquisition Specialist and Resume Analyzer AI. "
@@ -69,15 +108,7 @@ def analyze_resume_with_gemini(resume_text_input, job_details_dict_input):
             print("Gemini response has no parts.")
             return {"error": "Gemini response has no parts", "raw_response": str(response)}
         
-        response_text = ""
-        for part in response.parts:
-            try:
-                response_text += part.text
-            except ValueError:
-                print(f"Skipping a non-text part in Gemini response: {type(part)}")
-                continue
-        
-        response_text = response_text.strip()
+        response_text = _response_text(response)
         if not response_text:
             print("Gemini response text is empty after stripping.")
             return {"error": "Empty response text from Gemini", "raw_response": str(response)}
@@ -109,4 +140,220 @@ def analyze_resume_with_gemini(resume_text_input, job_details_dict_input):
     except Exception as e:
         print(f"An unexpected error occurred in analyze_resume_with_gemini: {e}")
         # raw_resp_text_on_error = response.text if 'response' in locals() and hasattr(response, 'text') else "No response object or text attribute"
-        return {"error": f"Unexpected error: {e}", "raw_response": "Unexpected error during Gemini call."}
\ No newline at end of file
+        return {"error": f"Unexpected error: {e}", "raw_response": "Unexpected error during Gemini call."}
+
+
+# --- Packed (multi-resume) analysis for bulk screening ---
+# One request carries the job description once plus several compacted resumes and asks for a
+# JSON array with one analysis per resume, so the long job preamble and the per-request overhead
+# are paid once per batch instead of once per resume.
+
+BATCH_ANALYSIS_FIELDS = {
+    "match_score": int,
+    "skill_match_score": int,
+    "experience_match_score": int,
+    "matched_skills": list,
+    "missing_skills_from_resume": list,
+    "suitability_summary": str,
+    "suggestions_for_candidate": str,
+}
+
+
+def compact_resume_text(resume_text, max_chars=GEMINI_RESUME_MAX_CHARS):
+    """Collapses whitespace, drops repeated lines (headers/footers of every page) and caps the length."""
+    seen_lines = set()
+    kept_lines = []
+    for line in str(resume_text or "").splitlines():
+        line = re.sub(r"\s+", " ", line).strip()
+        if line and line.lower() not in seen_lines:
+            seen_lines.add(line.lower())
+            kept_lines.append(line)
+    return "\n".join(kept_lines)[:max_chars]
+
+
+def estimate_tokens(text):
+    """Rough prompt token count (Gemini averages about GEMINI_CHARS_PER_TOKEN characters per token)."""
+    return len(text) // GEMINI_CHARS_PER_TOKEN + 1
+
+
+def plan_gemini_batches(resume_token_counts, job_tokens, token_budget=GEMINI_BATCH_TOKEN_BUDGET,
+                        max_batch_size=GEMINI_BATCH_MAX_RESUMES):
+    """
+    Greedily packs resumes (in input order) into batches whose estimated prompt stays within
+    `token_budget` (job description counted once per batch) and whose answers fit the model's
+    output limit. A resume too large for any batch still gets a batch of its own.
+    """
+    max_by_output = max(1, GEMINI_MAX_OUTPUT_TOKENS // GEMINI_OUTPUT_TOKENS_PER_RESUME)
+    max_batch_size = max(1, min(max_batch_size, max_by_output))
+    batches, current, current_tokens = [], [], job_tokens
+    for index, tokens in enumerate(resume_token_counts):
+        if current and (current_tokens + tokens > token_budget or len(current) >= max_batch_size):
+            batches.append(current)
+            current, current_tokens = [], job_tokens
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def validate_gemini_analysis(item):
+    """The analysis dict with scores clamped to 0-100 if it has every BATCH_ANALYSIS_FIELDS field with a usable type, else None."""
+    if not isinstance(item, dict):
+        return None
+    analysis = dict(item)
+    for field, field_type in BATCH_ANALYSIS_FIELDS.items():
+        value = analysis.get(field)
+        if field_type is int:
+            try:
+                analysis[field] = max(0, min(100, int(round(float(value)))))
+            except (TypeError, ValueError):
+                return None
+        elif not isinstance(value, field_type):
+            return None
+    return analysis
+
+
+def _batch_prompt(job_description_prompt_text, compacted_resumes):
+    resumes_block = "\n\n".join(
+        f"=== Resume {position} ===\n{resume_text}" for position, resume_text in enumerate(compacted_resumes)
+    )
+    return (
+        "You are an expert Talent Acquisition Specialist and Resume Analyzer AI. "
+        "Analyze EACH candidate resume below independently against the same job description. "
+        "Recognize skill variations (e.g., ReactJS, React JS, React are the same; Node.js, NodeJS are the same). "
+        "Be realistic and critical in your assessment.\n\n"
+        f"Job Description Details:\n{job_description_prompt_text}\n\n"
+        f"Candidate Resumes ({len(compacted_resumes)}):\n{resumes_block}\n\n"
+        f"Return ONLY a JSON array with exactly {len(compacted_resumes)} objects, one per resume, each with:\n"
+        "{\n"
+        '  "resume_index": (integer, the number after "Resume" above),\n'
+        '  "match_score": (integer, 0-100, overall fit),\n'
+        '  "skill_match_score": (integer, 0-100),\n'
+        '  "experience_match_score": (integer, 0-100),\n'
+        '  "matched_skills": ["skills", "in", "both"],\n'
+        '  "missing_skills_from_resume": ["required", "skills", "not", "in", "resume"],\n'
+        '  "suitability_summary": "(concise: fit, key strengths, critical weaknesses)",\n'
+        '  "suggestions_for_candidate": "(1-2 specific, actionable suggestions)"\n'
+        "}"
+    )
+
+
+def _usage_tokens(response, estimated_prompt_tokens):
+    """(prompt, output) token counts reported by Gemini, or the prompt estimate if usage is missing."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return estimated_prompt_tokens, 0
+    return int(getattr(usage, "prompt_token_count", 0) or 0), int(getattr(usage, "candidates_token_count", 0) or 0)
+
+
+def _run_packed_batch(model_instance, job_description_prompt_text, compacted_resumes):
+    """
+    One packed request. Returns ({position: validated analysis}, prompt_tokens, output_tokens);
+    positions missing from the dict (absent, duplicated or invalid in the answer) must be retried.
+    """
+    prompt = _batch_prompt(job_description_prompt_text, compacted_resumes)
+    response = model_instance.generate_content(
+        prompt,
+        generation_config={"response_mime_type": "application/json",
+                           "max_output_tokens": GEMINI_MAX_OUTPUT_TOKENS}
+    )
+    prompt_tokens, output_tokens = _usage_tokens(response, estimate_tokens(prompt))
+    response_text = _response_text(response) if response.parts else ""
+
+    json_block_match = re.search(r'```(?:json)?\s*(\[.*\])\s*```', response_text, re.DOTALL)
+    if json_block_match:
+        response_text = json_block_match.group(1)
+    first_bracket, last_bracket = response_text.find('['), response_text.rfind(']')
+    try:
+        items = json.loads(response_text[first_bracket:last_bracket + 1]) if 0 <= first_bracket < last_bracket else []
+    except json.JSONDecodeError as json_e:
+        print(f"Error decoding packed Gemini response: {json_e}")
+        items = []
+
+    analyses, duplicated = {}, set()
+    for position, item in enumerate(items if isinstance(items, list) else []):
+        # Trust the echoed index; fall back to array order only if the model left it out
+        resume_index = item.get("resume_index", position) if isinstance(item, dict) else position
+        if not isinstance(resume_index, int) or not 0 <= resume_index < len(compacted_resumes):
+            continue
+        analysis = validate_gemini_analysis(item)
+        if resume_index in analyses:
+            duplicated.add(resume_index)
+        elif analysis is not None:
+            analysis.pop("resume_index", None)
+            analyses[resume_index] = analysis
+    for resume_index in duplicated:
+        analyses.pop(resume_index, None)
+    return analyses, prompt_tokens, output_tokens
+
+
+def analyze_resumes_with_gemini_batch(resume_texts, job_details_dict_input, token_budget=GEMINI_BATCH_TOKEN_BUDGET,
+                                      max_batch_size=GEMINI_BATCH_MAX_RESUMES):
+    """
+    Analyzes several resumes against one job with packed Gemini requests (bulk screening).
+
+    Resumes are compacted, packed into batches that fit `token_budget` (see plan_gemini_batches)
+    and each batch is one request answered with a JSON array. Every element is validated; only
+    resumes whose element is missing or invalid are re-issued one by one through
+    analyze_resume_with_gemini.
+
+    Returns:
+        list: One dict per input resume, in input order, shaped like analyze_resume_with_gemini's
+              result (an {"error": ...} dict for resumes that failed even when retried alone).
+    """
+    global _last_batch_stats
+    start = time.perf_counter()
+    results = [None] * len(resume_texts)
+    if not resume_texts:
+        return results
+    try:
+        from config.settings import setup_gemini
+        model_instance = setup_gemini()
+    except Exception as e_setup:
+        print(f"Error during Gemini setup in analyze_resumes_with_gemini_batch: {e_setup}")
+        return [{"error": f"Gemini setup failed: {e_setup}", "raw_response": ""} for _ in resume_texts]
+
+    job_description_prompt_text = _job_description_prompt_text(job_details_dict_input)
+    compacted = [compact_resume_text(text) for text in resume_texts]
+    batches = plan_gemini_batches([estimate_tokens(text) for text in compacted],
+                                  estimate_tokens(job_description_prompt_text), token_budget, max_batch_size)
+
+    stats = {"resumes": len(resume_texts), "packed_requests": len(batches), "retried": 0,
+             "prompt_tokens": 0, "output_tokens": 0}
+    for batch in batches:
+        try:
+            analyses, prompt_tokens, output_tokens = _run_packed_batch(
+                model_instance, job_description_prompt_text, [compacted[i] for i in batch])
+            stats["prompt_tokens"] += prompt_tokens
+            stats["output_tokens"] += output_tokens
+        except Exception as e:
+            print(f"Packed Gemini request for {len(batch)} resume(s) failed: {e}")
+            analyses = {}
+        for position, resume_index in enumerate(batch):
+            results[resume_index] = analyses.get(position)
+
+    # Re-issue only the failed elements, each on its own
+    for resume_index, analysis in enumerate(results):
+        if analysis is None:
+            stats["retried"] += 1
+            single = analyze_resume_with_gemini(compacted[resume_index], job_details_dict_input)
+            stats["prompt_tokens"] += estimate_tokens(compacted[resume_index] + job_description_prompt_text)
+            if "error" not in single:
+                single = validate_gemini_analysis(single) or {
+                    "error": "Gemini analysis is missing required fields", "raw_response": json.dumps(single)[:500]}
+            results[resume_index] = single
+
+    stats["wall_time_s"] = time.perf_counter() - start
+    stats["seconds_per_resume"] = stats["wall_time_s"] / len(resume_texts)
+    stats["prompt_tokens_per_resume"] = stats["prompt_tokens"] / len(resume_texts)
+    _last_batch_stats = stats
+    print(f"Gemini packed analysis: {len(resume_texts)} resumes in {len(batches)} request(s) "
+          f"(+{stats['retried']} retried alone), {stats['prompt_tokens_per_resume']:.0f} prompt tokens "
+          f"and {stats['seconds_per_resume']:.2f} s per resume.")
+    return results
+
+
+def get_last_gemini_batch_stats():
+    """Token usage and timing of the last analyze_resumes_with_gemini_batch call."""
+    return dict(_last_batch_stats)
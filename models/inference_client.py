@@ -0,0 +1,133 @@
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+
+from config.inference_config import INFERENCE_SERVER_ADDRESS, inference_authkey, parse_address
+
+# App-side entry points for the LSTM and Transformer models, with the same signatures and return
+# values as models.custom_model_predictor. When INFERENCE_SERVER_ADDRESS is set, requests go to
+# the inference worker pool (python -m models.inference_server) and the models are never loaded
+# in this process; otherwise they fall through to the in-process implementations.
+
+# One connection per thread: Streamlit runs each session's script on its own thread.
+_local = threading.local()
+
+
+def use_inference_server() -> bool:
+    return bool(INFERENCE_SERVER_ADDRESS)
+
+
+def _connection():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        authkey = inference_authkey()
+        if authkey is None:
+            raise OSError("no inference server key: set INFERENCE_SERVER_AUTHKEY or start the server on this host first")
+        conn = Client(parse_address(INFERENCE_SERVER_ADDRESS), authkey=authkey)
+        _local.conn = conn
+    return conn
+
+
+def _drop_connection():
+    conn = getattr(_local, "conn", None)
+    _local.conn = None
+    if conn is not None:
+        try:
+            conn.close()
+        except OSError:
+            pass
+
+
+def _request(payload: dict):
+    """Send one request to the inference server; returns the response dict, or None on failure."""
+    for attempt in range(2):
+        try:
+            conn = _connection()
+            conn.send(payload)
+            return conn.recv()
+        except (OSError, EOFError, AuthenticationError) as e:
+            # A stale connection (server restarted, possibly with a new key) gets one reconnect before giving up
+            _drop_connection()
+            if attempt == 1:
+                print(f"Inference server at {INFERENCE_SERVER_ADDRESS} unreachable: {e}")
+    return None
+
+
+def _remote_predict(model_name, resume_text, job_text):
+    response = _request({"op": "predict", "model": model_name, "resume_text": resume_text, "job_text": job_text})
+    if not response:
+        return None
+    if not response.get("ok"):
+        print(f"Inference server could not score with {model_name}: {response.get('error')}")
+        return None
+    return response.get("score")
+
+
+def _remote_predict_batch(model_name, pairs):
+    pairs = [(resume_text, job_text) for resume_text, job_text in pairs]
+    response = _request({"op": "predict_batch", "model": model_name, "pairs": pairs})
+    if not response or not response.get("ok"):
+        if response:
+            print(f"Inference server could not score a batch with {model_name}: {response.get('error')}")
+        return [None] * len(pairs)
+    return response.get("scores")
+
+
+def _remote_status(model_name) -> bool:
+    response = _request({"op": "status"})
+    return bool(response and response.get("ok") and response["status"].get(model_name))
+
+
+def model_availability() -> dict:
+    """{"lstm": bool, "transformer": bool} without loading either model in this process."""
+    if use_inference_server():
+        response = _request({"op": "status"})
+        status = response.get("status", {}) if response and response.get("ok") else {}
+        return {"lstm": bool(status.get("lstm")), "transformer": bool(status.get("transformer"))}
+    from models import custom_model_predictor
+    return {
+        "lstm": custom_model_predictor.is_lstm_available(),
+        "transformer": custom_model_predictor.is_transformer_available(),
+    }
+
+
+def load_lstm_model_and_tokenizer():
+    if use_inference_server():
+        return _remote_status("lstm")
+    from models import custom_model_predictor
+    return custom_model_predictor.load_lstm_model_and_tokenizer()
+
+
+def load_transformer_model_and_tokenizer():
+    if use_inference_server():
+        return _remote_status("transformer")
+    from models import custom_model_predictor
+    return custom_model_predictor.load_transformer_model_and_tokenizer()
+
+
+def predict_with_lstm(resume_text, job_text):
+    if use_inference_server():
+        return _remote_predict("lstm", resume_text, job_text)
+    from models import custom_model_predictor
+    return custom_model_predictor.predict_with_lstm(resume_text, job_text)
+
+
+def predict_with_transformer(resume_text, job_text):
+    if use_inference_server():
+        return _remote_predict("transformer", resume_text, job_text)
+    from models import custom_model_predictor
+    return custom_model_predictor.predict_with_transformer(resume_text, job_text)
+
+
+def predict_batch_with_lstm(pairs, batch_size=None):
+    if use_inference_server():
+        return _remote_predict_batch("lstm", pairs)
+    from models import custom_model_predictor
+    return custom_model_predictor.predict_batch_with_lstm(pairs, batch_size=batch_size)
+
+
+def predict_batch_with_transformer(pairs, batch_size=None):
+    if use_inference_server():
+        return _remote_predict_batch("transformer", pairs)
+    from models import custom_model_predictor
+    return custom_model_predictor.predict_batch_with_transformer(pairs, batch_size=batch_size)
@@ -0,0 +1,191 @@
+import os
+import sys
+import argparse
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from multiprocessing.connection import Listener
+
+from config.constants import (
+    INFERENCE_SERVER_HOST,
+    INFERENCE_SERVER_PORT,
+    INFERENCE_WORKERS,
+    INFERENCE_WORKER_THREADS,
+    INFERENCE_MAX_PENDING,
+    INFERENCE_QUEUE_TIMEOUT_S,
+    INFERENCE_REQUEST_TIMEOUT_S
+)
+from config.inference_config import INFERENCE_SERVER_AUTHKEY, inference_authkey
+
+MODEL_NAMES = ("lstm", "transformer")
+
+
+# --- Worker process side ---
+def _init_worker(num_threads):
+    """Runs once in each worker: pin its thread pools (models.runtime_config), then load both models."""
+    if num_threads:
+        os.environ["MODEL_INTRA_OP_THREADS"] = str(num_threads)
+
+    from models import custom_model_predictor
+    custom_model_predictor.load_lstm_model_and_tokenizer()
+    custom_model_predictor.load_transformer_model_and_tokenizer()
+    print(f"Inference worker {os.getpid()} ready.")
+
+
+def _worker_predict(model_name, resume_text, job_text):
+    from models import custom_model_predictor
+    if model_name == "lstm":
+        return custom_model_predictor.predict_with_lstm(resume_text, job_text)
+    return custom_model_predictor.predict_with_transformer(resume_text, job_text)
+
+
+def _worker_predict_batch(model_name, pairs):
+    from models import custom_model_predictor
+    if model_name == "lstm":
+        return custom_model_predictor.predict_batch_with_lstm(pairs)
+    return custom_model_predictor.predict_batch_with_transformer(pairs)
+
+
+def _worker_status():
+    from models import custom_model_predictor
+    return {
+        "lstm": custom_model_predictor.load_lstm_model_and_tokenizer(),
+        "transformer": custom_model_predictor.load_transformer_model_and_tokenizer(),
+    }
+
+
+# --- Server side ---
+class InferenceServer:
+    """
+    Accepts connections from app processes and runs predictions on a pool of worker processes.
+    At most `max_pending` requests are running or queued at once; a request that cannot get a
+    slot within `queue_timeout` seconds is answered with {"ok": False, "error": "busy"} so the
+    caller can fall back instead of piling up behind a saturated pool.
+    """
+
+    def __init__(self, host=INFERENCE_SERVER_HOST, port=INFERENCE_SERVER_PORT, workers=INFERENCE_WORKERS,
+                 worker_threads=INFERENCE_WORKER_THREADS, max_pending=INFERENCE_MAX_PENDING,
+                 queue_timeout=INFERENCE_QUEUE_TIMEOUT_S, request_timeout=INFERENCE_REQUEST_TIMEOUT_S,
+                 authkey=None):
+        self.address = (host, port)
+        self.workers = workers
+        # Never None: an unauthenticated Listener would unpickle whatever any local user sends
+        self.authkey = authkey.encode("utf-8") if authkey else inference_authkey(create=True)
+        self.queue_timeout = queue_timeout
+        self.request_timeout = request_timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        # Without an explicit thread count, workers split the cores (unless a calibrated profile says otherwise)
+        os.environ.setdefault("MODEL_WORKERS_PER_HOST", str(workers))
+        # "spawn": workers must not inherit a half-initialized TensorFlow/PyTorch runtime via fork
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(worker_threads,),
+        )
+        self.status = {name: False for name in MODEL_NAMES}
+
+    def start_workers(self):
+        """Start every worker (loading its models) and record which models are available."""
+        warmups = [self._executor.submit(_worker_status) for _ in range(self.workers)]
+        self.status = warmups[0].result()
+        for future in warmups[1:]:
+            future.result()
+        print(f"Inference workers started. Model availability: {self.status}")
+
+    def _predict(self, request):
+        """Run a single ("predict") or batched ("predict_batch") request on a worker, holding one slot."""
+        model_name = request.get("model")
+        if model_name not in MODEL_NAMES:
+            return {"ok": False, "error": f"unknown model '{model_name}'"}
+        batched = request.get("op") == "predict_batch"
+        if not self.status.get(model_name):
+            return {"ok": True, "scores": [None] * len(request.get("pairs", []))} if batched else {"ok": True, "score": None}
+
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            return {"ok": False, "error": "busy"}
+        try:
+            if batched:
+                future = self._executor.submit(_worker_predict_batch, model_name, request.get("pairs", []))
+            else:
+                future = self._executor.submit(
+                    _worker_predict, model_name, request.get("resume_text", ""), request.get("job_text", "")
+                )
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            result = future.result(timeout=self.request_timeout)
+        except FutureTimeoutError:
+            return {"ok": False, "error": "timeout"}
+        return {"ok": True, "scores": result} if batched else {"ok": True, "score": result}
+
+    def _handle_connection(self, conn):
+        try:
+            while True:
+                try:
+                    request = conn.recv()
+                except EOFError:
+                    break
+                try:
+                    if request.get("op") == "status":
+                        response = {"ok": True, "status": self.status}
+                    elif request.get("op") in ("predict", "predict_batch"):
+                        response = self._predict(request)
+                    else:
+                        response = {"ok": False, "error": f"unknown op '{request.get('op')}'"}
+                except Exception as e:
+                    print(f"Inference request failed: {e}")
+                    response = {"ok": False, "error": str(e)}
+                conn.send(response)
+        except (OSError, EOFError) as e:
+            print(f"Inference client connection closed: {e}")
+        finally:
+            conn.close()
+
+    def serve_forever(self):
+        with Listener(self.address, authkey=self.authkey) as listener:
+            print(f"Inference server listening on {self.address[0]}:{self.address[1]}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    # Failed handshakes (e.g. wrong authkey) must not take the server down
+                    print(f"Rejected inference client connection: {e}")
+                    continue
+                threading.Thread(target=self._handle_connection, args=(conn,), daemon=True).start()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the LSTM/Transformer inference worker pool.")
+    parser.add_argument("--host", default=INFERENCE_SERVER_HOST)
+    parser.add_argument("--port", type=int, default=INFERENCE_SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=INFERENCE_WORKERS)
+    parser.add_argument("--worker-threads", type=int, default=INFERENCE_WORKER_THREADS)
+    parser.add_argument("--max-pending", type=int, default=INFERENCE_MAX_PENDING)
+    args = parser.parse_args(argv)
+
+    if args.host not in ("127.0.0.1", "localhost") and not INFERENCE_SERVER_AUTHKEY:
+        print("Refusing to listen on a non-loopback address without INFERENCE_SERVER_AUTHKEY set.")
+        return 1
+
+    server = InferenceServer(
+        host=args.host, port=args.port, workers=args.workers,
+        worker_threads=args.worker_threads, max_pending=args.max_pending,
+    )
+    try:
+        server.start_workers()
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Inference server stopping...")
+    finally:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,349 @@
+import os
+import uuid
+import tempfile
+
+import numpy as np
+
+from models.custom_model_predictor import get_transformer_encoder
+from models.runtime_config import torch_inference_context
+from services.retrieval_index import job_document, content_hash
+from config.constants import (
+    JOB_EMBEDDINGS_DIR,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_ANN_MIN_JOBS,
+    EMBEDDING_ANN_N_PROBE
+)
+
+# meta.npz names the current embeddings file; it is replaced last, so readers always see a
+# consistent (embeddings, job_ids) pair even while a writer is publishing a new version.
+META_FILENAME = "meta.npz"
+
+_store = None
+
+
+# --- Encoding ---
+def encode_texts(texts, batch_size=EMBEDDING_BATCH_SIZE):
+    """
+    Encodes texts with the fine-tuned DistilBERT encoder (masked mean of the last hidden state,
+    L2-normalized). Returns a float32 array of shape (len(texts), hidden_dim), or None if the
+    Transformer model is unavailable.
+    """
+    encoder = get_transformer_encoder()
+    if encoder is None:
+        print("Transformer encoder not available for embeddings.")
+        return None
+    import torch  # already loaded with the encoder
+    tokenizer, model, device = encoder
+
+    embeddings = np.empty((len(texts), model.config.dim), dtype=np.float32)
+    # Encode in length order so each batch pads to similar lengths
+    order = np.argsort([len(t) for t in texts], kind="stable")
+    with torch_inference_context(torch):
+        for start in range(0, len(texts), batch_size):
+            batch_idx = order[start:start + batch_size]
+            inputs = tokenizer([texts[i] for i in batch_idx], return_tensors="pt",
+                               padding=True, truncation=True, max_length=512)
+            inputs = {k: v.to(device) for k, v in inputs.items()}
+            hidden = model(**inputs).last_hidden_state
+            mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1.0)
+            embeddings[batch_idx] = torch.nn.functional.normalize(pooled, dim=1).cpu().numpy()
+    return embeddings
+
+
+# --- Storage ---
+class _EmbeddingStore:
+    def __init__(self, embeddings, job_ids, content_hashes, centroids=None, assignments=None, mtime=None):
+        self.embeddings = embeddings  # float32 (n, dim), usually a read-only memmap
+        self.job_ids = np.asarray(job_ids, dtype=np.int64)
+        self.content_hashes = list(content_hashes)
+        self.centroids = centroids
+        self.assignments = assignments
+        self.mtime = mtime
+        self._build_inverted_lists()
+
+    def _build_inverted_lists(self):
+        if self.centroids is None or self.assignments is None:
+            self._list_order = self._list_offsets = None
+            return
+        self._list_order = np.argsort(self.assignments, kind="stable")
+        self._list_offsets = np.searchsorted(self.assignments[self._list_order], np.arange(len(self.centroids) + 1))
+
+    @property
+    def has_ann(self):
+        return self._list_order is not None
+
+    def search(self, query_vec, k, approximate=None):
+        n_jobs = self.embeddings.shape[0]
+        if n_jobs == 0:
+            return []
+        if approximate is None:
+            approximate = self.has_ann and n_jobs >= EMBEDDING_ANN_MIN_JOBS
+
+        if approximate and self.has_ann:
+            # IVF: scan only the rows of the lists whose centroids are closest to the query
+            n_probe = min(EMBEDDING_ANN_N_PROBE, len(self.centroids))
+            probe_lists = np.argpartition(-(self.centroids @ query_vec), n_probe - 1)[:n_probe]
+            candidates = np.concatenate([
+                self._list_order[self._list_offsets[l]:self._list_offsets[l + 1]] for l in probe_lists
+            ])
+            scores = self.embeddings[candidates] @ query_vec
+        else:
+            # Exact brute force: one matrix-vector product over the whole catalog
+            candidates = None
+            scores = self.embeddings @ query_vec
+
+        k = min(k, scores.shape[0])
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        rows = candidates[top] if candidates is not None else top
+        return [(int(self.job_ids[row]), float(score)) for row, score in zip(rows, scores[top])]
+
+
+def _meta_path():
+    return os.path.join(JOB_EMBEDDINGS_DIR, META_FILENAME)
+
+
+def _load():
+    meta_path = _meta_path()
+    if not os.path.exists(meta_path):
+        return None
+    try:
+        with np.load(meta_path) as meta:
+            embeddings_path = os.path.join(JOB_EMBEDDINGS_DIR, str(meta["embeddings_file"]))
+            embeddings = np.load(embeddings_path, mmap_mode="r")
+            centroids = meta["centroids"] if "centroids" in meta.files else None
+            assignments = meta["assignments"] if "assignments" in meta.files else None
+            store = _EmbeddingStore(
+                embeddings, meta["job_ids"], meta["content_hashes"].tolist(),
+                centroids=centroids, assignments=assignments, mtime=os.path.getmtime(meta_path),
+            )
+        if store.embeddings.shape[0] != len(store.job_ids):
+            print("Job embeddings and job IDs are out of sync; ignoring stored embeddings.")
+            return None
+        return store
+    except Exception as e:
+        print(f"Failed to load job embeddings from {JOB_EMBEDDINGS_DIR}: {e}")
+        return None
+
+
+def _save(store: _EmbeddingStore):
+    """Publish a new embeddings file, then atomically swap meta.npz to point at it."""
+    os.makedirs(JOB_EMBEDDINGS_DIR, exist_ok=True)
+    previous_file = None
+    if os.path.exists(_meta_path()):
+        with np.load(_meta_path()) as old_meta:
+            previous_file = str(old_meta["embeddings_file"])
+
+    embeddings_file = f"embeddings-{uuid.uuid4().hex}.npy"
+    np.save(os.path.join(JOB_EMBEDDINGS_DIR, embeddings_file), np.ascontiguousarray(store.embeddings, dtype=np.float32))
+
+    meta = {
+        "embeddings_file": np.asarray(embeddings_file),
+        "job_ids": store.job_ids,
+        "content_hashes": np.asarray(store.content_hashes, dtype="U40"),
+    }
+    if store.centroids is not None and store.assignments is not None:
+        meta["centroids"] = store.centroids
+        meta["assignments"] = store.assignments
+
+    fd, tmp_path = tempfile.mkstemp(suffix=".npz", dir=JOB_EMBEDDINGS_DIR)
+    with os.fdopen(fd, "wb") as f:
+        np.savez(f, **meta)
+    os.replace(tmp_path, _meta_path())
+    store.mtime = os.path.getmtime(_meta_path())
+
+    # Processes that still map the old file keep a valid handle after unlink on POSIX.
+    if previous_file and previous_file != embeddings_file:
+        try:
+            os.remove(os.path.join(JOB_EMBEDDINGS_DIR, previous_file))
+        except OSError:
+            pass
+    # Reopen the published matrix as a memory map so this process does not keep its own copy.
+    store.embeddings = np.load(os.path.join(JOB_EMBEDDINGS_DIR, embeddings_file), mmap_mode="r")
+
+
+def has_job_embeddings() -> bool:
+    """Whether an embedding store has been built (bi-encoder mode is set up); does not load torch."""
+    return os.path.exists(_meta_path())
+
+
+def _current_store():
+    """Return the in-process store, reloading it if another process published a new version."""
+    global _store
+    meta_path = _meta_path()
+    disk_mtime = os.path.getmtime(meta_path) if os.path.exists(meta_path) else None
+    if _store is None or (disk_mtime is not None and disk_mtime != _store.mtime):
+        _store = _load() or _store
+    return _store
+
+
+def _apply_changes(store, upserts: dict, removed_ids: set):
+    """Return a new store with `upserts` ({job_id: document}) encoded and `removed_ids` dropped."""
+    new_ids = list(upserts)
+    new_embeddings = None
+    if new_ids:
+        new_embeddings = encode_texts([upserts[job_id] for job_id in new_ids])
+        if new_embeddings is None:
+            return None
+
+    if store is None:
+        dim = new_embeddings.shape[1] if new_embeddings is not None else 0
+        store = _EmbeddingStore(np.empty((0, dim), dtype=np.float32), [], [])
+
+    drop = removed_ids | set(new_ids)
+    keep_mask = ~np.isin(store.job_ids, np.fromiter(drop, dtype=np.int64, count=len(drop)))
+    embeddings = np.asarray(store.embeddings[keep_mask])
+    job_ids = store.job_ids[keep_mask]
+    content_hashes = [h for h, keep in zip(store.content_hashes, keep_mask) if keep]
+    assignments = store.assignments[keep_mask] if store.has_ann else None
+
+    if new_ids:
+        embeddings = np.vstack([embeddings, new_embeddings])
+        job_ids = np.concatenate([job_ids, np.asarray(new_ids, dtype=np.int64)])
+        content_hashes += [content_hash(upserts[job_id]) for job_id in new_ids]
+        if store.has_ann:
+            # New rows join their nearest existing IVF list; rebuild the lists with build_ann_index()
+            assignments = np.concatenate([assignments, np.argmax(new_embeddings @ store.centroids.T, axis=1)])
+
+    return _EmbeddingStore(embeddings, job_ids, content_hashes,
+                           centroids=store.centroids if store.has_ann else None, assignments=assignments)
+
+
+def upsert_job_embeddings(jobs: list) -> int:
+    """
+    Encode new or edited jobs (dicts with an 'id'); unchanged jobs are skipped. Without a store
+    the whole catalog is encoded instead, not just these jobs.
+    """
+    global _store
+    store = _current_store()
+    if store is None:
+        return sync_job_embeddings()["encoded"]
+    known = dict(zip(store.job_ids.tolist(), store.content_hashes))
+    upserts = {}
+    for job in jobs:
+        if job.get("id") is None:
+            continue
+        document = job_document(job)
+        if known.get(int(job["id"])) != content_hash(document):
+            upserts[int(job["id"])] = document
+    if not upserts:
+        return 0
+
+    updated = _apply_changes(store, upserts, set())
+    if updated is None:
+        return 0
+    _save(updated)
+    _store = updated
+    return len(upserts)
+
+
+def remove_job_embeddings(job_ids: list) -> int:
+    """Drop the given job IDs from the embedding matrix."""
+    global _store
+    store = _current_store()
+    if store is None:
+        return 0
+    removed = set(int(job_id) for job_id in job_ids) & set(store.job_ids.tolist())
+    if removed:
+        updated = _apply_changes(store, {}, removed)
+        _save(updated)
+        _store = updated
+    return len(removed)
+
+
+def sync_job_embeddings(jobs_df=None) -> dict:
+    """
+    Bring the embedding matrix in line with the jobs table, encoding only new or edited jobs.
+    Loads the jobs from Supabase when `jobs_df` is not given. An empty job list (load_jobs' result
+    when Supabase fails) leaves the store untouched rather than removing every embedding.
+    """
+    global _store
+    if jobs_df is None:
+        from services.job_service import load_jobs  # local import: job_service notifies this module
+        jobs_df = load_jobs()
+
+    store = _current_store()
+    known = dict(zip(store.job_ids.tolist(), store.content_hashes)) if store else {}
+    if jobs_df.empty:
+        print("No jobs loaded; job embeddings left unchanged.")
+        return {"encoded": 0, "removed": 0, "total": len(known)}
+    upserts = {}
+    current_ids = set()
+    for job in jobs_df.to_dict("records"):
+        job_id = int(job["id"])
+        current_ids.add(job_id)
+        document = job_document(job)
+        if known.get(job_id) != content_hash(document):
+            upserts[job_id] = document
+
+    removed = set(known) - current_ids
+    stats = {
+        "encoded": len(upserts),
+        "removed": len(removed),
+        "total": len(current_ids),
+    }
+    if upserts or removed:
+        updated = _apply_changes(store, upserts, removed)
+        if updated is None:
+            stats["encoded"] = 0
+            return stats
+        _save(updated)
+        _store = updated
+    if _store is not None and len(current_ids) >= EMBEDDING_ANN_MIN_JOBS and not _store.has_ann:
+        build_ann_index()
+    return stats
+
+
+def build_ann_index(n_lists=None) -> bool:
+    """
+    (Re)build the optional approximate index: k-means (IVF) lists over the job embeddings.
+    Queries then scan only EMBEDDING_ANN_N_PROBE lists instead of every job.
+    """
+    global _store
+    from sklearn.cluster import MiniBatchKMeans
+
+    store = _current_store()
+    if store is None or store.embeddings.shape[0] < 2:
+        print("Not enough job embeddings to build an approximate index.")
+        return False
+
+    n_jobs = store.embeddings.shape[0]
+    n_lists = n_lists or max(1, int(np.sqrt(n_jobs)))
+    kmeans = MiniBatchKMeans(n_clusters=n_lists, random_state=42, n_init=3, batch_size=4096)
+    assignments = kmeans.fit_predict(np.asarray(store.embeddings))
+    centroids = kmeans.cluster_centers_.astype(np.float32)
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True).clip(min=1e-12)
+
+    updated = _EmbeddingStore(store.embeddings, store.job_ids, store.content_hashes,
+                              centroids=centroids, assignments=assignments.astype(np.int32))
+    _save(updated)
+    _store = updated
+    print(f"Built approximate job embedding index with {n_lists} lists over {n_jobs} jobs.")
+    return True
+
+
+def retrieve_top_jobs_by_embedding(resume_text: str, k: int = 10, approximate=None) -> list:
+    """
+    Bi-encoder ranking: encode the resume once and compare it against every precomputed job
+    embedding. Returns up to `k` (job_id, cosine_similarity) pairs, best first.
+    `approximate=None` uses the IVF index automatically for large catalogs; True/False forces it.
+    """
+    store = _current_store()
+    if store is None:
+        sync_job_embeddings()
+        store = _current_store()
+        if store is None:
+            return []
+
+    query = encode_texts([resume_text or ""])
+    if query is None:
+        return []
+    return store.search(query[0], k, approximate=approximate)
+
+
+if __name__ == "__main__":
+    print(f"Synchronizing job embeddings in {JOB_EMBEDDINGS_DIR}...")
+    print(sync_job_embeddings())
@@ -0,0 +1,126 @@
+import re
+import json
+from itertools import repeat
+
+import numpy as np
+
+# Keras Tokenizer defaults, used when the saved config omits them.
+KERAS_DEFAULT_FILTERS = '!"#$%&()*+,-./:;<=>?@[\\]^_`{|}~\t\n'
+
+# Marks words dropped by the Keras rules (unknown without an OOV token, or beyond num_words).
+_DROPPED = -1
+
+
+class FastLSTMTokenizer:
+    """
+    Drop-in replacement for the Keras Tokenizer's texts_to_sequences + pad_sequences, built from
+    the saved `lstm_tokenizer.json`. Words are split in C (one byte-translate and split per text,
+    or one compiled regex when the separators are not ASCII), all words of a batch are mapped in
+    one dict lookup pass into an int32 array, and the num_words/OOV rules and padding are applied
+    with NumPy directly into the output buffer. Output matches Keras token for token.
+    """
+
+    def __init__(self, word_index, num_words=None, oov_token=None, filters=KERAS_DEFAULT_FILTERS,
+                 lower=True, split=" ", char_level=False):
+        self.word_index = word_index
+        self.num_words = num_words
+        self.oov_token = oov_token
+        self.oov_index = word_index.get(oov_token) if oov_token is not None else None
+        self.filters = filters or ""
+        self.lower = lower
+        self.split = split
+        self.char_level = char_level
+
+        separators = "".join(sorted(set(self.filters) | set(split)))
+        self._byte_table = self._word_pattern = None
+        self._lookup = word_index
+        if len(split) == 1 and separators.isascii():
+            # UTF-8 never uses ASCII bytes inside multi-byte characters, so mapping the separator
+            # bytes to the split byte and splitting the encoded text gives exactly the Keras words
+            self._byte_table = bytes.maketrans(separators.encode(), split.encode() * len(separators))
+            self._split_byte = split.encode()
+            self._lookup = {word.encode("utf-8", "surrogatepass"): index for word, index in word_index.items()}
+        elif len(split) == 1:
+            # A one-character split makes "separator runs" exactly what Keras splits on
+            self._word_pattern = re.compile("[^" + re.escape(separators) + "]+")
+
+    @classmethod
+    def from_json(cls, json_string):
+        """Build from the string written by Keras `tokenizer.to_json()`."""
+        config = json.loads(json_string).get("config", {})
+        word_index = config.get("word_index")
+        if isinstance(word_index, str):
+            word_index = json.loads(word_index)
+        return cls(
+            word_index=word_index,
+            num_words=config.get("num_words"),
+            oov_token=config.get("oov_token"),
+            filters=config.get("filters", KERAS_DEFAULT_FILTERS),
+            lower=config.get("lower", True),
+            split=config.get("split", " "),
+            char_level=config.get("char_level", False),
+        )
+
+    def _words(self, text):
+        if self.lower:
+            text = text.lower()
+        if self.char_level:
+            return list(text)
+        if self._byte_table is not None:
+            return [word for word in text.encode("utf-8", "surrogatepass").translate(self._byte_table).split(self._split_byte) if word]
+        if self._word_pattern is not None:
+            return self._word_pattern.findall(text)
+        for c in self.filters:
+            text = text.replace(c, self.split)
+        return [word for word in text.split(self.split) if word]
+
+    def _encode(self, texts):
+        """Token ids of all texts concatenated (int32, dropped words removed) and the per-text lengths."""
+        words = []
+        lengths = np.empty(len(texts), dtype=np.int64)
+        for row, text in enumerate(texts):
+            text_words = self._words(text if isinstance(text, str) else str(text))
+            words.extend(text_words)
+            lengths[row] = len(text_words)
+
+        lookup = self.word_index if self.char_level else self._lookup
+        ids = np.fromiter(map(lookup.get, words, repeat(_DROPPED)), dtype=np.int32, count=len(words))
+        replacement = self.oov_index if self.oov_index is not None else _DROPPED
+        if self.num_words:
+            ids[ids >= self.num_words] = replacement
+        if self.oov_token is not None:
+            ids[ids == _DROPPED] = replacement
+
+        dropped = ids == _DROPPED
+        if dropped.any():
+            rows = np.repeat(np.arange(len(texts)), lengths)
+            lengths = np.bincount(rows[~dropped], minlength=len(texts))
+            ids = ids[~dropped]
+        return ids, lengths
+
+    def texts_to_sequences(self, texts):
+        """Same as Keras `texts_to_sequences`: one list of token ids per text."""
+        ids, lengths = self._encode(texts)
+        return [segment.tolist() for segment in np.split(ids, np.cumsum(lengths)[:-1])] if len(texts) else []
+
+    def texts_to_padded(self, texts, maxlen, padding="post", truncating="post", out=None):
+        """
+        Same as `pad_sequences(texts_to_sequences(texts), maxlen, padding=..., truncating=...)`
+        (int32, zero padding), written straight into `out` if a preallocated buffer is given.
+        """
+        ids, lengths = self._encode(texts)
+        if out is None:
+            out = np.zeros((len(texts), maxlen), dtype=np.int32)
+        else:
+            out[:len(texts)] = 0
+
+        kept = np.minimum(lengths, maxlen)
+        starts = np.cumsum(lengths) - lengths
+        rows = np.repeat(np.arange(len(texts)), lengths)
+        position = np.arange(len(ids)) - np.repeat(starts, lengths)
+        if truncating == "pre":
+            position -= np.repeat(lengths - kept, lengths)
+        valid = (position >= 0) & (position < np.repeat(kept, lengths))
+        column = position + (np.repeat(maxlen - kept, lengths) if padding == "pre" else 0)
+        out[rows[valid], column[valid]] = ids[valid]
+        return out
@@ -0,0 +1,105 @@
+import os
+import json
+
+from config.constants import (
+    MODEL_RUNTIME_PROFILE_PATH,
+    DEFAULT_INTER_OP_THREADS,
+    DEFAULT_TORCH_INFERENCE_MODE,
+    DEFAULT_LSTM_BATCH_SIZE,
+    DEFAULT_TRANSFORMER_BATCH_SIZE
+)
+from config.inference_config import MODEL_WORKERS_PER_HOST
+
+# Runtime settings for the LSTM/Transformer layer, resolved once per process as
+# defaults <- calibrated profile file <- MODEL_* environment variables.
+RUNTIME_SETTINGS = ["intra_op_threads", "inter_op_threads", "inference_mode", "lstm_batch_size", "transformer_batch_size"]
+
+ENV_OVERRIDES = {
+    "intra_op_threads": "MODEL_INTRA_OP_THREADS",
+    "inter_op_threads": "MODEL_INTER_OP_THREADS",
+    "inference_mode": "MODEL_TORCH_INFERENCE_MODE",
+    "lstm_batch_size": "MODEL_LSTM_BATCH_SIZE",
+    "transformer_batch_size": "MODEL_TRANSFORMER_BATCH_SIZE",
+}
+
+_runtime_config = None
+
+
+def default_intra_op_threads(workers_per_host=None) -> int:
+    """Split the host's cores evenly between the model processes sharing it."""
+    workers_per_host = workers_per_host or MODEL_WORKERS_PER_HOST
+    return max(1, (os.cpu_count() or 1) // max(1, workers_per_host))
+
+
+def _parse_setting(name, value):
+    if name == "inference_mode":
+        return str(value).strip().lower() in ("1", "true", "yes", "on")
+    return max(1, int(value))
+
+
+def load_profile(path=MODEL_RUNTIME_PROFILE_PATH) -> dict:
+    """Settings from a calibrated profile file, or {} if there is none."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            profile = json.load(f)
+        return {name: _parse_setting(name, profile[name]) for name in RUNTIME_SETTINGS if profile.get(name) is not None}
+    except Exception as e:
+        print(f"Ignoring unreadable model runtime profile {path}: {e}")
+        return {}
+
+
+def get_runtime_config() -> dict:
+    global _runtime_config
+    if _runtime_config is None:
+        config = {
+            "intra_op_threads": default_intra_op_threads(),
+            "inter_op_threads": DEFAULT_INTER_OP_THREADS,
+            "inference_mode": DEFAULT_TORCH_INFERENCE_MODE,
+            "lstm_batch_size": DEFAULT_LSTM_BATCH_SIZE,
+            "transformer_batch_size": DEFAULT_TRANSFORMER_BATCH_SIZE,
+        }
+        config.update(load_profile())
+        for name, env_var in ENV_OVERRIDES.items():
+            if os.getenv(env_var):
+                try:
+                    config[name] = _parse_setting(name, os.getenv(env_var))
+                except ValueError:
+                    print(f"Ignoring invalid {env_var}={os.getenv(env_var)!r}")
+        _runtime_config = config
+        print(f"Model runtime config: {config}")
+    return _runtime_config
+
+
+def prepare_environment():
+    """Thread-pool environment variables; must run before TensorFlow or PyTorch is imported."""
+    config = get_runtime_config()
+    for env_var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "TF_NUM_INTRAOP_THREADS"):
+        os.environ.setdefault(env_var, str(config["intra_op_threads"]))
+    os.environ.setdefault("TF_NUM_INTEROP_THREADS", str(config["inter_op_threads"]))
+
+
+def apply_tensorflow_settings(tf):
+    config = get_runtime_config()
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(config["intra_op_threads"])
+        tf.config.threading.set_inter_op_parallelism_threads(config["inter_op_threads"])
+    except RuntimeError as e:
+        # Raised once the TensorFlow runtime has started; the environment variables still apply
+        print(f"TensorFlow thread settings not applied: {e}")
+
+
+def apply_torch_settings(torch):
+    config = get_runtime_config()
+    torch.set_num_threads(config["intra_op_threads"])
+    try:
+        torch.set_interop_threads(config["inter_op_threads"])
+    except (RuntimeError, AttributeError) as e:
+        # Only settable once per process, before any inter-op work; missing from some builds
+        print(f"PyTorch inter-op thread setting not applied: {e}")
+
+
+def torch_inference_context(torch):
+    """torch.inference_mode() when enabled (no autograd bookkeeping at all), else torch.no_grad()."""
+    return torch.inference_mode() if get_runtime_config()["inference_mode"] else torch.no_grad()
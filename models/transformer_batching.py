@@ -0,0 +1,43 @@
+import numpy as np
+
+# Batch scheduling for Transformer inference: group token sequences of similar length so each
+# batch is padded only to its own longest member instead of the longest sequence overall.
+
+
+def schedule_batches(lengths, batch_size, bucket_by_length=True) -> list:
+    """
+    Split sequence indices into batches of at most `batch_size`.
+    With `bucket_by_length`, indices are sorted by length first (stable, longest first so the
+    most expensive batch runs while memory is fresh); otherwise batches keep the input order.
+    """
+    lengths = np.asarray(lengths)
+    if bucket_by_length:
+        order = np.argsort(-lengths, kind="stable")
+    else:
+        order = np.arange(len(lengths))
+    return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+
+def pad_batch(sequences, pad_id) -> tuple:
+    """Right-pad a list of token id lists to their common maximum; returns (input_ids, attention_mask) int64 arrays."""
+    max_len = max(len(seq) for seq in sequences)
+    input_ids = np.full((len(sequences), max_len), pad_id, dtype=np.int64)
+    attention_mask = np.zeros((len(sequences), max_len), dtype=np.int64)
+    for row, seq in enumerate(sequences):
+        input_ids[row, :len(seq)] = seq
+        attention_mask[row, :len(seq)] = 1
+    return input_ids, attention_mask
+
+
+def padding_stats(lengths, batches) -> dict:
+    """Real vs. padded token counts for a batch schedule; efficiency 1.0 means no pad tokens."""
+    lengths = np.asarray(lengths)
+    real_tokens = int(lengths.sum())
+    padded_tokens = int(sum(len(batch) * lengths[batch].max() for batch in batches if len(batch)))
+    return {
+        "sequences": int(len(lengths)),
+        "batches": len(batches),
+        "real_tokens": real_tokens,
+        "padded_tokens": padded_tokens,
+        "padding_efficiency": real_tokens / padded_tokens if padded_tokens else 1.0,
+    }
@@ -0,0 +1,255 @@
+"""
+Streaming export of the prediction_history table to CSV or Parquet.
+
+Rows are read one page at a time with keyset pagination on (timestamp, id): each page starts
+after the last row of the previous one, so it is a range scan on the timestamp indexes (including
+the model / job title composites) however deep the export gets, and the timestamp bounds let
+Postgres skip month partitions outside the range. Pages are appended to the output as they arrive:
+CSV pages are written straight through, Parquet pages are gathered into row groups of
+PREDICTION_EXPORT_ROW_GROUP_ROWS rows. Memory stays flat at about one row group, whatever the
+size of the history. Supports the dashboard's date / job title / model filters.
+
+    python -m services.history_export --out predictions.parquet [--start 2025-01-01] [--end 2025-03-31]
+                                      [--job "Data Scientist"] [--model "Gemini Pro"] [--format csv]
+"""
+import os
+import sys
+import uuid
+import argparse
+import threading
+from datetime import datetime, time
+
+import pandas as pd
+
+from config.supabase_config import get_supabase_client, PREDICTION_HISTORY_TABLE_NAME
+from config.constants import (
+    PREDICTION_HISTORY_PAGE_SIZE,
+    PREDICTION_EXPORT_ROW_GROUP_ROWS,
+    PREDICTION_EXPORT_DIR
+)
+
+# Columns of prediction_history, in export order
+EXPORT_COLUMNS = [
+    "id", "timestamp", "resume_name", "job_title", "model_used", "match_score",
+    "skill_match_score", "experience_match_score", "missing_skills_count",
+    "missing_skills_list", "suggestions", "created_at",
+]
+EXPORT_FORMATS = ("csv", "parquet")
+_TIMESTAMP_COLUMNS = ("timestamp", "created_at")
+_INTEGER_COLUMNS = ("id", "match_score", "skill_match_score", "experience_match_score", "missing_skills_count")
+
+# Background exports started from the dashboard, by export id
+_export_jobs = {}
+_export_jobs_lock = threading.Lock()
+
+
+def iter_prediction_history_pages(supabase_client, start_datetime=None, end_datetime=None, job_title=None,
+                                  model_used=None, page_size=PREDICTION_HISTORY_PAGE_SIZE, end_exclusive=False):
+    """
+    Yields lists of prediction_history rows matching the filters (timestamp range inclusive, or
+    half-open with `end_exclusive`; exact job title / model), in (timestamp, id) order,
+    `page_size` rows at a time.
+    """
+    last_timestamp, last_id = None, None
+    while True:
+        query = supabase_client.table(PREDICTION_HISTORY_TABLE_NAME).select(",".join(EXPORT_COLUMNS))
+        if start_datetime is not None:
+            query = query.gte("timestamp", start_datetime.isoformat())
+        if end_datetime is not None:
+            query = query.lt("timestamp", end_datetime.isoformat()) if end_exclusive \
+                else query.lte("timestamp", end_datetime.isoformat())
+        if job_title is not None:
+            query = query.eq("job_title", job_title)
+        if model_used is not None:
+            query = query.eq("model_used", model_used)
+        if last_timestamp is not None:
+            # (timestamp, id) > (last_timestamp, last_id); the plain lower bound keeps the index
+            # range (and partition pruning) starting at the previous page's last timestamp
+            query = query.gte("timestamp", last_timestamp).or_(
+                f'timestamp.gt."{last_timestamp}",and(timestamp.eq."{last_timestamp}",id.gt.{last_id})'
+            )
+        page = query.order("timestamp").order("id").limit(page_size).execute().data or []
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        last_timestamp, last_id = page[-1]["timestamp"], page[-1]["id"]
+
+
+def _page_frame(rows) -> pd.DataFrame:
+    """One page as a DataFrame with fixed columns and dtypes, so every page writes identically."""
+    df = pd.DataFrame(rows, columns=EXPORT_COLUMNS)
+    for column in _TIMESTAMP_COLUMNS:
+        df[column] = pd.to_datetime(df[column], utc=True, format="ISO8601")
+    for column in _INTEGER_COLUMNS:
+        df[column] = pd.to_numeric(df[column], errors="coerce").astype("Int64")
+    return df
+
+
+def _parquet_schema():
+    import pyarrow as pa
+    types = {column: pa.int64() for column in _INTEGER_COLUMNS}
+    types.update({column: pa.timestamp("us", tz="UTC") for column in _TIMESTAMP_COLUMNS})
+    return pa.schema([(column, types.get(column, pa.string())) for column in EXPORT_COLUMNS])
+
+
+def export_prediction_history(path, fmt=None, start_datetime=None, end_datetime=None, job_title=None,
+                              model_used=None, on_progress=None, cancel_event=None,
+                              row_group_rows=PREDICTION_EXPORT_ROW_GROUP_ROWS):
+    """
+    Streams the filtered history into `path` (CSV or Parquet, from `fmt` or the file extension).
+    The file is written under a temporary name and only renamed into place once complete.
+    `on_progress(rows_written)` is called after every page; setting `cancel_event` stops the
+    export and removes the partial file. Returns the number of rows written, or None on failure.
+    """
+    fmt = (fmt or os.path.splitext(path)[1].lstrip(".")).lower()
+    if fmt not in EXPORT_FORMATS:
+        print(f"Unsupported export format '{fmt}'. Use one of: {', '.join(EXPORT_FORMATS)}.")
+        return None
+    supabase_client = get_supabase_client()
+    if not supabase_client:
+        print("Supabase client not initialized. Cannot export prediction history.")
+        return None
+
+    pages = iter_prediction_history_pages(supabase_client, start_datetime, end_datetime, job_title, model_used)
+    tmp_path = path + ".tmp"
+    rows_written = 0
+    writer = None
+    pending = []
+    try:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        if fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            schema = _parquet_schema()
+            writer = pq.ParquetWriter(tmp_path, schema)
+
+            def flush():
+                if pending:
+                    frame = pd.concat(pending, ignore_index=True)
+                    writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False),
+                                       row_group_size=len(frame))
+                    pending.clear()
+        else:
+            writer = open(tmp_path, "w", encoding="utf-8", newline="")
+            pd.DataFrame(columns=EXPORT_COLUMNS).to_csv(writer, index=False)
+
+        pending_rows = 0
+        for page in pages:
+            if cancel_event is not None and cancel_event.is_set():
+                raise InterruptedError("export cancelled")
+            frame = _page_frame(page)
+            if fmt == "parquet":
+                pending.append(frame)
+                pending_rows += len(frame)
+                if pending_rows >= row_group_rows:
+                    flush()
+                    pending_rows = 0
+            else:
+                frame.to_csv(writer, header=False, index=False)
+            rows_written += len(frame)
+            if on_progress:
+                on_progress(rows_written)
+        if fmt == "parquet":
+            flush()
+        writer.close()
+        writer = None
+        os.replace(tmp_path, path)
+        return rows_written
+    except InterruptedError:
+        print(f"Export to {path} cancelled after {rows_written} rows.")
+        return None
+    except Exception as e:
+        print(f"Error exporting prediction history to {path}: {e}")
+        return None
+    finally:
+        pages.close()
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def start_export_job(fmt, start_datetime=None, end_datetime=None, job_title=None, model_used=None,
+                     export_dir=PREDICTION_EXPORT_DIR) -> str:
+    """
+    Runs export_prediction_history in a background thread, writing under `export_dir`, and
+    returns an export id for get_export_job / cancel_export_job. Lets the dashboard poll for
+    progress instead of holding a script run open for the whole export.
+    """
+    export_id = uuid.uuid4().hex[:12]
+    filename = f"prediction_history_{datetime.now():%Y%m%d_%H%M%S}_{export_id}.{fmt}"
+    job = {
+        "id": export_id,
+        "path": os.path.join(export_dir, filename),
+        "format": fmt,
+        "status": "running",  # running, done, failed or cancelled
+        "rows": 0,
+        "cancel_event": threading.Event(),
+    }
+
+    def on_progress(rows_written):
+        job["rows"] = rows_written
+
+    def run():
+        rows = export_prediction_history(job["path"], fmt, start_datetime, end_datetime, job_title, model_used,
+                                         on_progress=on_progress, cancel_event=job["cancel_event"])
+        if rows is not None:
+            job["rows"] = rows
+            job["status"] = "done"
+        else:
+            job["status"] = "cancelled" if job["cancel_event"].is_set() else "failed"
+
+    with _export_jobs_lock:
+        _export_jobs[export_id] = job
+    threading.Thread(target=run, name=f"history-export-{export_id}", daemon=True).start()
+    return export_id
+
+
+def get_export_job(export_id):
+    """Snapshot of a background export ({"path", "format", "status", "rows", ...}), or None if unknown."""
+    with _export_jobs_lock:
+        job = _export_jobs.get(export_id)
+    return {k: v for k, v in job.items() if k != "cancel_event"} if job else None
+
+
+def cancel_export_job(export_id):
+    with _export_jobs_lock:
+        job = _export_jobs.get(export_id)
+    if job:
+        job["cancel_event"].set()
+
+
+def _parse_date(value, end_of_day=False):
+    day = datetime.strptime(value, "%Y-%m-%d").date()
+    return datetime.combine(day, time.max if end_of_day else time.min)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export prediction history to CSV or Parquet with bounded memory.")
+    parser.add_argument("--out", required=True, help="Output file (.csv or .parquet).")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="Defaults to the output file's extension.")
+    parser.add_argument("--start", help="First day to include (YYYY-MM-DD).")
+    parser.add_argument("--end", help="Last day to include (YYYY-MM-DD).")
+    parser.add_argument("--job", help="Only this job title.")
+    parser.add_argument("--model", help="Only this model.")
+    args = parser.parse_args(argv)
+
+    def on_progress(rows_written):
+        print(f"\r{rows_written} rows exported...", end="", flush=True)
+
+    rows = export_prediction_history(
+        args.out, args.format,
+        start_datetime=_parse_date(args.start) if args.start else None,
+        end_datetime=_parse_date(args.end, end_of_day=True) if args.end else None,
+        job_title=args.job, model_used=args.model, on_progress=on_progress,
+    )
+    if rows is None:
+        return 1
+    print(f"\nExported {rows} rows to {args.out}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Retention for the monthly-partitioned prediction_history table (see sql/database_schema.sql).
+
+Makes sure the upcoming monthly partitions exist. Each partition that ended before the retention
+window is then streamed page by page into a local Parquet file (memory stays at about one row
+group), its row count is read back from the file's metadata, and the partition is detached
+(and dropped) through detach_prediction_history_partition, which refuses when the partition's
+row count no longer matches the archive. Needs a service-role SUPABASE_KEY.
+
+    python -m services.history_retention [--keep-months 12] [--dry-run]
+"""
+import os
+import argparse
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from config.supabase_config import get_supabase_client, PREDICTION_HISTORY_TABLE_NAME
+from services.history_export import iter_prediction_history_pages, _page_frame, _parquet_schema
+from config.constants import (
+    PREDICTION_HISTORY_RETENTION_MONTHS,
+    PREDICTION_HISTORY_ARCHIVE_DIR,
+    PREDICTION_HISTORY_PAGE_SIZE,
+    PREDICTION_EXPORT_ROW_GROUP_ROWS
+)
+
+
+def retention_cutoff(keep_months, now=None) -> datetime:
+    """Start (UTC) of the oldest month kept: partitions ending on or before it are archived."""
+    now = now or datetime.now(timezone.utc)
+    month_index = now.year * 12 + now.month - 1 - keep_months
+    return datetime(month_index // 12, month_index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def list_partitions(supabase_client) -> list:
+    """Monthly partitions as dicts with partition_name, range_start, range_end (datetimes) and row_count."""
+    response = supabase_client.rpc("prediction_history_partitions").execute()
+    partitions = response.data or []
+    for partition in partitions:
+        partition["range_start"] = pd.Timestamp(partition["range_start"]).to_pydatetime()
+        partition["range_end"] = pd.Timestamp(partition["range_end"]).to_pydatetime()
+    return partitions
+
+
+def iter_partition_pages(supabase_client, range_start, range_end, page_size=PREDICTION_HISTORY_PAGE_SIZE):
+    """Pages of the rows with range_start <= timestamp < range_end, in (timestamp, id) order (keyset)."""
+    return iter_prediction_history_pages(supabase_client, range_start, range_end, page_size=page_size,
+                                         end_exclusive=True)
+
+
+def archive_partition(supabase_client, partition, archive_dir=PREDICTION_HISTORY_ARCHIVE_DIR,
+                      row_group_rows=PREDICTION_EXPORT_ROW_GROUP_ROWS):
+    """
+    Streams one partition into `<archive_dir>/<partition_name>.parquet` (atomically, one row group
+    per `row_group_rows` rows) and returns (path, rows in the written file), or (None, 0) for an
+    empty partition.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{partition['partition_name']}.parquet")
+    tmp_path = path + ".tmp"
+    schema = _parquet_schema()
+    pages = iter_partition_pages(supabase_client, partition["range_start"], partition["range_end"])
+    writer = None
+    pending, pending_rows = [], 0
+
+    def flush():
+        if pending:
+            frame = pd.concat(pending, ignore_index=True)
+            writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False),
+                               row_group_size=len(frame))
+            pending.clear()
+
+    try:
+        for page in pages:
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, schema)
+            pending.append(_page_frame(page))
+            pending_rows += len(page)
+            if pending_rows >= row_group_rows:
+                flush()
+                pending_rows = 0
+        if writer is None:
+            return None, 0
+        flush()
+        writer.close()
+        writer = None
+        os.replace(tmp_path, path)
+    finally:
+        pages.close()
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path, pq.read_metadata(path).num_rows
+
+
+def run_retention(keep_months=PREDICTION_HISTORY_RETENTION_MONTHS, archive_dir=PREDICTION_HISTORY_ARCHIVE_DIR,
+                  drop=True, dry_run=False) -> int:
+    """Archives and detaches every partition older than `keep_months` months; returns how many were detached."""
+    supabase_client = get_supabase_client()
+    if not supabase_client:
+        print("Supabase client not initialized. Cannot apply prediction history retention.")
+        return 0
+
+    if not dry_run:
+        created = supabase_client.rpc("ensure_prediction_history_partitions").execute().data
+        print(f"Created {created or 0} upcoming prediction history partition(s).")
+
+    cutoff = retention_cutoff(keep_months)
+    expired = [p for p in list_partitions(supabase_client) if p["range_end"] <= cutoff]
+    print(f"{len(expired)} partition(s) end before {cutoff:%Y-%m-%d} (keeping {keep_months} months).")
+
+    detached = 0
+    for partition in expired:
+        name = partition["partition_name"]
+        if dry_run:
+            print(f"  [dry run] would archive and detach {name} ({partition['row_count']} rows)")
+            continue
+        try:
+            path, archived_rows = archive_partition(supabase_client, partition, archive_dir)
+            if archived_rows != partition["row_count"]:
+                # Rows arrived (or were deleted) while archiving: try again on the next run
+                print(f"  {name}: archived {archived_rows} rows but the partition has {partition['row_count']}; skipped.")
+                continue
+            ok = supabase_client.rpc("detach_prediction_history_partition", {
+                "p_partition_name": name, "p_expected_rows": archived_rows, "p_drop": drop,
+            }).execute().data
+            if ok:
+                detached += 1
+                print(f"  {name}: {archived_rows} rows archived to {path or '(empty, nothing written)'}, partition detached.")
+            else:
+                print(f"  {name}: row count changed since it was archived; not detached, will retry next run.")
+        except Exception as e:
+            print(f"  {name}: retention failed: {e}")
+    return detached
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive old prediction_history partitions to Parquet and detach them.")
+    parser.add_argument("--keep-months", type=int, default=PREDICTION_HISTORY_RETENTION_MONTHS,
+                        help="Full months kept in the database besides the current one.")
+    parser.add_argument("--archive-dir", default=PREDICTION_HISTORY_ARCHIVE_DIR)
+    parser.add_argument("--keep-detached", action="store_true",
+                        help="Detach archived partitions but keep them as standalone tables instead of dropping them.")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the partitions that would be archived.")
+    args = parser.parse_args(argv)
+
+    detached = run_retention(args.keep_months, args.archive_dir, drop=not args.keep_detached, dry_run=args.dry_run)
+    print(f"Done: {detached} partition(s) archived and detached.")
+    return 0
+
+
+if __name__ == "__main__":
+    main()
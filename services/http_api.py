@@ -0,0 +1,337 @@
+"""
+Headless HTTP scoring API, next to the Streamlit UI, for ATS integrations and load-balanced deployments.
+
+    python -m services.http_api [--host 127.0.0.1] [--port 8000] [--workers 2]
+
+Endpoints (JSON unless noted):
+    GET  /health          liveness: the process is serving requests
+    GET  /ready           readiness: 200 once the models in API_PRELOAD_MODELS are loaded, 503 before
+    POST /parse           multipart resume file -> parsed resume
+    POST /match           one resume/job pair
+    POST /match/upload    multipart resume file + job_id
+    POST /match/batch     many resume/job pairs, scored concurrently
+    POST /rank            jobs ranked for one resume (cascade over all jobs)
+    POST /rank/upload     multipart resume file, ranked like /rank
+
+Each uvicorn worker process loads its own models, unless INFERENCE_SERVER_ADDRESS points every
+worker at a shared inference server. Parsing and scoring are blocking, so they run on a bounded
+thread pool. A request still running after API_REQUEST_TIMEOUT_S gets a 504 (the work itself
+cannot be interrupted and finishes in the background, like a late model in services.matcher).
+"""
+import sys
+import asyncio
+import argparse
+import threading
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Header, Depends
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+
+from services.resume_parser import parse_resume_bytes, parse_resume_text
+from services.matcher import match_resume_to_job, rank_jobs_for_resume, get_model_availability, COMPARISON_MODELS
+from services.job_service import load_jobs, get_jobs_version, get_job_by_id, get_candidate_jobs_for_skills
+from models import inference_client
+from config.api_config import SCORING_API_KEY
+from config.constants import (
+    MODEL_RULE_BASED,
+    MODEL_LSTM_CUSTOM,
+    MODEL_TRANSFORMER_CUSTOM,
+    API_HOST,
+    API_PORT,
+    API_WORKERS,
+    API_REQUEST_TIMEOUT_S,
+    API_MAX_THREADS,
+    API_BATCH_MAX_ITEMS,
+    API_RANK_TOP_K,
+    API_RANK_MAX_TOP_K,
+    API_RANK_CANDIDATES,
+    API_PRELOAD_MODELS,
+    API_MAX_UPLOAD_MB
+)
+
+_MODEL_LOADERS = {
+    MODEL_LSTM_CUSTOM: inference_client.load_lstm_model_and_tokenizer,
+    MODEL_TRANSFORMER_CUSTOM: inference_client.load_transformer_model_and_tokenizer,
+}
+
+# Load state of each preloaded model: "loading", "ready", "failed" or "unavailable" (not installed here)
+_model_state = {model: "loading" for model in API_PRELOAD_MODELS}
+_executor = None
+
+# Jobs used by /rank, reloaded when the jobs dataset version changes
+_ranking_jobs = None
+_ranking_jobs_version = None
+_ranking_jobs_lock = threading.Lock()
+
+
+# --- Request bodies ---
+class ResumeIn(BaseModel):
+    raw_text: str
+    skills: Optional[list[str]] = Field(None, description="Extracted from raw_text when omitted.")
+    years_experience: Optional[int] = Field(None, description="Extracted from raw_text when omitted.")
+
+
+class MatchRequest(BaseModel):
+    resume: ResumeIn
+    job: Optional[dict] = Field(None, description="Job posting fields, as stored in the jobs table.")
+    job_id: Optional[int] = Field(None, description="Id of a job in the jobs table (instead of `job`).")
+    model: str = MODEL_RULE_BASED
+    deadline_ms: Optional[int] = None
+
+
+class BatchMatchItem(BaseModel):
+    resume: ResumeIn
+    job: Optional[dict] = None
+    job_id: Optional[int] = None
+    model: Optional[str] = Field(None, description="Overrides the request's model for this pair.")
+
+
+class BatchMatchRequest(BaseModel):
+    items: list[BatchMatchItem]
+    model: str = MODEL_RULE_BASED
+    deadline_ms: Optional[int] = None
+
+
+class RankRequest(BaseModel):
+    resume: ResumeIn
+    final_model: str = MODEL_TRANSFORMER_CUSTOM
+    top_k: int = Field(API_RANK_TOP_K, ge=1, le=API_RANK_MAX_TOP_K)
+
+
+# --- Model loading and blocking work ---
+def _preload_models():
+    """Loads the preloaded models once per worker process; /ready reports the outcome."""
+    availability = get_model_availability()
+    for model in API_PRELOAD_MODELS:
+        if not availability.get(model):
+            _model_state[model] = "unavailable"
+            continue
+        try:
+            _model_state[model] = "ready" if _MODEL_LOADERS[model]() else "failed"
+        except Exception as e:
+            print(f"Failed to preload {model}: {e}")
+            _model_state[model] = "failed"
+    print(f"Scoring API model state: {_model_state}")
+
+
+@asynccontextmanager
+async def _lifespan(app):
+    global _executor
+    _executor = ThreadPoolExecutor(max_workers=API_MAX_THREADS, thread_name_prefix="scoring-api")
+    threading.Thread(target=_preload_models, name="scoring-api-preload", daemon=True).start()
+    yield
+    _executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def _run_blocking(fn, *args, timeout_s=API_REQUEST_TIMEOUT_S):
+    """Runs fn(*args) on the API thread pool; 504 if it has not finished within timeout_s."""
+    future = asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+    try:
+        return await asyncio.wait_for(future, timeout=timeout_s)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"Request did not finish within {timeout_s}s.")
+
+
+def _require_api_key(x_api_key: Optional[str] = Header(None)):
+    if SCORING_API_KEY and x_api_key != SCORING_API_KEY:
+        raise HTTPException(status_code=401, detail="Missing or invalid X-API-Key header.")
+
+
+def _check_model(model):
+    if model not in COMPARISON_MODELS:
+        raise HTTPException(status_code=422, detail=f"Unknown model '{model}'. Use one of: {', '.join(COMPARISON_MODELS)}.")
+
+
+def _resume_data(resume: ResumeIn) -> dict:
+    """Parsed resume dict, extracting whatever the caller did not supply from the raw text."""
+    if resume.skills is not None and resume.years_experience is not None:
+        return {"raw_text": resume.raw_text, "skills": resume.skills, "years_experience": resume.years_experience}
+    parsed = parse_resume_text(resume.raw_text)
+    if resume.skills is not None:
+        parsed["skills"] = resume.skills
+    if resume.years_experience is not None:
+        parsed["years_experience"] = resume.years_experience
+    return parsed
+
+
+def _job_data(job, job_id) -> dict:
+    if (job is None) == (job_id is None):
+        raise HTTPException(status_code=422, detail="Give exactly one of `job` or `job_id`.")
+    if job is not None:
+        return job
+    job = get_job_by_id(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    return job
+
+
+def _match(resume: ResumeIn, job, job_id, model, deadline_ms) -> dict:
+    return match_resume_to_job(_resume_data(resume), _job_data(job, job_id), model_choice=model, deadline_ms=deadline_ms)
+
+
+def _jobs_for_ranking():
+    """
+    (job dicts, jobs version) for /rank, reloaded only when the jobs dataset changes. A failed or
+    empty load is not cached, so the next request tries again.
+    """
+    global _ranking_jobs, _ranking_jobs_version
+    version = get_jobs_version()
+    with _ranking_jobs_lock:
+        if _ranking_jobs is None or version is None or version != _ranking_jobs_version:
+            jobs = load_jobs().to_dict("records")
+            if not jobs:
+                return [], None
+            _ranking_jobs = jobs
+            _ranking_jobs_version = version
+        return _ranking_jobs, _ranking_jobs_version
+
+
+def _ranking_candidates(resume_data):
+    """
+    (job dicts, jobs version) that /rank cascades over: the API_RANK_CANDIDATES jobs sharing most
+    of the resume's skills, from the GIN-indexed skills query. Jobs sharing none can only score on
+    experience (at most the prefilter cut-off). Falls back to the whole catalog when that query
+    returns nothing (no resume skills, or the typed `skills` column is not backfilled yet).
+    """
+    candidates = get_candidate_jobs_for_skills(resume_data.get("skills", []), limit=API_RANK_CANDIDATES)
+    if not candidates.empty:
+        candidates = candidates.drop(columns=["matched_skills_count", "skill_match_ratio"], errors="ignore")
+        return candidates.to_dict("records"), None  # A per-request subset: its skill index is not cached
+    return _jobs_for_ranking()
+
+
+def _rank(resume_data, final_model, top_k) -> dict:
+    jobs, version = _ranking_candidates(resume_data)
+    if not jobs:
+        return {"results": [], "stage_counts": {"prefilter": 0, "lstm": 0, "final": 0}}
+    ranking = rank_jobs_for_resume(resume_data, jobs, final_model=final_model, jobs_version=version, max_results=top_k)
+    results = []
+    for result in ranking["results"][:top_k]:
+        job = jobs[result["index"]]
+        results.append({
+            "job_id": job.get("id"),
+            "job_title": job.get("Job Title"),
+            "stage": result["stage"],
+            "stage_scores": {stage: (float(score) if score is not None else None)
+                             for stage, score in result["stage_scores"].items()},
+            "match": result["match"],
+        })
+    return {"results": results, "stage_counts": ranking["stage_counts"]}
+
+
+async def _parse_upload(file: UploadFile) -> dict:
+    data = await file.read()
+    if len(data) > API_MAX_UPLOAD_MB * 1024 * 1024:
+        raise HTTPException(status_code=413, detail=f"Resume files are limited to {API_MAX_UPLOAD_MB} MB.")
+    parsed = await _run_blocking(parse_resume_bytes, data, file.filename, file.content_type)
+    if not parsed["raw_text"].strip():
+        raise HTTPException(status_code=415, detail="No text could be extracted. Upload a PDF or Word resume.")
+    return parsed
+
+
+# --- Endpoints ---
+app = FastAPI(title="AI-Powered Resume Screening API", lifespan=_lifespan)
+_authenticated = [Depends(_require_api_key)]
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready():
+    is_ready = all(state in ("ready", "unavailable") for state in _model_state.values())
+    return JSONResponse(status_code=200 if is_ready else 503,
+                        content={"ready": is_ready, "models": _model_state})
+
+
+@app.post("/parse", dependencies=_authenticated)
+async def parse(file: UploadFile = File(...)):
+    return await _parse_upload(file)
+
+
+@app.post("/match", dependencies=_authenticated)
+async def match(request: MatchRequest):
+    _check_model(request.model)
+    return await _run_blocking(_match, request.resume, request.job, request.job_id, request.model, request.deadline_ms)
+
+
+@app.post("/match/upload", dependencies=_authenticated)
+async def match_upload(file: UploadFile = File(...), job_id: int = Form(...), model: str = Form(MODEL_RULE_BASED),
+                       deadline_ms: Optional[int] = Form(None)):
+    _check_model(model)
+    resume_data = await _parse_upload(file)
+    job = await _run_blocking(_job_data, None, job_id)
+    result = await _run_blocking(match_resume_to_job, resume_data, job, model, deadline_ms)
+    return {"resume": resume_data, "result": result}
+
+
+@app.post("/match/batch", dependencies=_authenticated)
+async def match_batch(request: BatchMatchRequest):
+    """
+    Scores every item concurrently. The response keeps the item order; an item that fails or is
+    still running at the request timeout gets an "error" instead of a "result".
+    """
+    if len(request.items) > API_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {API_BATCH_MAX_ITEMS} items per batch.")
+    for item in request.items:
+        _check_model(item.model or request.model)
+
+    loop = asyncio.get_running_loop()
+    futures = [loop.run_in_executor(_executor, _match, item.resume, item.job, item.job_id,
+                                    item.model or request.model, request.deadline_ms)
+               for item in request.items]
+    if futures:
+        await asyncio.wait(futures, timeout=API_REQUEST_TIMEOUT_S)
+
+    results = []
+    for index, future in enumerate(futures):
+        if not future.done():
+            future.cancel()
+            results.append({"index": index, "error": f"Did not finish within {API_REQUEST_TIMEOUT_S}s."})
+        elif future.exception() is not None:
+            error = future.exception()
+            results.append({"index": index, "error": error.detail if isinstance(error, HTTPException) else str(error)})
+        else:
+            results.append({"index": index, "result": future.result()})
+    return {"results": results}
+
+
+@app.post("/rank", dependencies=_authenticated)
+async def rank(request: RankRequest):
+    _check_model(request.final_model)
+    resume_data = await _run_blocking(_resume_data, request.resume)
+    return await _run_blocking(_rank, resume_data, request.final_model, request.top_k)
+
+
+@app.post("/rank/upload", dependencies=_authenticated)
+async def rank_upload(file: UploadFile = File(...), final_model: str = Form(MODEL_TRANSFORMER_CUSTOM),
+                      top_k: int = Form(API_RANK_TOP_K, ge=1, le=API_RANK_MAX_TOP_K)):
+    _check_model(final_model)
+    resume_data = await _parse_upload(file)
+    ranking = await _run_blocking(_rank, resume_data, final_model, top_k)
+    return dict(ranking, resume=resume_data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the headless resume scoring API.")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=API_WORKERS, help="Uvicorn worker processes.")
+    args = parser.parse_args(argv)
+
+    if args.host not in ("127.0.0.1", "localhost") and not SCORING_API_KEY:
+        print("Refusing to listen on a non-loopback address without SCORING_API_KEY set.")
+        return 1
+
+    import uvicorn
+    uvicorn.run("services.http_api:app", host=args.host, port=args.port, workers=args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+Which job fields each derived artifact depends on, as per-artifact content hashes.
+
+Match results, the skill bitset index, the TF-IDF retrieval index and the job embeddings each read
+only some fields of a job. Hashing just those fields lets a job edit invalidate exactly the
+artifacts it affects: a salary change leaves every score and index valid, a description change
+re-scores the ML models but not the rule-based match, and so on.
+"""
+import json
+import hashlib
+
+from services.job_normalizer import skills_from_record, experience_min_years_from_record
+from config.constants import (
+    MODEL_GEMINI_PRO,
+    MODEL_LSTM_CUSTOM,
+    MODEL_TRANSFORMER_CUSTOM,
+    MODEL_RULE_BASED
+)
+
+ARTIFACT_SKILL_INDEX = "skill_index"            # services.skill_bitset (rule-based scores of many jobs)
+ARTIFACT_RETRIEVAL_INDEX = "retrieval_index"    # services.retrieval_index (TF-IDF term counts)
+ARTIFACT_JOB_EMBEDDINGS = "job_embeddings"      # models.job_embeddings (bi-encoder vectors)
+
+# Job fields behind each value: normalized skills / minimum years (whichever column they come from),
+# or a raw text column
+_FIELD_READERS = {
+    "skills": lambda job: sorted(set(skills_from_record(job))),
+    "experience_min_years": experience_min_years_from_record,
+}
+
+# The rule-based part (skills, experience) is in every model's result: the ML models only override the overall score
+_RULE_FIELDS = ("skills", "experience_min_years")
+ARTIFACT_FIELDS = {
+    MODEL_RULE_BASED: _RULE_FIELDS,
+    MODEL_LSTM_CUSTOM: _RULE_FIELDS + ("Job Description",),
+    MODEL_TRANSFORMER_CUSTOM: _RULE_FIELDS + ("Job Description",),
+    # Gemini's prompt (matcher._gemini_job_details); its fallback result is rule-based
+    MODEL_GEMINI_PRO: _RULE_FIELDS + ("Job Title", "Company Name", "Job Description", "Location",
+                                      "Experience Level", "Skills Required", "Industry", "Employment Mode"),
+    ARTIFACT_SKILL_INDEX: _RULE_FIELDS,
+    ARTIFACT_RETRIEVAL_INDEX: ("Job Title", "Job Description", "skills"),
+    ARTIFACT_JOB_EMBEDDINGS: ("Job Title", "Job Description", "skills"),
+}
+
+
+def _field_value(job: dict, field: str):
+    reader = _FIELD_READERS.get(field)
+    if reader is not None:
+        return reader(job)
+    value = job.get(field)
+    return value if isinstance(value, str) else ""  # Missing and NaN fields hash alike
+
+
+def artifact_hash(job: dict, artifact: str) -> str:
+    """Content hash of the job fields `artifact` (a model name or ARTIFACT_* constant) depends on."""
+    payload = json.dumps([_field_value(job, field) for field in ARTIFACT_FIELDS[artifact]], default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def changed_artifacts(old_job: dict, new_job: dict, artifacts=None) -> set:
+    """The artifacts (default: all) whose inputs differ between two versions of a job."""
+    return {artifact for artifact in (artifacts or ARTIFACT_FIELDS)
+            if artifact_hash(old_job, artifact) != artifact_hash(new_job, artifact)}
@@ -0,0 +1,154 @@
+import re
+import numpy as np
+import pandas as pd
+
+# Typed columns derived from the free-text job fields at ingest time.
+NORMALIZED_COLUMNS = ["salary_min", "salary_max", "country", "experience_min_years", "skills"]
+
+# Text field each typed column is derived from
+NORMALIZED_SOURCE_COLUMNS = {
+    "salary_min": "Salary Range",
+    "salary_max": "Salary Range",
+    "country": "Location",
+    "experience_min_years": "Experience Level",
+    "skills": "Skills Required",
+}
+
+# "$84k - $96k", "$70,000 - $100,000 per year", "$90k", "60-80k", "$1.2M". A k/M amount only
+# counts with salary context (a currency before it, or a range), so "401k match" is not $401,000.
+SALARY_PATTERN = (
+    r'(?P<currency>[$€£₹]|\b(?:usd|eur|gbp|inr)\b)?\s*'
+    r'(?P<min>\d[\d,]*(?:\.\d+)?)\s*(?P<min_unit>[kKmM](?![a-zA-Z]))?'
+    r'(?:\s*(?:-|–|to)\s*\$?\s*(?P<max>\d[\d,]*(?:\.\d+)?)\s*(?P<max_unit>[kKmM](?![a-zA-Z]))?)?'
+)
+SALARY_UNIT_MULTIPLIERS = {"k": 1_000.0, "m": 1_000_000.0}
+
+# Explicit year counts ("3+ years", "2-4 yrs") for experience levels without a keyword below.
+EXPERIENCE_YEARS_PATTERN = r'(\d+)\s*(?:\+|-\s*\d+)?\s*(?:years?|yrs?)'
+
+# Same keyword order and thresholds the rule-based matcher has always used.
+EXPERIENCE_LEVEL_MIN_YEARS = [("entry", 0), ("mid", 2), ("senior", 5)]
+
+
+def _salary_amount(numbers: pd.Series, units: pd.Series) -> pd.Series:
+    values = pd.to_numeric(numbers.str.replace(",", "", regex=False), errors="coerce")
+    multipliers = units.str.lower().map(SALARY_UNIT_MULTIPLIERS).fillna(1.0)
+    return values * multipliers
+
+
+def parse_salary_range(salary_text: pd.Series) -> pd.DataFrame:
+    """
+    Vectorized salary parsing into absolute `salary_min` / `salary_max` amounts.
+    A unit given only on the upper bound ("60-80k") applies to both bounds, a single
+    amount sets both bounds, and anything without a number (or a k/M amount without salary
+    context) yields NaN instead of a guess.
+    """
+    parts = salary_text.astype("string").str.extract(SALARY_PATTERN, flags=re.IGNORECASE)
+    # A unit-suffixed amount with no currency and no range is something else ("401k match")
+    no_context = parts["currency"].isna() & parts["max"].isna() & parts["min_unit"].notna()
+    parts.loc[no_context, ["min", "min_unit"]] = pd.NA
+    parts["min_unit"] = parts["min_unit"].fillna(parts["max_unit"])
+    parts["max"] = parts["max"].fillna(parts["min"])
+    parts["max_unit"] = parts["max_unit"].fillna(parts["min_unit"])
+
+    return pd.DataFrame({
+        "salary_min": _salary_amount(parts["min"], parts["min_unit"]),
+        "salary_max": _salary_amount(parts["max"], parts["max_unit"]),
+    }, index=salary_text.index)
+
+
+def parse_country(location_text: pd.Series) -> pd.Series:
+    """'City, Region, Country' -> 'Country' (the last comma-separated component)."""
+    country = location_text.astype("string").str.split(",").str[-1].str.strip()
+    return country.mask(country == "")
+
+
+def parse_experience_min_years(experience_text: pd.Series) -> pd.Series:
+    """Minimum years of experience implied by an 'Experience Level' value."""
+    level = experience_text.astype("string").str.lower().fillna("")
+    explicit_years = pd.to_numeric(level.str.extract(EXPERIENCE_YEARS_PATTERN)[0], errors="coerce")
+
+    conditions = [level.str.contains(keyword, regex=False).to_numpy(dtype=bool) for keyword, _ in EXPERIENCE_LEVEL_MIN_YEARS]
+    keyword_years = np.select(conditions, [years for _, years in EXPERIENCE_LEVEL_MIN_YEARS], default=0)
+
+    # Keywords first, as the rule-based matcher has always done ("Mid (3-5 years)" is 2)
+    has_keyword = pd.Series(np.any(conditions, axis=0), index=level.index)
+    return pd.Series(keyword_years, index=level.index).where(has_keyword, explicit_years.fillna(0)).astype(int)
+
+
+def parse_skills(skills_text: pd.Series) -> pd.Series:
+    """Comma-separated skills -> de-duplicated list of lowercase skills per row."""
+    exploded = skills_text.astype("string").str.lower().str.split(",").explode().str.strip()
+    exploded = exploded[exploded.notna() & (exploded != "")]
+    pairs = exploded.rename("skill").rename_axis("row").reset_index().drop_duplicates()
+    skills = pairs.groupby("row", sort=False)["skill"].agg(list)
+    return skills.reindex(skills_text.index).apply(lambda value: value if isinstance(value, list) else [])
+
+
+def normalize_jobs(df: pd.DataFrame) -> pd.DataFrame:
+    """Return a copy of `df` with the typed NORMALIZED_COLUMNS derived from its text fields."""
+    df = df.copy()
+    empty = pd.Series(pd.NA, index=df.index, dtype="string")
+
+    salaries = parse_salary_range(df.get("Salary Range", empty))
+    df["salary_min"] = salaries["salary_min"]
+    df["salary_max"] = salaries["salary_max"]
+    df["country"] = parse_country(df.get("Location", empty))
+    df["experience_min_years"] = parse_experience_min_years(df.get("Experience Level", empty))
+    df["skills"] = parse_skills(df.get("Skills Required", empty))
+    return df
+
+
+def _to_json_value(value):
+    if isinstance(value, list):
+        return value
+    if pd.isna(value):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def normalized_records(df: pd.DataFrame) -> list:
+    """Derived columns for every row of `df`, JSON-ready for Supabase insert/update payloads."""
+    normalized = normalize_jobs(df)[NORMALIZED_COLUMNS]
+    return [
+        {column: _to_json_value(value) for column, value in zip(NORMALIZED_COLUMNS, values)}
+        for values in normalized.itertuples(index=False, name=None)
+    ]
+
+
+def normalized_fields(job_dict: dict, partial: bool = False) -> dict:
+    """
+    Derived columns for a single job, JSON-ready for a Supabase insert/update payload.
+    With `partial`, only the columns whose source text field is in `job_dict` (a partial update
+    must not blank typed columns it did not touch).
+    """
+    fields = normalized_records(pd.DataFrame([job_dict]))[0]
+    if partial:
+        fields = {column: value for column, value in fields.items() if NORMALIZED_SOURCE_COLUMNS[column] in job_dict}
+    return fields
+
+
+def skills_from_record(job_data: dict) -> list:
+    """Lowercase skills of a job record, preferring the normalized `skills` column."""
+    skills = job_data.get("skills")
+    if isinstance(skills, (list, tuple, np.ndarray)):
+        return [str(s).strip().lower() for s in skills if str(s).strip()]
+    skills_str = job_data.get("Skills Required")
+    if not isinstance(skills_str, str):
+        return []
+    return [s.strip().lower() for s in skills_str.split(",") if s.strip()]
+
+
+def experience_min_years_from_record(job_data: dict) -> int:
+    """Minimum years for a job record, preferring the normalized `experience_min_years` column."""
+    years = job_data.get("experience_min_years")
+    if years is not None and not pd.isna(years):
+        return int(years)
+    level = str(job_data.get("Experience Level") or "").lower()
+    for keyword, min_years in EXPERIENCE_LEVEL_MIN_YEARS:
+        if keyword in level:
+            return min_years
+    explicit_years = re.search(EXPERIENCE_YEARS_PATTERN, level)
+    return int(explicit_years.group(1)) if explicit_years else 0
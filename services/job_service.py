@@ -1,20 +1,36 @@
+import hashlib
 import pandas as pd
 from datetime import datetime
-from config.supabase_config import supabase_client, JOBS_TABLE_NAME 
-from config.constants import COMMON_SKILLS
+from config.supabase_config import get_supabase_client, JOBS_TABLE_NAME 
+from config.constants import COMMON_SKILLS, JOBS_PAGE_SIZE
+from services.job_normalizer import normalized_fields, normalized_records
+from services.job_dependencies import changed_artifacts, ARTIFACT_RETRIEVAL_INDEX, ARTIFACT_JOB_EMBEDDINGS
 
 
 
-def load_jobs() -> pd.DataFrame:
-    """Load job postings from Supabase."""
+def load_jobs(page_size: int = JOBS_PAGE_SIZE) -> pd.DataFrame:
+    """
+    Load job postings from Supabase, newest first, `page_size` rows per request (a single
+    request stops at PostgREST's row cap). Any failed page gives an empty DataFrame, never a
+    partial catalog.
+    """
+    supabase_client = get_supabase_client()
     if not supabase_client:
         print("Supabase client not initialized. Cannot load jobs.")
         return pd.DataFrame() # Return empty DataFrame
 
     try:
-        response = supabase_client.table(JOBS_TABLE_NAME).select("*").order("created_at", desc=True).execute()
-        if response.data:
-            df = pd.DataFrame(response.data)
+        rows = []
+        while True:
+            # id breaks created_at ties, so no row moves between pages
+            page = supabase_client.table(JOBS_TABLE_NAME).select("*") \
+                .order("created_at", desc=True).order("id", desc=True) \
+                .range(len(rows), len(rows) + page_size - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < page_size:
+                break
+        if rows:
+            df = pd.DataFrame(rows)
             # Convert 'posted_date' if it's a string, Supabase might return ISO format
             if 'posted_date' in df.columns:
                 df['posted_date'] = pd.to_datetime(df['posted_date'], errors='coerce').dt.strftime('%Y-%m-%d')
@@ -27,10 +43,68 @@ def load_jobs() -> pd.DataFrame:
         print(f"Error loading jobs from Supabase: {e}")
         return pd.DataFrame()
 
+def get_jobs_version() -> str | None:
+    """
+    Return a cheap version token for the jobs dataset without downloading it.
+    Combines the row count with the latest `updated_at`, so any insert, edit or delete
+    produces a new token. Returns None if the version cannot be determined.
+    """
+    supabase_client = get_supabase_client()
+    if not supabase_client:
+        print("Supabase client not initialized. Cannot get jobs version.")
+        return None
+
+    try:
+        response = supabase_client.table(JOBS_TABLE_NAME).select("updated_at", count="exact") \
+            .order("updated_at", desc=True).limit(1).execute()
+        latest_update = response.data[0]["updated_at"] if response.data else ""
+        return hashlib.sha1(f"{response.count}:{latest_update}".encode("utf-8")).hexdigest()
+    except Exception as e:
+        print(f"Error getting jobs version from Supabase: {e}")
+        return None
+
+def _refresh_job_indexes(upserted=None, removed_ids=None, artifacts=None):
+    """
+    Apply a job change to the TF-IDF retrieval index (incrementally) and queue a job embeddings refresh (best effort).
+    `artifacts` limits the refresh to the indexes an edit affects (see services.job_dependencies).
+    """
+    if artifacts is None or ARTIFACT_RETRIEVAL_INDEX in artifacts:
+        try:
+            from services import retrieval_index  # local import: scikit-learn/scipy load only when jobs change
+            if upserted:
+                retrieval_index.upsert_jobs(upserted)
+            if removed_ids:
+                retrieval_index.remove_jobs(removed_ids)
+        except Exception as e:
+            print(f"Failed to update retrieval index, run `python -m services.retrieval_index` to resync: {e}")
+
+    if artifacts is None or ARTIFACT_JOB_EMBEDDINGS in artifacts:
+        try:
+            queue_job_embeddings_sync()
+        except Exception as e:
+            print(f"Failed to queue a job embeddings refresh, run `python -m models.job_embeddings` to resync: {e}")
+
+def queue_job_embeddings_sync():
+    """
+    Queues a background re-sync of the job embeddings (encoding needs the Transformer model,
+    which should not load in the app process). Nothing to do until bi-encoder mode is set up;
+    a sync that is already queued covers this change too. Returns the task id, or None.
+    """
+    from models.job_embeddings import has_job_embeddings  # local import: numpy only, torch loads in the worker
+    from services.task_queue import submit_task, list_tasks
+    from services.task_handlers import TASK_SYNC_JOB_EMBEDDINGS
+
+    if not has_job_embeddings():
+        return None
+    if list_tasks(kind=TASK_SYNC_JOB_EMBEDDINGS, statuses=("queued",), limit=1):
+        return None
+    return submit_task(TASK_SYNC_JOB_EMBEDDINGS, {}, ref="job_embeddings")
+
 def add_job(job_dict: dict) -> bool:
     """Add a new job posting to Supabase.
     Returns True if successful, False otherwise.
     """
+    supabase_client = get_supabase_client()
     if not supabase_client:
         print("Supabase client not initialized. Cannot add job.")
         return False
@@ -39,10 +113,13 @@ def add_job(job_dict: dict) -> bool:
     try:
         # Remove 'id' if present, as Supabase handles it
         job_dict.pop('id', None) 
+        # Derive typed salary/country/experience/skills columns once, at write time
+        job_dict.update(normalized_fields(job_dict))
         
         response = supabase_client.table(JOBS_TABLE_NAME).insert(job_dict).execute()
         if response.data: # Check if data is returned on success
             print(f"Job added successfully to Supabase: {response.data[0]['id']}")
+            _refresh_job_indexes(upserted=response.data)
             return True
         else:
             # print(f"Failed to add job. Supabase response: {response}") 
@@ -55,10 +132,13 @@ def add_job(job_dict: dict) -> bool:
         print(f"Error adding job to Supabase: {e}")
         return False
 
-def update_job(job_id: int, updated_job_data: dict) -> bool:
+def update_job(job_id: int, updated_job_data: dict, previous_job: dict | None = None) -> bool:
     """Update a job in Supabase by its ID.
+    With the job as it was before the edit (`previous_job`), only the indexes that read one of
+    the changed fields are refreshed; see job_changed_artifacts.
     Returns True if successful, False otherwise.
     """
+    supabase_client = get_supabase_client()
     if not supabase_client:
         print("Supabase client not initialized. Cannot update job.")
         return False
@@ -66,10 +146,14 @@ def update_job(job_id: int, updated_job_data: dict) -> bool:
     try:
         # Remove 'id' from updated_job_data if it's there, as it's used for matching
         updated_job_data.pop('id', None)
+        # Keep the typed columns in sync with the edited text fields
+        updated_job_data.update(normalized_fields(updated_job_data, partial=True))
         
         response = supabase_client.table(JOBS_TABLE_NAME).update(updated_job_data).eq("id", job_id).execute()
         if response.data:
             print(f"Job with ID {job_id} updated successfully in Supabase.")
+            artifacts = job_changed_artifacts(previous_job, response.data[0]) if previous_job is not None else None
+            _refresh_job_indexes(upserted=response.data, artifacts=artifacts)
             return True
         else:
             if hasattr(response, 'error') and response.error:
@@ -87,6 +171,7 @@ def delete_job(job_id: int) -> bool:
     """Delete a job posting from Supabase by its ID.
     Returns True if successful, False otherwise.
     """
+    supabase_client = get_supabase_client()
     if not supabase_client:
         print("Supabase client not initialized. Cannot delete job.")
         return False
@@ -94,6 +179,7 @@ def delete_job(job_id: int) -> bool:
         response = supabase_client.table(JOBS_TABLE_NAME).delete().eq("id", job_id).execute()
         if response.data:
             print(f"Job with ID {job_id} deleted successfully from Supabase.")
+            _refresh_job_indexes(removed_ids=[job_id])
             return True
         else:
             if hasattr(response, 'error') and response.error:
@@ -107,8 +193,17 @@ def delete_job(job_id: int) -> bool:
         print(f"Error deleting job {job_id} from Supabase: {e}")
         return False
 
+def job_changed_artifacts(previous_job: dict, updated_job: dict) -> set:
+    """
+    The cached results and precomputed features an edit invalidates: model names whose match
+    results change, and/or the skill index, retrieval index and embeddings (job_dependencies.ARTIFACT_*).
+    Empty when only fields nothing depends on changed, e.g. the salary or posting date.
+    """
+    return changed_artifacts(previous_job, updated_job)
+
 def get_job_by_id(job_id: int) -> dict | None:
     """Fetch a single job by its ID from Supabase."""
+    supabase_client = get_supabase_client()
     if not supabase_client:
         print("Supabase client not initialized. Cannot get job by ID.")
         return None
@@ -123,15 +218,59 @@ def get_job_by_id(job_id: int) -> dict | None:
         print(f"Error fetching job {job_id} by ID: {e}")
         return None
 
+def backfill_normalized_columns(batch_size: int = 500) -> int:
+    """
+    Derive the typed columns for every existing job and write them back in batches.
+    Intended as a one-off after adding the columns to an existing install.
+    Returns the number of jobs updated.
+    """
+    supabase_client = get_supabase_client()
+    if not supabase_client:
+        print("Supabase client not initialized. Cannot backfill normalized job columns.")
+        return 0
+
+    df = load_jobs()
+    if df.empty:
+        return 0
+
+    updates = [
+        {"id": int(job_id), **fields}
+        for job_id, fields in zip(df["id"], normalized_records(df))
+    ]
+
+    updated = 0
+    for start in range(0, len(updates), batch_size):
+        batch = updates[start:start + batch_size]
+        try:
+            supabase_client.table(JOBS_TABLE_NAME).upsert(batch, on_conflict="id").execute()
+            updated += len(batch)
+        except Exception as e:
+            print(f"Error backfilling normalized columns for jobs {batch[0]['id']}..{batch[-1]['id']}: {e}")
+    print(f"Backfilled normalized columns for {updated} of {len(updates)} jobs.")
+    return updated
+
 def get_all_skills() -> list:
     """
-    Load all unique skills from the 'Skills Required' column in the Supabase jobs table
-    and combine them with a predefined set of common skills.
+    Load all unique skills from the normalized `skills` column in the Supabase jobs table
+    (computed server-side) and combine them with a predefined set of common skills.
+    Falls back to splitting the 'Skills Required' text column for installs without it.
     """
-    df = load_jobs() # Loads from Supabase
-    
     all_skills_set = set(s.lower() for s in COMMON_SKILLS)
 
+    supabase_client = get_supabase_client()
+    if supabase_client:
+        try:
+            response = supabase_client.rpc("distinct_job_skills").execute()
+            if response.data:
+                all_skills_set.update(skill for skill in response.data if skill)
+                return list(all_skills_set)
+            # No typed skills yet (e.g. before --backfill-normalized): read the text column below
+            print("distinct_job_skills returned no skills, falling back to full scan.")
+        except Exception as e:
+            print(f"distinct_job_skills RPC unavailable, falling back to full scan: {e}")
+
+    df = load_jobs() # Loads from Supabase
+
     if "Skills Required" not in df.columns or df.empty:
         print("No 'Skills Required' column found in jobs data or no jobs loaded. Using only common skills.")
         return list(all_skills_set)
@@ -144,6 +283,66 @@ def get_all_skills() -> list:
                 
     return list(all_skills_set)
 
+def _normalize_skill_list(skills) -> list:
+    return sorted(set(s.strip().lower() for s in skills if s and s.strip()))
+
+def get_jobs_with_any_skills(skills: list) -> pd.DataFrame:
+    """Jobs requiring at least one of `skills` (GIN-indexed `skills && ...` query)."""
+    skills = _normalize_skill_list(skills)
+    supabase_client = get_supabase_client()
+    if not supabase_client or not skills:
+        return pd.DataFrame()
+    try:
+        response = supabase_client.table(JOBS_TABLE_NAME).select("*").overlaps("skills", skills).execute()
+        return pd.DataFrame(response.data or [])
+    except Exception as e:
+        print(f"Error querying jobs with any of skills {skills}: {e}")
+        return pd.DataFrame()
+
+def get_jobs_with_all_skills(skills: list) -> pd.DataFrame:
+    """Jobs requiring every one of `skills` (GIN-indexed `skills @> ...` query)."""
+    skills = _normalize_skill_list(skills)
+    supabase_client = get_supabase_client()
+    if not supabase_client or not skills:
+        return pd.DataFrame()
+    try:
+        response = supabase_client.table(JOBS_TABLE_NAME).select("*").contains("skills", skills).execute()
+        return pd.DataFrame(response.data or [])
+    except Exception as e:
+        print(f"Error querying jobs with all of skills {skills}: {e}")
+        return pd.DataFrame()
+
+def get_skill_frequencies(limit: int | None = None) -> pd.DataFrame:
+    """Number of jobs requiring each skill, aggregated server-side. Columns: skill, job_count."""
+    supabase_client = get_supabase_client()
+    if not supabase_client:
+        print("Supabase client not initialized. Cannot get skill frequencies.")
+        return pd.DataFrame(columns=["skill", "job_count"])
+    try:
+        response = supabase_client.rpc("job_skill_frequencies", {"p_limit": limit}).execute()
+        return pd.DataFrame(response.data or [], columns=["skill", "job_count"])
+    except Exception as e:
+        print(f"Error getting skill frequencies: {e}")
+        return pd.DataFrame(columns=["skill", "job_count"])
+
+def get_candidate_jobs_for_skills(resume_skills: list, limit: int = 50) -> pd.DataFrame:
+    """
+    Candidate jobs for a resume: jobs sharing at least one skill with it, ranked by the
+    share of each job's required skills the resume covers. Served by an indexed RPC
+    instead of downloading and scanning every job.
+    Adds `matched_skills_count` and `skill_match_ratio` columns.
+    """
+    skills = _normalize_skill_list(resume_skills)
+    supabase_client = get_supabase_client()
+    if not supabase_client or not skills:
+        return pd.DataFrame()
+    try:
+        response = supabase_client.rpc("rank_jobs_by_skills", {"p_skills": skills, "p_limit": limit}).execute()
+        return pd.DataFrame(response.data or [])
+    except Exception as e:
+        print(f"Error retrieving candidate jobs for skills: {e}")
+        return pd.DataFrame()
+
 # Functions like format_job_short and truncate_description can remain as they are,
 # as they operate on DataFrame rows or strings, independent of data source.
 def format_job_short(job_row: pd.Series) -> str:
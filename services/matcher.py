@@ -1,27 +1,59 @@
 import random
 import json
-from models.gemini_model import analyze_resume_with_gemini
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FuturesTimeoutError
+from models.gemini_model import analyze_resume_with_gemini, analyze_resumes_with_gemini_batch, is_gemini_available
+from services.job_normalizer import skills_from_record, experience_min_years_from_record
+from services.skill_bitset import get_job_skill_index
+from services.job_dependencies import artifact_hash, ARTIFACT_FIELDS
+from services.minhash import MinHashLSH, minhash_signature
 
-from models.custom_model_predictor import predict_with_lstm, predict_with_transformer, \
-                                          load_lstm_model_and_tokenizer, load_transformer_model_and_tokenizer
+# Runs the models in-process, or on the inference worker pool when INFERENCE_SERVER_ADDRESS is set
+from models.inference_client import predict_with_lstm, predict_with_transformer, \
+                                    predict_batch_with_lstm, predict_batch_with_transformer, \
+                                    model_availability
 
 from config.constants import (
     MODEL_GEMINI_PRO,
     MODEL_LSTM_CUSTOM,
     MODEL_TRANSFORMER_CUSTOM,
-    MODEL_RULE_BASED
+    MODEL_RULE_BASED,
+    CASCADE_PREFILTER_MIN_SCORE,
+    CASCADE_PREFILTER_KEEP,
+    CASCADE_FINAL_K,
+    COMPARE_MODEL_TIMEOUTS_S,
+    COMPARE_QUEUED_POLL_S,
+    COMPARE_MAX_QUEUED_S,
+    MATCH_MAX_WORKERS,
+    MODEL_LATENCY_SLO_MS,
+    MATCH_RESULT_CACHE_SIZE,
+    MATCH_RESULT_CACHE_TTL_S,
+    MATCH_FINISH_IN_BACKGROUND,
+    RESUME_NEAR_DUPLICATE_THRESHOLD
 )
 
-print("Matcher.py: Attempting to pre-load LSTM model and tokenizer...")
-LOADED_LSTM_SUCCESS = load_lstm_model_and_tokenizer()
-print(f"Matcher.py: LSTM pre-load status: {'Success' if LOADED_LSTM_SUCCESS else 'Failed/Not Found'}")
+# The LSTM and Transformer are loaded (and TensorFlow/PyTorch imported) on first use, not here.
 
-print("Matcher.py: Attempting to pre-load Transformer model and tokenizer...")
-LOADED_TRANSFORMER_SUCCESS = load_transformer_model_and_tokenizer()
-print(f"Matcher.py: Transformer pre-load status: {'Success' if LOADED_TRANSFORMER_SUCCESS else 'Failed/Not Found'}")
+# Models run by the compare-all-models mode, in display order
+COMPARISON_MODELS = [MODEL_RULE_BASED, MODEL_LSTM_CUSTOM, MODEL_TRANSFORMER_CUSTOM, MODEL_GEMINI_PRO]
 
 
-def match_resume_to_job(resume_data, job_data, model_choice="Rule-Based Fallback"):
+def get_model_availability():
+    """Which scoring models this deployment can use, checked without loading any of them."""
+    local_models = model_availability()
+    return {
+        MODEL_GEMINI_PRO: is_gemini_available(),
+        MODEL_LSTM_CUSTOM: local_models["lstm"],
+        MODEL_TRANSFORMER_CUSTOM: local_models["transformer"],
+        MODEL_RULE_BASED: True,
+    }
+
+
+def match_resume_to_job(resume_data, job_data, model_choice="Rule-Based Fallback", deadline_ms=None):
     """
     Matches a resume to a job description using the selected model.
 
@@ -34,88 +66,606 @@ def match_resume_to_job(resume_data, job_data, model_choice="Rule-Based Fallback
                                         "Experience Level" (string).
         model_choice (str): The model to use for matching. 
                            Options: "Gemini Pro", "LSTM Model", "Transformer Model", "Rule-Based Fallback".
+        deadline_ms (int, optional): Latency budget for the whole call. The chosen model gets
+                           min(deadline_ms, its MODEL_LATENCY_SLO_MS); if it has not answered by
+                           then, the best result available (LSTM, else rule-based) is returned
+                           with "degraded": True. None waits for the model however long it takes.
 
     Returns:
         dict: A dictionary containing matching results.
     """
+    if deadline_ms is not None:
+        return _match_within_deadline(resume_data, job_data, model_choice, deadline_ms)
+    return _reported(_match_with_model(resume_data, job_data, model_choice), model_choice)
+
+
+def _reported(result, model_choice):
+    """
+    A result as handed to callers: "model_used" names the model whose score it is (rule-based
+    when the chosen model failed) and the internal "model_failed" flag is dropped.
+    """
+    result = dict(result)
+    model_failed = result.pop("model_failed", False)
+    result.setdefault("model_used", MODEL_RULE_BASED if model_failed else model_choice)
+    return result
+
+
+def _match_with_model(resume_data, job_data, model_choice):
+    """
+    Runs the chosen model to completion. If it fails, the rule-based result is returned with
+    "model_failed": True (internal: see _reported).
+    """
     resume_text = resume_data.get("raw_text", "")
     # Ensure resume skills are lowercase strings in a set for _fallback_result
     resume_skills_set = set(s.lower() for s in resume_data.get("skills", [])) 
     resume_experience_parsed = resume_data.get("years_experience", 0) # Parsed years
 
     # Ensure job skills are lowercase strings in a set for _fallback_result
-    job_skills_str = job_data.get("Skills Required", "")
-    job_skills_set = set(s.strip().lower() for s in job_skills_str.split(",") if s.strip())
-    job_experience_level_raw = job_data.get("Experience Level", "").lower()
+    # (read from the typed columns written at ingest, parsed from text only for legacy rows)
+    job_skills_set = set(skills_from_record(job_data))
+    job_experience_min_years = experience_min_years_from_record(job_data)
     job_description_text = job_data.get("Job Description", "")
 
     if model_choice == MODEL_GEMINI_PRO:
-        # Construct the detailed job description string for Gemini's prompt
-        gemini_job_details = {
-            "Job Title": job_data.get("Job Title", ""),
-            "Company Name": job_data.get("Company Name", ""),
-            "Job Description": job_description_text, # Core description
-            "Location": job_data.get("Location", ""),
-            "Experience Level": job_data.get("Experience Level", ""), # Raw string for Gemini
-            "Skills Required": job_skills_str, # Raw string for Gemini
-            "Industry": job_data.get("Industry", ""),
-            "Employment Mode": job_data.get("Employment Mode", "")
-        }
-   
-        gemini_response = analyze_resume_with_gemini(resume_text, gemini_job_details)
+        gemini_response = analyze_resume_with_gemini(resume_text, _gemini_job_details(job_data))
 
         if gemini_response and "error" not in gemini_response:
-                return {
-                "match_score": int(gemini_response.get("match_score", 0)),
-                "skill_match": int(gemini_response.get("skill_match_score", gemini_response.get("skill_match", 0))), # Prioritize skill_match_score
-                "experience_match": int(gemini_response.get("experience_match_score", gemini_response.get("experience_match", 0))),
-                "missing_skills": gemini_response.get("missing_skills_from_resume", gemini_response.get("missing_skills", [])),
-                "matched_skills": gemini_response.get("matched_skills", []),
-                "suggestions": gemini_response.get("suggestions_for_candidate", gemini_response.get("suggestions", "Review job requirements for further alignment.")),
-                "gemini_suitability_summary": gemini_response.get("suitability_summary", "")
-            }
+            return _gemini_match_result(gemini_response)
         else:
             print(f"Gemini Pro analysis failed or returned error. Response: {gemini_response}")
             # Fallback to rule-based if Gemini fails
-            return _fallback_result(resume_skills_set, job_skills_set, resume_experience_parsed, job_experience_level_raw)
+            return dict(_fallback_result(resume_skills_set, job_skills_set, resume_experience_parsed, job_experience_min_years), model_failed=True)
 
     elif model_choice == MODEL_LSTM_CUSTOM:
         print("Using LSTM Model for matching...")
         ml_match_score = predict_with_lstm(resume_text, job_description_text)
         if ml_match_score is not None:
             # Use ML score for overall, fallback for details
-            fallback_details = _fallback_result(resume_skills_set, job_skills_set, resume_experience_parsed, job_experience_level_raw)
+            fallback_details = _fallback_result(resume_skills_set, job_skills_set, resume_experience_parsed, job_experience_min_years)
             fallback_details["match_score"] = int(ml_match_score) # Override with ML model's score
             fallback_details["suggestions"] = "LSTM model provided the overall score. Detailed skill/experience match is rule-based."
             return fallback_details
         else:
             print("LSTM Model prediction failed. Falling back to rule-based.")
-            return _fallback_result(resume_skills_set, job_skills_set, resume_experience_parsed, job_experience_level_raw)
+            return dict(_fallback_result(resume_skills_set, job_skills_set, resume_experience_parsed, job_experience_min_years), model_failed=True)
 
     elif model_choice == MODEL_TRANSFORMER_CUSTOM:
         print("Using Transformer Model for matching...")
         ml_match_score = predict_with_transformer(resume_text, job_description_text)
         if ml_match_score is not None:
             # Use ML score for overall, fallback for details
-            fallback_details = _fallback_result(resume_skills_set, job_skills_set, resume_experience_parsed, job_experience_level_raw)
+            fallback_details = _fallback_result(resume_skills_set, job_skills_set, resume_experience_parsed, job_experience_min_years)
             fallback_details["match_score"] = int(ml_match_score) # Override with ML model's score
             fallback_details["suggestions"] = "Transformer model provided the overall score. Detailed skill/experience match is rule-based."
             return fallback_details
         else:
             print("Transformer Model prediction failed. Falling back to rule-based.")
-            return _fallback_result(resume_skills_set, job_skills_set, resume_experience_parsed, job_experience_level_raw)
+            return dict(_fallback_result(resume_skills_set, job_skills_set, resume_experience_parsed, job_experience_min_years), model_failed=True)
             
     else: # Default to MODEL_RULE_BASED (fallback)
         print(f"Model choice '{model_choice}' not fully recognized or is fallback. Using rule-based.")
-        return _fallback_result(resume_skills_set, job_skills_set, resume_experience_parsed, job_experience_level_raw)
+        return _fallback_result(resume_skills_set, job_skills_set, resume_experience_parsed, job_experience_min_years)
+
+
 
+# Shared by comparisons and deadline-bound matches. A model that runs past its timeout cannot be
+# interrupted, so its thread finishes in the background; the pool size caps how many can pile up.
+_match_executor = None
+_match_executor_lock = threading.Lock()
 
 
-def _fallback_result(resume_skills, job_skills, resume_experience_years_parsed, job_experience_level_raw):
+def _get_match_executor():
+    global _match_executor
+    with _match_executor_lock:
+        if _match_executor is None:
+            _match_executor = ThreadPoolExecutor(max_workers=MATCH_MAX_WORKERS, thread_name_prefix="match")
+        return _match_executor
+
+
+# Results of slow models, keyed by model and the exact inputs it reads, so a model that missed
+# its deadline (and finished in the background) answers the next identical request immediately.
+_result_cache = OrderedDict()
+_inflight_matches = {}
+_result_cache_lock = threading.Lock()
+# Resumes with cached results, by MinHash signature, so a near-duplicate resubmission reuses them
+_resume_lsh = MinHashLSH()
+_cached_resumes = OrderedDict()
+
+
+def _resume_fingerprint(resume_data):
+    payload = json.dumps([
+        resume_data.get("raw_text", ""),
+        sorted(s.lower() for s in resume_data.get("skills", [])),
+        resume_data.get("years_experience", 0),
+    ], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _result_cache_key(resume_data, job_data, model_choice, resume_fingerprint=None):
+    payload = json.dumps([
+        model_choice,
+        resume_fingerprint or _resume_fingerprint(resume_data),
+        # Only the job fields this model reads: edits to other fields (e.g. salary) keep cached results valid
+        artifact_hash(job_data, model_choice if model_choice in ARTIFACT_FIELDS else MODEL_RULE_BASED),
+    ], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _resume_signature(resume_data):
+    """The resume's MinHash signature (computed at parse time; from the raw text for older callers)."""
+    signature = resume_data.get("minhash")
+    return signature if signature is not None else minhash_signature(resume_data.get("raw_text", ""))
+
+
+def _remember_resume(resume_data):
+    """Makes a resume with cached results findable by its near-duplicates (the last MATCH_RESULT_CACHE_SIZE resumes)."""
+    signature = _resume_signature(resume_data)
+    if signature is None:
+        return
+    fingerprint = _resume_fingerprint(resume_data)
+    with _result_cache_lock:
+        _cached_resumes[fingerprint] = True
+        _cached_resumes.move_to_end(fingerprint)
+        evicted = _cached_resumes.popitem(last=False)[0] if len(_cached_resumes) > MATCH_RESULT_CACHE_SIZE else None
+    _resume_lsh.add(fingerprint, signature)
+    if evicted is not None:
+        _resume_lsh.remove(evicted)
+
+
+def _cached_match(resume_data, job_data, model_choice):
+    """
+    The cached result for this resume, else for a near-duplicate of it (a slightly edited
+    resubmission) flagged "near_duplicate" with its estimated similarity. None if neither is cached.
+    """
+    fingerprint = _resume_fingerprint(resume_data)
+    cached = _cache_get(_result_cache_key(resume_data, job_data, model_choice, fingerprint))
+    if cached is not None:
+        return cached
+    signature = _resume_signature(resume_data)
+    if signature is None:
+        return None
+    for other_fingerprint, similarity in _resume_lsh.near_duplicates(signature, RESUME_NEAR_DUPLICATE_THRESHOLD):
+        if other_fingerprint == fingerprint:
+            continue
+        cached = _cache_get(_result_cache_key(resume_data, job_data, model_choice, other_fingerprint))
+        if cached is not None:
+            cached.update(near_duplicate=True, near_duplicate_similarity=round(similarity, 3))
+            return cached
+    return None
+
+
+def _cache_get(key):
+    with _result_cache_lock:
+        entry = _result_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.time() - stored_at > MATCH_RESULT_CACHE_TTL_S:
+            del _result_cache[key]
+            return None
+        _result_cache.move_to_end(key)
+        return dict(result)
+
+
+def _cache_put(key, result):
+    with _result_cache_lock:
+        _result_cache[key] = (time.time(), dict(result))
+        _result_cache.move_to_end(key)
+        while len(_result_cache) > MATCH_RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+
+
+def _submit_cached_match(resume_data, job_data, model_choice, fill_cache):
+    """
+    Runs a model on the pool; its result is cached when it completes, even after the caller gave
+    up. A request identical to one still running joins that run instead of starting another.
+    """
+    key = _result_cache_key(resume_data, job_data, model_choice)
+    with _result_cache_lock:
+        future = _inflight_matches.get(key)
+        if future is not None:
+            return future
+        future = _get_match_executor().submit(_match_with_model, resume_data, job_data, model_choice)
+        _inflight_matches[key] = future
+
+    def _finish(done_future):
+        with _result_cache_lock:
+            _inflight_matches.pop(key, None)
+        # Only real model answers are cached, not the rule-based stand-in returned on a model error
+        if fill_cache and not done_future.cancelled() and done_future.exception() is None \
+                and not done_future.result().get("model_failed"):
+            _cache_put(key, done_future.result())
+            _remember_resume(resume_data)
+    future.add_done_callback(_finish)
+    return future
+
+
+def _match_within_deadline(resume_data, job_data, model_choice, deadline_ms, finish_in_background=MATCH_FINISH_IN_BACKGROUND):
+    """
+    match_resume_to_job with a latency budget. The chosen model runs on the match pool and gets
+    min(deadline_ms, MODEL_LATENCY_SLO_MS[model]); for Transformer/Gemini the LSTM runs alongside
+    as the backup. If the chosen model misses its budget, the LSTM result is used if it is ready,
+    else the rule-based one, and the result is marked "degraded". The slow call keeps running
+    (threads cannot be interrupted); with `finish_in_background` its result fills the cache for
+    the next identical request.
+    """
+    if model_choice not in (MODEL_GEMINI_PRO, MODEL_LSTM_CUSTOM, MODEL_TRANSFORMER_CUSTOM):
+        return _reported(_match_with_model(resume_data, job_data, model_choice), model_choice)  # Rule-based is instant
+    start = time.perf_counter()
+
+    cached = _cached_match(resume_data, job_data, model_choice)
+    if cached is not None:
+        cached.update(model_used=model_choice, degraded=False)
+        return cached
+
+    slo_ms = MODEL_LATENCY_SLO_MS.get(model_choice)
+    budget_s = min(deadline_ms, slo_ms) / 1000.0 if slo_ms else deadline_ms / 1000.0
+    future = _submit_cached_match(resume_data, job_data, model_choice, finish_in_background)
+
+    backup = None
+    if model_choice != MODEL_LSTM_CUSTOM and get_model_availability()[MODEL_LSTM_CUSTOM]:
+        backup = _cached_match(resume_data, job_data, MODEL_LSTM_CUSTOM)
+        if backup is None:
+            backup = _submit_cached_match(resume_data, job_data, MODEL_LSTM_CUSTOM, True)
+
+    try:
+        result = _reported(future.result(timeout=budget_s), model_choice)
+        result.update(degraded=False)
+        return result
+    except FuturesTimeoutError:
+        pass
+    except Exception as e:
+        print(f"{model_choice} failed within its deadline: {e}.")
+
+    # The chosen model missed its budget: the LSTM gets whatever is left of the overall deadline
+    best_result, best_model = rule_based_match(resume_data, job_data), MODEL_RULE_BASED
+    if backup is not None and not isinstance(backup, dict):
+        remaining_s = deadline_ms / 1000.0 - (time.perf_counter() - start)
+        try:
+            backup = backup.result(timeout=max(0.0, remaining_s))
+        except Exception:
+            backup = None  # Not ready (or failed): keep the rule-based result
+    if backup is not None and not backup.get("model_failed"):  # A failed LSTM returned the rule-based result
+        best_result, best_model = backup, MODEL_LSTM_CUSTOM
+
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+    print(f"{model_choice} did not answer within {budget_s * 1000:.0f} ms; returning the {best_model} result "
+          f"after {elapsed_ms:.0f} ms (degraded).")
+    degraded = _reported(best_result, best_model)
+    degraded.update(model_used=best_model, degraded=True, degraded_from=model_choice)
+    degraded["suggestions"] = (f"{model_choice} took longer than its {budget_s:g} s budget, so this is the "
+                               f"{best_model} result. {best_result.get('suggestions', '')}").strip()
+    return degraded
+
+
+def iter_model_comparison(resume_data, job_data, models=None, timeouts=None):
+    """
+    Scores one parsed resume against one job with several models at once and yields each
+    result as soon as that model finishes, fastest first.
+
+    The rule-based model is scored inline (it is instant); the others run on the shared thread
+    pool, so the total wall time is close to the slowest model instead of the sum. Each model
+    has its own timeout (seconds, default COMPARE_MODEL_TIMEOUTS_S), counted from when it starts
+    running, so waiting for a free pool thread does not use it up; a model that has not started
+    COMPARE_MAX_QUEUED_S after submission (the pool is held by slow runs) is cancelled and times
+    out. A model that times out, raises or fails is reported with the rule-based result (its
+    "model_used") so every model still gets a row; only "ok" rows are that model's own score.
+
+    Yields:
+        dict: {"model", "status" ("ok", "timeout" or "error"), "elapsed_s", "result"}
+    """
+    models = models or COMPARISON_MODELS
+    timeouts = dict(COMPARE_MODEL_TIMEOUTS_S, **(timeouts or {}))
+    executor = _get_match_executor()
+
+    start = time.perf_counter()
+    started_at = {}
+
+    def _run(model_name):
+        started_at[model_name] = time.perf_counter()
+        return _match_with_model(resume_data, job_data, model_name)
+
+    pending = {}
+    for model_name in models:
+        if model_name == MODEL_RULE_BASED:
+            continue
+        pending[executor.submit(_run, model_name)] = model_name
+    if MODEL_RULE_BASED in models:
+        yield {"model": MODEL_RULE_BASED, "status": "ok", "elapsed_s": time.perf_counter() - start,
+               "result": _reported(rule_based_match(resume_data, job_data), MODEL_RULE_BASED)}
+
+    queued_deadline = start + COMPARE_MAX_QUEUED_S
+
+    def _deadline(model_name):
+        return started_at[model_name] + timeouts.get(model_name, max(timeouts.values()))
+
+    def _timed_out(future, model_name, now):
+        if model_name in started_at:
+            return _deadline(model_name) <= now
+        # Still queued: give up once the queue limit passes (cancel fails if it has just started)
+        return now >= queued_deadline and future.cancel()
+
+    while pending:
+        deadlines = [_deadline(model_name) for model_name in pending.values() if model_name in started_at]
+        if len(deadlines) < len(pending):
+            # Models still waiting for a pool thread have no deadline yet: check again shortly
+            poll_at = time.perf_counter() + COMPARE_QUEUED_POLL_S
+            deadlines.append(min(poll_at, queued_deadline) if queued_deadline > time.perf_counter() else poll_at)
+        done, _ = wait(pending, timeout=max(0.0, min(deadlines) - time.perf_counter()), return_when=FIRST_COMPLETED)
+        now = time.perf_counter()
+        for future in done:
+            model_name = pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"{model_name} failed during comparison: {e}. Using rule-based result.")
+                result = dict(rule_based_match(resume_data, job_data), model_failed=True)
+            status = "error" if result.get("model_failed") else "ok"
+            yield {"model": model_name, "status": status, "elapsed_s": now - start, "result": _reported(result, model_name)}
+        for future, model_name in list(pending.items()):
+            if _timed_out(future, model_name, now):
+                del pending[future]
+                if model_name in started_at:
+                    print(f"{model_name} exceeded its {timeouts.get(model_name)} s comparison timeout. Using rule-based result.")
+                else:
+                    print(f"{model_name} waited over {COMPARE_MAX_QUEUED_S} s for a free thread. Using rule-based result.")
+                result = _reported(rule_based_match(resume_data, job_data), MODEL_RULE_BASED)
+                result["suggestions"] = f"{model_name} did not answer in time; this row shows the rule-based result."
+                yield {"model": model_name, "status": "timeout", "elapsed_s": now - start, "result": result}
+
+
+def compare_all_models(resume_data, job_data, models=None, timeouts=None):
+    """All results of iter_model_comparison as a dict keyed by model name, in the requested model order."""
+    models = models or COMPARISON_MODELS
+    outcomes = {outcome["model"]: outcome for outcome in iter_model_comparison(resume_data, job_data, models, timeouts)}
+    return {model_name: outcomes[model_name] for model_name in models}
+
+
+def _gemini_job_details(job_data):
+    """The job fields sent in Gemini's prompt."""
+    return {
+        "Job Title": job_data.get("Job Title", ""),
+        "Company Name": job_data.get("Company Name", ""),
+        "Job Description": job_data.get("Job Description", ""), # Core description
+        "Location": job_data.get("Location", ""),
+        "Experience Level": job_data.get("Experience Level", ""), # Raw string for Gemini
+        "Skills Required": job_data.get("Skills Required", ""), # Raw string for Gemini
+        "Industry": job_data.get("Industry", ""),
+        "Employment Mode": job_data.get("Employment Mode", "")
+    }
+
+
+def _gemini_match_result(gemini_response):
+    """Maps a Gemini analysis onto the matcher's result dict."""
+    return {
+        "match_score": int(gemini_response.get("match_score", 0)),
+        "skill_match": int(gemini_response.get("skill_match_score", gemini_response.get("skill_match", 0))), # Prioritize skill_match_score
+        "experience_match": int(gemini_response.get("experience_match_score", gemini_response.get("experience_match", 0))),
+        "missing_skills": gemini_response.get("missing_skills_from_resume", gemini_response.get("missing_skills", [])),
+        "matched_skills": gemini_response.get("matched_skills", []),
+        "suggestions": gemini_response.get("suggestions_for_candidate", gemini_response.get("suggestions", "Review job requirements for further alignment.")),
+        "gemini_suitability_summary": gemini_response.get("suitability_summary", "")
+    }
+
+
+def packed_gemini_match(pairs):
+    """
+    Gemini results for many (resume_data, job_data) pairs, with the resumes for the same job
+    packed into shared requests (analyze_resumes_with_gemini_batch). Resumes Gemini could not
+    analyze get the rule-based result, as in match_resume_to_job.
+    """
+    pairs_by_job = {}
+    for idx, (_, job_data) in enumerate(pairs):
+        job_key = json.dumps(_gemini_job_details(job_data), sort_keys=True, default=str)
+        pairs_by_job.setdefault(job_key, []).append(idx)
+
+    results = [None] * len(pairs)
+    for indices in pairs_by_job.values():
+        job_data = pairs[indices[0]][1]
+        gemini_responses = analyze_resumes_with_gemini_batch(
+            [pairs[idx][0].get("raw_text", "") for idx in indices], _gemini_job_details(job_data))
+        for idx, gemini_response in zip(indices, gemini_responses):
+            if gemini_response and "error" not in gemini_response:
+                results[idx] = _gemini_match_result(gemini_response)
+            else:
+                print(f"Gemini Pro analysis failed or returned error. Response: {gemini_response}")
+                results[idx] = dict(rule_based_match(*pairs[idx]), model_failed=True)
+    return results
+
+
+def batched_model_match(pairs, model_choice):
+    """
+    LSTM or Transformer results for many (resume_data, job_data) pairs, scored in batched
+    forward passes (length-bucketed for the Transformer) instead of one call per pair. Each
+    result is the one match_resume_to_job gives: the model's overall score on top of the
+    rule-based details, or the rule-based result (with "model_failed") where it could not score.
+    """
+    predict_batch = predict_batch_with_lstm if model_choice == MODEL_LSTM_CUSTOM else predict_batch_with_transformer
+    model_label = "LSTM" if model_choice == MODEL_LSTM_CUSTOM else "Transformer"
+    scores = predict_batch([(resume_data.get("raw_text", ""), job_data.get("Job Description", ""))
+                            for resume_data, job_data in pairs]) if pairs else []
+    results = []
+    for (resume_data, job_data), ml_match_score in zip(pairs, scores):
+        result = rule_based_match(resume_data, job_data)
+        if ml_match_score is None:
+            results.append(dict(result, model_failed=True))
+            continue
+        result["match_score"] = int(ml_match_score)  # Override with ML model's score
+        result["suggestions"] = f"{model_label} model provided the overall score. Detailed skill/experience match is rule-based."
+        results.append(result)
+    return results
+
+
+def rule_based_match(resume_data, job_data):
+    """Rule-based result for one pair; the cheap scorer used on its own and as the cascade prefilter."""
+    resume_skills_set = set(s.lower() for s in resume_data.get("skills", []))
+    return _fallback_result(
+        resume_skills_set,
+        set(skills_from_record(job_data)),
+        resume_data.get("years_experience", 0),
+        experience_min_years_from_record(job_data)
+    )
+
+
+def cascade_match(pairs, final_model=MODEL_TRANSFORMER_CUSTOM,
+                  prefilter_min_score=CASCADE_PREFILTER_MIN_SCORE,
+                  prefilter_keep=CASCADE_PREFILTER_KEEP,
+                  final_k=CASCADE_FINAL_K,
+                  prefilter_scores=None,
+                  rule_results=None,
+                  max_results=None):
+    """
+    Scores many (resume_data, job_data) pairs with a three-stage cascade so the expensive
+    model only sees a shortlist:
+      1. Prefilter: rule-based score (or the given `prefilter_scores`, e.g. TF-IDF retrieval
+         similarities scaled to 0-100). Pairs below `prefilter_min_score` are pruned and at
+         most `prefilter_keep` survive. `rule_results` (a function of a list of pair indices)
+         can supply rule-based results computed in bulk (see rank_jobs_for_resume); it is only
+         asked for the pairs that are returned. With `max_results`, only the best results are
+         returned and no result dicts are built for the other pruned pairs.
+      2. Rerank: the LSTM scores the survivors in batches; the top `final_k` move on.
+      3. Final: `final_model` scores the shortlist: in batches for the Transformer/LSTM, in
+         packed requests for Gemini.
+
+    Returns:
+        dict: {"results": [...], "stage_counts": {...}}. Each result has the input "index",
+              the "stage" it reached, its per-stage "stage_scores" and the "match" dict of the
+              most advanced model that scored it. Results are ordered by stage reached, then score.
+    """
+    stage_counts = {"prefilter": len(pairs), "lstm": 0, "final": 0}
+    if rule_results is None:
+        rule_results = lambda indices: [rule_based_match(*pairs[idx]) for idx in indices]
+    if prefilter_scores is None:
+        all_rule_results = rule_results(range(len(pairs)))
+        prefilter_scores = [rule_result["match_score"] for rule_result in all_rule_results]
+        rule_results = lambda indices: [all_rule_results[idx] for idx in indices]
+
+    # Survivors and the order of pruned pairs come from one vectorized sort of the scores
+    score_array = np.asarray(prefilter_scores, dtype=np.float64)
+    passing = np.flatnonzero(score_array >= prefilter_min_score)
+    survivor_indices = passing[np.argsort(-score_array[passing], kind="stable")][:prefilter_keep]
+    pruned_indices = np.setdiff1d(np.arange(len(pairs)), survivor_indices)
+    pruned_indices = pruned_indices[np.argsort(-score_array[pruned_indices], kind="stable")]
+    if max_results is not None:
+        pruned_indices = pruned_indices[:max(0, max_results - len(survivor_indices))]
+
+    returned_indices = survivor_indices.tolist() + pruned_indices.tolist()
+    results = []
+    for idx, rule_result in zip(returned_indices, rule_results(returned_indices)):
+        stage_score = prefilter_scores[idx]
+        results.append({
+            "index": idx,
+            "stage": "prefilter",
+            "stage_scores": {"prefilter": stage_score.item() if isinstance(stage_score, np.generic) else stage_score},
+            "match": rule_result,
+        })
+    survivors = results[:len(survivor_indices)]
+
+    # Stage 2: LSTM rerank (keeps the prefilter order if the LSTM is unavailable)
+    stage_counts["lstm"] = len(survivors)
+    lstm_scores = predict_batch_with_lstm([
+        (pairs[result["index"]][0].get("raw_text", ""), pairs[result["index"]][1].get("Job Description", ""))
+        for result in survivors
+    ]) if survivors else []
+    for result, lstm_score in zip(survivors, lstm_scores):
+        result["stage"] = "lstm"
+        result["stage_scores"]["lstm"] = lstm_score
+        if lstm_score is not None:
+            result["match"] = dict(result["match"], match_score=int(lstm_score))
+    shortlist = sorted(
+        survivors,
+        key=lambda r: (r["stage_scores"]["lstm"] if r["stage_scores"]["lstm"] is not None else -1,
+                       r["stage_scores"]["prefilter"]),
+        reverse=True
+    )[:final_k]
+
+    # Stage 3: expensive model on the shortlist only
+    stage_counts["final"] = len(shortlist)
+    if final_model == MODEL_GEMINI_PRO:
+        # One packed request per job instead of one per resume
+        final_results = packed_gemini_match([pairs[result["index"]] for result in shortlist])
+    elif final_model in (MODEL_TRANSFORMER_CUSTOM, MODEL_LSTM_CUSTOM):
+        final_results = batched_model_match([pairs[result["index"]] for result in shortlist], final_model)
+    else:
+        final_results = [match_resume_to_job(*pairs[result["index"]], model_choice=final_model) for result in shortlist]
+    for result, final_result in zip(shortlist, final_results):
+        result["stage"] = "final"
+        result["stage_scores"]["final"] = final_result.get("match_score", 0)
+        result["match"] = _reported(final_result, final_model)
+
+    stage_rank = {"final": 2, "lstm": 1, "prefilter": 0}
+    # Pruned pairs keep their prefilter order (the rule-based score unless other scores were given)
+    results.sort(key=lambda r: (stage_rank[r["stage"]], r["stage_scores"]["prefilter"] if r["stage"] == "prefilter"
+                                else r["match"].get("match_score", 0)), reverse=True)
+    if max_results is not None:
+        results = results[:max_results]
+    print(f"Cascade ({final_model}): {stage_counts['prefilter']} pairs prefiltered, "
+          f"{stage_counts['lstm']} reranked by LSTM, {stage_counts['final']} scored by {final_model}.")
+    return {"results": results, "stage_counts": stage_counts}
+
+
+def rank_jobs_for_resume(resume_data, jobs, final_model=MODEL_TRANSFORMER_CUSTOM, jobs_version=None,
+                         max_results=None, **cascade_kwargs):
+    """
+    Cascade-rank a list of job dicts for one resume. The rule-based prefilter scores all jobs
+    at once with the skill bitset index, which is reused across calls while `jobs_version`
+    (e.g. job_service.get_jobs_version()) is unchanged; full result dicts are built only for
+    the jobs returned (all of them, or the best `max_results`).
+    """
+    skill_index = get_job_skill_index(jobs, version=jobs_version)
+    scores = skill_index.score(resume_data)
+    return cascade_match([(resume_data, job) for job in jobs], final_model=final_model,
+                         prefilter_scores=scores["match_score"],
+                         rule_results=lambda indices: skill_index.match_results(resume_data, indices, scores),
+                         max_results=max_results, **cascade_kwargs)
+
+
+def near_duplicate_groups(resumes, threshold=RESUME_NEAR_DUPLICATE_THRESHOLD):
+    """
+    {index: index of the earlier resume it near-duplicates} for a list of parsed resumes; resumes
+    that are not near-duplicates of an earlier one are left out.
+    """
+    lsh = MinHashLSH()
+    duplicate_of = {}
+    for idx, resume in enumerate(resumes):
+        signature = _resume_signature(resume)
+        if signature is None:
+            continue
+        matches = lsh.near_duplicates(signature, threshold)
+        if matches:
+            duplicate_of[idx] = matches[0][0]
+        else:
+            lsh.add(idx, signature)  # Only first occurrences: every duplicate points at one scored resume
+    return duplicate_of
+
+
+def screen_resumes_for_job(resumes, job_data, final_model=MODEL_TRANSFORMER_CUSTOM, **cascade_kwargs):
+    """
+    Cascade-screen a list of parsed resumes against one job (HR bulk screening). Near-duplicate
+    resumes (resubmissions with small edits) are scored once: each copy gets the result of the
+    first occurrence, with "near_duplicate_of" set to that resume's index.
+    """
+    duplicate_of = near_duplicate_groups(resumes)
+    unique_indices = [idx for idx in range(len(resumes)) if idx not in duplicate_of]
+    screening = cascade_match([(resumes[idx], job_data) for idx in unique_indices], final_model=final_model, **cascade_kwargs)
+
+    copies = {}
+    for idx, original_idx in duplicate_of.items():
+        copies.setdefault(original_idx, []).append(idx)
+    results = []
+    for result in screening["results"]:
+        original_idx = unique_indices[result["index"]]
+        results.append(dict(result, index=original_idx))
+        results.extend(dict(result, index=idx, near_duplicate_of=original_idx) for idx in copies.get(original_idx, []))
+    screening["stage_counts"]["near_duplicates"] = len(duplicate_of)
+    return {"results": results, "stage_counts": screening["stage_counts"]}
+
+
+def _fallback_result(resume_skills, job_skills, resume_experience_years_parsed, job_exp_numeric_min):
     """
     Generates a rule-based matching result.
     resume_experience_years_parsed: integer years extracted from resume.
-    job_experience_level_raw: string like "entry", "mid", "senior" from job.
+    job_exp_numeric_min: minimum years required by the job (the normalized `experience_min_years`).
     """
     matched_skills_set = resume_skills & job_skills # Both are sets of lowercase strings
     missing_skills_set = job_skills - resume_skills
@@ -125,11 +675,6 @@ def _fallback_result(resume_skills, job_skills, resume_experience_years_parsed,
         skill_match_pct = int((len(matched_skills_set) / len(job_skills)) * 100)
     
     # Experience matching logic (can be refined)
-    job_exp_numeric_min = 0
-    if "entry" in job_experience_level_raw: job_exp_numeric_min = 0
-    elif "mid" in job_experience_level_raw: job_exp_numeric_min = 2 # e.g., Mid-level might expect 2-5 years
-    elif "senior" in job_experience_level_raw: job_exp_numeric_min = 5 # e.g., Senior might expect 5+ years
-
     experience_match_pct = 0
     if resume_experience_years_parsed >= job_exp_numeric_min:
         experience_match_pct = 100
@@ -0,0 +1,95 @@
+"""
+MinHash signatures and LSH banding for near-duplicate resumes and job postings.
+
+Texts are split into overlapping word shingles; a signature keeps, for each of MINHASH_NUM_PERM
+hash permutations, the smallest hash over the shingles, so the share of equal positions between
+two signatures estimates the Jaccard similarity of their shingle sets. MinHashLSH buckets
+signatures by bands of rows: only texts sharing a whole band are compared, so a lookup costs
+O(bands) instead of a scan over every stored signature.
+"""
+import re
+import hashlib
+import threading
+
+import numpy as np
+
+from config.constants import MINHASH_NUM_PERM, MINHASH_BANDS, MINHASH_SHINGLE_WORDS
+
+_PRIME = np.uint64((1 << 32) + 15)  # Smallest prime above 2**32: (a * h + b) cannot overflow 64 bits
+_rng = np.random.RandomState(20240601)  # Fixed seed: signatures stay comparable across processes and runs
+_PERM_A = _rng.randint(1, 1 << 32, size=MINHASH_NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 32, size=MINHASH_NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text: str, size: int = MINHASH_SHINGLE_WORDS) -> set:
+    """Lowercase word `size`-grams of `text` (the whole text if it is shorter)."""
+    words = re.findall(r"\w+", (text or "").lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash_signature(text: str, shingle_words: int = MINHASH_SHINGLE_WORDS):
+    """
+    MinHash signature of `text` as a list of MINHASH_NUM_PERM ints, or None for empty text. Only
+    signatures built with the same `shingle_words` are comparable.
+    """
+    text_shingles = shingles(text, shingle_words)
+    if not text_shingles:
+        return None
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") for s in text_shingles),
+        dtype=np.uint64, count=len(text_shingles))
+    permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _PRIME
+    return permuted.min(axis=1).tolist()
+
+
+def estimated_similarity(signature_a, signature_b) -> float:
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return float(np.mean(np.asarray(signature_a) == np.asarray(signature_b)))
+
+
+class MinHashLSH:
+    """Signatures keyed by any hashable key, bucketed by band for near-duplicate lookups (thread-safe)."""
+
+    def __init__(self, bands=MINHASH_BANDS):
+        self.bands = bands
+        self.rows = MINHASH_NUM_PERM // bands
+        self.signatures = {}
+        self.buckets = [{} for _ in range(bands)]
+        self._lock = threading.Lock()
+
+    def _band_keys(self, signature):
+        return [tuple(signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def add(self, key, signature):
+        with self._lock:
+            if key in self.signatures:
+                return
+            self.signatures[key] = signature
+            for bucket, band_key in zip(self.buckets, self._band_keys(signature)):
+                bucket.setdefault(band_key, set()).add(key)
+
+    def remove(self, key):
+        with self._lock:
+            signature = self.signatures.pop(key, None)
+            if signature is None:
+                return
+            for bucket, band_key in zip(self.buckets, self._band_keys(signature)):
+                keys = bucket.get(band_key)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del bucket[band_key]
+
+    def near_duplicates(self, signature, threshold):
+        """[(key, similarity)] of stored signatures at or above `threshold`, most similar first."""
+        with self._lock:
+            candidates = set()
+            for bucket, band_key in zip(self.buckets, self._band_keys(signature)):
+                candidates |= bucket.get(band_key, set())
+            matches = [(key, estimated_similarity(signature, self.signatures[key])) for key in candidates]
+        return sorted((match for match in matches if match[1] >= threshold), key=lambda match: match[1], reverse=True)
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from config.supabase_config import get_supabase_client, PREDICTION_HISTORY_TABLE_NAME
+from services.skill_sketch import record_missing_skills
+
+
+def prediction_history_row(resume_filename_str, job_title_str, analysis_result_dict, model_used_str):
+    """One prediction_history row for a model's analysis result."""
+    return {
+        "timestamp": datetime.now().isoformat(), # ISO format for Supabase timestamp
+        "resume_name": resume_filename_str if resume_filename_str else "N/A",
+        "job_title": job_title_str if job_title_str else "N/A",
+        "model_used": model_used_str,
+        "match_score": analysis_result_dict.get('match_score', 0),
+        "skill_match_score": analysis_result_dict.get('skill_match', 0),
+        "experience_match_score": analysis_result_dict.get('experience_match', 0),
+        "missing_skills_count": len(analysis_result_dict.get('missing_skills', [])),
+        "missing_skills_list": ", ".join(analysis_result_dict.get('missing_skills', [])), # Store as comma-separated string
+        "suggestions": analysis_result_dict.get('suggestions', "")
+        # 'created_at' will be handled by Supabase default value
+    }
+
+
+def save_predictions(resume_filename_str, job_title_str, results_by_model) -> bool:
+    """
+    Saves one prediction_history row per model ({model_name: analysis_result_dict}) in a single
+    insert, and counts their missing skills in the dashboard sketches. Returns True on success.
+    Used by the applicant page and by background tasks.
+    """
+    supabase_client = get_supabase_client()
+    if not supabase_client:
+        print("Supabase client not initialized in save_predictions.")
+        return False
+
+    new_entries = [
+        prediction_history_row(resume_filename_str, job_title_str, analysis_result_dict, model_used_str)
+        for model_used_str, analysis_result_dict in results_by_model.items()
+    ]
+
+    try:
+        response = supabase_client.table(PREDICTION_HISTORY_TABLE_NAME).insert(new_entries).execute()
+        if response.data:
+            print(f"{len(response.data)} prediction history row(s) saved to Supabase successfully. "
+                  f"IDs: {[row.get('id') for row in response.data]}")
+            for model_used_str, analysis_result_dict in results_by_model.items():
+                record_missing_skills(model_used_str, analysis_result_dict.get('missing_skills', []))
+            return True
+        else:
+            error_message = "Unknown error."
+            if hasattr(response, 'error') and response.error:
+                error_message = response.error.message
+            print(f"Failed to save prediction to Supabase. Error: {error_message}, Full response: {response}")
+            return False
+    except Exception as e:
+        print(f"Exception saving prediction to Supabase: {e}")
+        return False
@@ -2,10 +2,20 @@ import docx2txt
 import pdfplumber
 import re
 import io
+import mimetypes
 from .job_service import get_all_skills
+from .minhash import minhash_signature
 
 
-SKILLS = get_all_skills()
+# Known skills, fetched from Supabase on the first resume parsed rather than at import
+_skills = None
+
+
+def get_skills():
+    global _skills
+    if _skills is None:
+        _skills = get_all_skills()
+    return _skills
 
 
 def extract_text(file):
@@ -19,7 +29,7 @@ def extract_text(file):
 
 def extract_skills(text):
     words = set(re.findall(r'\b\w+\b', text))
-    found_skills = [skill for skill in SKILLS if skill.lower() in [w.lower() for w in words]]
+    found_skills = [skill for skill in get_skills() if skill.lower() in [w.lower() for w in words]]
     return list(set(found_skills))
 
 def extract_experience(text):
@@ -36,11 +46,22 @@ def extract_experience(text):
     return 0
 
 def parse_resume(resume_file):
-    text = extract_text(resume_file)
+    return parse_resume_text(extract_text(resume_file))
+
+def parse_resume_bytes(data, file_name, content_type=None):
+    """parse_resume for raw file bytes (API uploads, queued tasks); the MIME type is guessed from the name if not given."""
+    resume_file = io.BytesIO(data)
+    resume_file.name = file_name or ""
+    resume_file.type = content_type if content_type not in (None, "application/octet-stream") \
+        else mimetypes.guess_type(resume_file.name)[0]
+    return parse_resume(resume_file)
 
+def parse_resume_text(text):
+    """Parsed resume dict (as parse_resume returns) for resume text that was already extracted."""
     return {
         "raw_text": text,
         "skills": extract_skills(text),
         "years_experience": extract_experience(text),
+        "minhash": minhash_signature(text),  # Near-duplicate lookups (services.minhash)
     }
 
@@ -0,0 +1,248 @@
+import os
+import hashlib
+import tempfile
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from config.constants import RETRIEVAL_INDEX_PATH, RETRIEVAL_HASH_FEATURES
+
+# Stateless term hashing: a changed job can be re-vectorized on its own, without refitting
+# a vocabulary over the whole catalog. IDF is recomputed from the stored counts (O(nnz)).
+_vectorizer = HashingVectorizer(
+    n_features=RETRIEVAL_HASH_FEATURES,
+    alternate_sign=False,
+    norm=None,
+    stop_words="english",
+    dtype=np.float32,
+)
+
+# In-process index state, reloaded when the file on disk is replaced by another process.
+_index = None
+
+
+class _RetrievalIndex:
+    def __init__(self, job_ids, content_hashes, counts, mtime=None):
+        self.job_ids = np.asarray(job_ids, dtype=np.int64)
+        self.content_hashes = list(content_hashes)
+        self.counts = counts.tocsr()
+        self.mtime = mtime
+        self._reweight()
+
+    def _reweight(self):
+        """Derive the L2-normalized TF-IDF matrix (sublinear tf, smooth idf) from raw counts."""
+        n_docs = self.counts.shape[0]
+        doc_freq = np.bincount(self.counts.indices, minlength=self.counts.shape[1])
+        self.idf = (np.log((1.0 + n_docs) / (1.0 + doc_freq)) + 1.0).astype(np.float32)
+        self.tfidf = self._weight(self.counts)
+
+    def _weight(self, counts):
+        weighted = counts.astype(np.float32, copy=True)
+        weighted.data = (1.0 + np.log(weighted.data)) * self.idf[weighted.indices]
+        row_norms = np.sqrt(np.bincount(
+            np.repeat(np.arange(weighted.shape[0]), np.diff(weighted.indptr)),
+            weights=weighted.data ** 2, minlength=weighted.shape[0],
+        ))
+        row_norms[row_norms == 0] = 1.0
+        weighted.data /= np.repeat(row_norms, np.diff(weighted.indptr)).astype(np.float32)
+        return weighted
+
+    def query(self, text, k):
+        if self.counts.shape[0] == 0:
+            return []
+        query_vec = self._weight(_vectorizer.transform([text]))
+        scores = (self.tfidf @ query_vec.T).toarray().ravel()
+
+        k = min(k, scores.shape[0])
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(self.job_ids[i]), float(scores[i])) for i in top if scores[i] > 0]
+
+
+def _text(value) -> str:
+    return value if isinstance(value, str) else ""
+
+
+def job_document(job: dict) -> str:
+    """Text indexed for a job: title, description and required skills."""
+    skills = job.get("skills")
+    skills_text = " ".join(str(s) for s in skills) if isinstance(skills, (list, tuple, np.ndarray)) \
+        else _text(job.get("Skills Required"))
+    return "\n".join([_text(job.get("Job Title")), _text(job.get("Job Description")), skills_text])
+
+
+def content_hash(document: str) -> str:
+    return hashlib.sha1(document.encode("utf-8")).hexdigest()
+
+
+def _empty_index():
+    return _RetrievalIndex([], [], sp.csr_matrix((0, RETRIEVAL_HASH_FEATURES), dtype=np.float32))
+
+
+def _save(index: _RetrievalIndex):
+    """Write the index to a temp file and atomically replace the previous one."""
+    directory = os.path.dirname(RETRIEVAL_INDEX_PATH) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(suffix=".npz", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(
+                f,
+                job_ids=index.job_ids,
+                content_hashes=np.asarray(index.content_hashes, dtype="U40"),
+                data=index.counts.data,
+                indices=index.counts.indices,
+                indptr=index.counts.indptr,
+                shape=np.asarray(index.counts.shape),
+            )
+        os.replace(tmp_path, RETRIEVAL_INDEX_PATH)
+        index.mtime = os.path.getmtime(RETRIEVAL_INDEX_PATH)
+    except Exception as e:
+        print(f"Failed to save retrieval index: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _load():
+    if not os.path.exists(RETRIEVAL_INDEX_PATH):
+        return None
+    try:
+        with np.load(RETRIEVAL_INDEX_PATH) as stored:
+            counts = sp.csr_matrix(
+                (stored["data"], stored["indices"], stored["indptr"]), shape=tuple(stored["shape"])
+            )
+            return _RetrievalIndex(
+                stored["job_ids"], stored["content_hashes"].tolist(), counts,
+                mtime=os.path.getmtime(RETRIEVAL_INDEX_PATH),
+            )
+    except Exception as e:
+        print(f"Failed to load retrieval index from {RETRIEVAL_INDEX_PATH}: {e}")
+        return None
+
+
+def _current_index():
+    """Return the in-process index, reloading it if another process has replaced the file."""
+    global _index
+    disk_mtime = os.path.getmtime(RETRIEVAL_INDEX_PATH) if os.path.exists(RETRIEVAL_INDEX_PATH) else None
+    if _index is None or (disk_mtime is not None and disk_mtime != _index.mtime):
+        _index = _load() or _index or _empty_index()
+    return _index
+
+
+def _apply_changes(index, upserts: dict, removed_ids: set):
+    """Return a new index with `upserts` ({job_id: document}) applied and `removed_ids` dropped."""
+    drop = removed_ids | set(upserts)
+    keep_mask = ~np.isin(index.job_ids, np.fromiter(drop, dtype=np.int64, count=len(drop)))
+
+    job_ids = index.job_ids[keep_mask]
+    content_hashes = [h for h, keep in zip(index.content_hashes, keep_mask) if keep]
+    counts = index.counts[keep_mask]
+
+    if upserts:
+        new_ids = list(upserts)
+        documents = [upserts[job_id] for job_id in new_ids]
+        counts = sp.vstack([counts, _vectorizer.transform(documents)], format="csr")
+        job_ids = np.concatenate([job_ids, np.asarray(new_ids, dtype=np.int64)])
+        content_hashes += [content_hash(doc) for doc in documents]
+
+    return _RetrievalIndex(job_ids, content_hashes, counts)
+
+
+def upsert_jobs(jobs: list):
+    """
+    Add or re-vectorize the given job records (dicts with an 'id'). Unchanged jobs are skipped.
+    Without an index on disk the whole catalog is indexed instead, not just these jobs.
+    """
+    global _index
+    if not os.path.exists(RETRIEVAL_INDEX_PATH):
+        stats = sync_index()
+        return stats["added"] + stats["updated"]
+    index = _current_index()
+    known = dict(zip(index.job_ids.tolist(), index.content_hashes))
+
+    upserts = {}
+    for job in jobs:
+        if job.get("id") is None:
+            continue
+        document = job_document(job)
+        if known.get(int(job["id"])) != content_hash(document):
+            upserts[int(job["id"])] = document
+
+    if upserts:
+        _index = _apply_changes(index, upserts, set())
+        _save(_index)
+    return len(upserts)
+
+
+def remove_jobs(job_ids: list):
+    """Drop the given job IDs from the index (building it from the jobs table if there is none on disk)."""
+    global _index
+    if not os.path.exists(RETRIEVAL_INDEX_PATH):
+        sync_index()
+        return 0
+    index = _current_index()
+    removed = set(int(job_id) for job_id in job_ids) & set(index.job_ids.tolist())
+    if removed:
+        _index = _apply_changes(index, {}, removed)
+        _save(_index)
+    return len(removed)
+
+
+def sync_index(jobs_df=None) -> dict:
+    """
+    Bring the index in line with the jobs table: only new or edited jobs are re-vectorized,
+    deleted jobs are dropped. Loads the jobs from Supabase when `jobs_df` is not given.
+    Returns counts of added/updated/removed jobs. An empty job list (load_jobs' result when
+    Supabase fails) leaves the index untouched rather than pruning every job.
+    """
+    global _index
+    if jobs_df is None:
+        from services.job_service import load_jobs  # local import: job_service notifies this module
+        jobs_df = load_jobs()
+
+    index = _current_index()
+    known = dict(zip(index.job_ids.tolist(), index.content_hashes))
+    if jobs_df.empty:
+        print("No jobs loaded; retrieval index left unchanged.")
+        return {"added": 0, "updated": 0, "removed": 0, "total": len(known)}
+    records = jobs_df.to_dict("records")
+
+    upserts = {}
+    current_ids = set()
+    for job in records:
+        job_id = int(job["id"])
+        current_ids.add(job_id)
+        document = job_document(job)
+        if known.get(job_id) != content_hash(document):
+            upserts[job_id] = document
+
+    removed = set(known) - current_ids
+    stats = {
+        "added": len(set(upserts) - set(known)),
+        "updated": len(set(upserts) & set(known)),
+        "removed": len(removed),
+        "total": len(current_ids),
+    }
+    if upserts or removed:
+        _index = _apply_changes(index, upserts, removed)
+        _save(_index)
+    return stats
+
+
+def retrieve_top_jobs(resume_text: str, k: int = 10) -> list:
+    """
+    Return up to `k` (job_id, cosine_similarity) pairs most relevant to `resume_text`,
+    best first, computed with one sparse matrix-vector product over the whole catalog.
+    Builds the index from Supabase on first use if none exists on disk.
+    """
+    index = _current_index()
+    if index.counts.shape[0] == 0 and not os.path.exists(RETRIEVAL_INDEX_PATH):
+        sync_index()
+        index = _current_index()
+    return index.query(resume_text or "", k)
+
+
+if __name__ == "__main__":
+    print(f"Synchronizing retrieval index at {RETRIEVAL_INDEX_PATH}...")
+    print(sync_index())
@@ -0,0 +1,150 @@
+import threading
+
+import numpy as np
+
+from services.job_normalizer import skills_from_record, experience_min_years_from_record
+from services.job_dependencies import artifact_hash, ARTIFACT_SKILL_INDEX
+
+# Rule-based scoring of one resume against many jobs at once. Job skills are interned to integer
+# IDs and each job's required skills become a row of packed uint64 words, so the skill overlap of
+# every job is one vectorized AND + popcount and the experience term is a vectorized np.select.
+# Scores are identical to services.matcher._fallback_result (same operations, same order).
+
+_WORD_BITS = 64
+
+# Bit counts of every byte value, for NumPy builds without np.bitwise_count (< 2.0)
+_BYTE_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+# Last index built by get_job_skill_index, reused while the caller's jobs version is unchanged
+_cached_index = None
+_cached_version = None
+_cached_job_ids = None  # The jobs (in order) the index rows stand for
+_cached_hashes = None  # Per-job hashes of the fields the index reads (services.job_dependencies)
+_cache_lock = threading.Lock()
+
+
+def _popcount(words):
+    """Set bits per row of a 2-D uint64 array."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int64)
+    return _BYTE_POPCOUNT[np.ascontiguousarray(words).view(np.uint8)].sum(axis=1, dtype=np.int64)
+
+
+class JobSkillIndex:
+    """Interned skill vocabulary and per-job skill bitmasks / minimum years for a list of jobs."""
+
+    def __init__(self, jobs):
+        self.skill_ids = {}
+        self.job_skill_sets = []
+        rows, columns = [], []
+        for row, job in enumerate(jobs):
+            job_skills = set(skills_from_record(job))
+            self.job_skill_sets.append(job_skills)
+            for skill in job_skills:
+                rows.append(row)
+                columns.append(self.skill_ids.setdefault(skill, len(self.skill_ids)))
+
+        n_words = max(1, -(-len(self.skill_ids) // _WORD_BITS))
+        self.masks = np.zeros((len(self.job_skill_sets), n_words), dtype=np.uint64)
+        columns = np.asarray(columns, dtype=np.int64)
+        np.bitwise_or.at(self.masks, (np.asarray(rows, dtype=np.int64), columns // _WORD_BITS),
+                         np.left_shift(np.uint64(1), (columns % _WORD_BITS).astype(np.uint64)))
+        self.job_skill_counts = np.fromiter((len(skills) for skills in self.job_skill_sets),
+                                            dtype=np.int64, count=len(self.job_skill_sets))
+        self.min_years = np.fromiter((experience_min_years_from_record(job) for job in jobs),
+                                     dtype=np.int64, count=len(self.job_skill_sets))
+
+    def __len__(self):
+        return len(self.job_skill_sets)
+
+    def _resume_mask(self, resume_skills):
+        mask = np.zeros(self.masks.shape[1], dtype=np.uint64)
+        for skill in resume_skills:
+            skill_id = self.skill_ids.get(skill)
+            if skill_id is not None:  # A skill no job asks for can never match
+                mask[skill_id // _WORD_BITS] |= np.uint64(1) << np.uint64(skill_id % _WORD_BITS)
+        return mask
+
+    def score(self, resume_data):
+        """
+        Rule-based scores of one parsed resume against every job, as int64 arrays:
+        {"match_score", "skill_match", "experience_match", "matched_count"}.
+        """
+        resume_skills = set(s.lower() for s in resume_data.get("skills", []))
+        resume_years = resume_data.get("years_experience", 0)
+
+        mask = self._resume_mask(resume_skills)
+        words = np.flatnonzero(mask)  # Only words holding a resume skill can contribute
+        if len(words):
+            matched_count = _popcount(self.masks[:, words] & mask[words])
+        else:
+            matched_count = np.zeros(len(self), dtype=np.int64)
+
+        skill_match = np.zeros(len(self), dtype=np.int64)
+        has_skills = self.job_skill_counts > 0
+        skill_match[has_skills] = (matched_count[has_skills] / self.job_skill_counts[has_skills] * 100).astype(np.int64)
+
+        min_years = self.min_years
+        with np.errstate(divide="ignore", invalid="ignore"):
+            partial = np.clip(((resume_years / np.where(min_years > 0, min_years, 1)) * 70).astype(np.int64), 0, 80)
+        experience_match = np.select(
+            [resume_years >= min_years,
+             (min_years > 0) & (resume_years > 0),
+             (min_years == 0) & (resume_years == 0),
+             (min_years == 0) & (resume_years > 0)],
+            [100, partial, 100, 100],
+            default=10,
+        ).astype(np.int64)
+
+        skill_match = np.clip(skill_match, 0, 100)
+        experience_match = np.clip(experience_match, 0, 100)
+        match_score = np.clip((0.7 * skill_match + 0.3 * experience_match).astype(np.int64), 0, 100)
+        return {
+            "match_score": match_score,
+            "skill_match": skill_match,
+            "experience_match": experience_match,
+            "matched_count": matched_count,
+        }
+
+    def match_results(self, resume_data, indices=None, scores=None):
+        """
+        Full rule-based result dicts (the same as matcher.rule_based_match) for the jobs at
+        `indices` (all jobs by default). Pass `scores` from score() to avoid recomputing them.
+        """
+        scores = scores if scores is not None else self.score(resume_data)
+        resume_skills = set(s.lower() for s in resume_data.get("skills", []))
+        indices = range(len(self)) if indices is None else indices
+        results = []
+        for i in indices:
+            job_skills = self.job_skill_sets[i]
+            results.append({
+                "match_score": int(scores["match_score"][i]),
+                "skill_match": int(scores["skill_match"][i]),
+                "experience_match": int(scores["experience_match"][i]),
+                "missing_skills": list(job_skills - resume_skills),
+                "matched_skills": list(resume_skills & job_skills),
+                "suggestions": "Consider highlighting transferable skills or gaining experience in missing areas."
+            })
+        return results
+
+
+def get_job_skill_index(jobs, version=None):
+    """
+    JobSkillIndex for `jobs` (a list of job dicts). With a `version` (e.g. job_service's
+    get_jobs_version()), the index is built once and reused for the same version and job ids,
+    and after a version change as long as no job's skills or minimum years changed (e.g. only
+    salaries were edited).
+    """
+    global _cached_index, _cached_version, _cached_job_ids, _cached_hashes
+    if version is None:
+        return JobSkillIndex(jobs)
+    job_ids = [job.get("id") for job in jobs]  # Another job list of the same length must not reuse the index
+    with _cache_lock:
+        if _cached_index is None or _cached_version != version or job_ids != _cached_job_ids:
+            dependency_hashes = [artifact_hash(job, ARTIFACT_SKILL_INDEX) for job in jobs]
+            if _cached_index is None or job_ids != _cached_job_ids or dependency_hashes != _cached_hashes:
+                _cached_index = JobSkillIndex(jobs)
+                _cached_hashes = dependency_hashes
+            _cached_version = version
+            _cached_job_ids = job_ids
+        return _cached_index
@@ -0,0 +1,269 @@
+from datetime import date, datetime
+
+import pandas as pd
+
+from config.supabase_config import get_supabase_client, MISSING_SKILL_SKETCHES_TABLE_NAME, PREDICTION_HISTORY_TABLE_NAME
+from config.constants import MISSING_SKILLS_SKETCH_CAPACITY
+
+MAX_UPDATE_RETRIES = 5
+
+
+class SpaceSavingSketch:
+    """
+    Space-Saving heavy-hitters summary (Metwally et al.) for missing-skill frequencies.
+
+    Keeps at most `capacity` counters. Each counter stores an over-estimated count and
+    the maximum over-estimation error, so `count - error` is a guaranteed lower bound.
+    Sketches are mergeable, which lets the dashboard combine per-day/per-model sketches
+    for any date range without touching the raw prediction history.
+    """
+
+    def __init__(self, capacity=MISSING_SKILLS_SKETCH_CAPACITY, counters=None, total=0):
+        self.capacity = capacity
+        self.counters = counters or {}  # skill -> [count, error]
+        self.total = total
+
+    def add(self, item, count=1):
+        item = item.strip().lower()
+        if not item:
+            return
+        self.total += count
+
+        if item in self.counters:
+            self.counters[item][0] += count
+        elif len(self.counters) < self.capacity:
+            self.counters[item] = [count, 0]
+        else:
+            # Evict the smallest counter; the newcomer inherits its count as error.
+            min_item = min(self.counters, key=lambda k: self.counters[k][0])
+            min_count = self.counters.pop(min_item)[0]
+            self.counters[item] = [min_count + count, min_count]
+
+    def update(self, items):
+        for item in items:
+            self.add(item)
+
+    def min_count(self):
+        """Upper bound on the count of any item that is not currently tracked."""
+        if len(self.counters) < self.capacity:
+            return 0
+        return min(count for count, _ in self.counters.values())
+
+    def merge(self, other):
+        """Returns a new sketch summarising both inputs."""
+        self_min, other_min = self.min_count(), other.min_count()
+        merged = {}
+        for item in set(self.counters) | set(other.counters):
+            count_a, error_a = self.counters.get(item, [self_min, self_min])
+            count_b, error_b = other.counters.get(item, [other_min, other_min])
+            merged[item] = [count_a + count_b, error_a + error_b]
+
+        capacity = max(self.capacity, other.capacity)
+        kept = sorted(merged.items(), key=lambda kv: kv[1][0], reverse=True)[:capacity]
+        return SpaceSavingSketch(capacity, dict(kept), self.total + other.total)
+
+    def top_k(self, k=10):
+        """Returns [(skill, estimated_count, max_error), ...] sorted by estimated count."""
+        ranked = sorted(self.counters.items(), key=lambda kv: (-kv[1][0], kv[0]))[:k]
+        return [(item, count, error) for item, (count, error) in ranked]
+
+    def to_dict(self):
+        return {"capacity": self.capacity, "total": self.total, "counters": self.counters}
+
+    @classmethod
+    def from_dict(cls, data):
+        if not data:
+            return cls()
+        return cls(
+            capacity=data.get("capacity", MISSING_SKILLS_SKETCH_CAPACITY),
+            counters={k: list(v) for k, v in data.get("counters", {}).items()},
+            total=data.get("total", 0),
+        )
+
+
+def record_missing_skills(model_used, missing_skills, day=None) -> bool:
+    """
+    Adds one prediction's missing skills to the (day, model) sketch in Supabase.
+    Uses optimistic concurrency on the `version` column so concurrent app workers
+    never overwrite each other's updates.
+    """
+    supabase_client = get_supabase_client()
+    if not supabase_client:
+        print("Supabase client not initialized. Cannot record missing skills sketch.")
+        return False
+    if not missing_skills:
+        return True
+
+    day_str = (day or datetime.now().date()).isoformat()
+
+    for _ in range(MAX_UPDATE_RETRIES):
+        try:
+            response = supabase_client.table(MISSING_SKILL_SKETCHES_TABLE_NAME) \
+                .select("sketch, version").eq("day", day_str).eq("model_used", model_used).execute()
+
+            if response.data:
+                row = response.data[0]
+                sketch = SpaceSavingSketch.from_dict(row["sketch"])
+                sketch.update(missing_skills)
+                update_response = supabase_client.table(MISSING_SKILL_SKETCHES_TABLE_NAME) \
+                    .update({"sketch": sketch.to_dict(), "version": row["version"] + 1}) \
+                    .eq("day", day_str).eq("model_used", model_used).eq("version", row["version"]).execute()
+                if update_response.data:
+                    return True
+                # Another worker won the race; re-read and retry.
+            else:
+                sketch = SpaceSavingSketch()
+                sketch.update(missing_skills)
+                supabase_client.table(MISSING_SKILL_SKETCHES_TABLE_NAME).insert(
+                    {"day": day_str, "model_used": model_used, "sketch": sketch.to_dict(), "version": 1}
+                ).execute()
+                return True
+        except Exception as e:
+            # A concurrent insert of the same (day, model) row raises a unique violation; retry as an update.
+            print(f"Retrying missing skills sketch update for {model_used} on {day_str}: {e}")
+
+    print(f"Failed to record missing skills sketch for {model_used} on {day_str} after {MAX_UPDATE_RETRIES} attempts.")
+    return False
+
+
+def sketch_rows_query(supabase_client, start_date: date, end_date: date, model_used=None):
+    """Query (not yet executed) for the sketch rows between start_date and end_date (inclusive). Works with the sync or async client."""
+    query = supabase_client.table(MISSING_SKILL_SKETCHES_TABLE_NAME).select("day, model_used, sketch") \
+        .gte("day", start_date.isoformat()).lte("day", end_date.isoformat())
+    if model_used:
+        query = query.eq("model_used", model_used)
+    return query
+
+
+def merge_sketch_rows(rows, model_used=None):
+    """Merges fetched sketch rows (optionally only one model's) into one sketch, or None if there are none."""
+    rows = [row for row in rows or [] if not model_used or row.get("model_used") == model_used]
+    if not rows:
+        return None
+
+    merged = SpaceSavingSketch()
+    for row in rows:
+        merged = merged.merge(SpaceSavingSketch.from_dict(row["sketch"]))
+    return merged
+
+
+def uncovered_days(history_df, sketch_rows, model_used=None):
+    """
+    Distinct (day, model_used) pairs of the predictions in `history_df` (naive timestamps) that
+    have no sketch row, as a DataFrame with a "day" (midnight Timestamp) and a "model_used" column.
+    These are the days top_missing_skills has to count exactly. With `sketch_rows=None` every
+    day is uncovered (e.g. when filtering by job title, which the sketches are not keyed on).
+    """
+    if history_df.empty:
+        return pd.DataFrame(columns=["day", "model_used"])
+    keys = pd.DataFrame({"day": history_df["timestamp"].dt.normalize(), "model_used": history_df["model_used"]})
+    if model_used:
+        keys = keys[keys["model_used"] == model_used]
+    keys = keys.drop_duplicates()
+    covered = pd.DataFrame(
+        [(pd.Timestamp(row["day"]), row["model_used"]) for row in sketch_rows or []
+         if not model_used or row.get("model_used") == model_used],
+        columns=["day", "model_used"],
+    ).astype({"day": "datetime64[ns]"})
+    keys = keys.merge(covered, on=["day", "model_used"], how="left", indicator=True)
+    return keys.loc[keys["_merge"] == "left_only", ["day", "model_used"]].reset_index(drop=True)
+
+
+def missing_skills_query(supabase_client, uncovered, job_title=None):
+    """
+    Query (not yet executed) for the missing skills of the predictions between the first and
+    last uncovered day of the uncovered models (optionally one job title). Works with the sync or
+    async client; pass the response rows to top_missing_skills, which keeps only uncovered days.
+    """
+    start, end = uncovered["day"].min(), uncovered["day"].max() + pd.Timedelta(days=1)
+    query = supabase_client.table(PREDICTION_HISTORY_TABLE_NAME).select("timestamp, model_used, missing_skills_list") \
+        .gte("timestamp", start.isoformat()).lt("timestamp", end.isoformat())
+    models = uncovered["model_used"].unique().tolist()
+    query = query.eq("model_used", models[0]) if len(models) == 1 else query.in_("model_used", models)
+    if job_title is not None:
+        query = query.eq("job_title", job_title)
+    return query
+
+
+def top_missing_skills(sketch_rows, uncovered, exact_rows, model_used=None, k=10):
+    """
+    Top `k` missing skills as [(skill, count), ...]: the sketch rows (optionally only one
+    model's) merged, plus exact counts of `exact_rows` (missing_skills_query's rows) on the
+    `uncovered` (day, model) pairs (uncovered_days).
+    """
+    rows = [row for row in sketch_rows or [] if not model_used or row.get("model_used") == model_used]
+    counts = {}
+    if rows:
+        for skill, (count, _) in merge_sketch_rows(rows).counters.items():
+            counts[skill] = count
+
+    if exact_rows and not uncovered.empty:
+        exact = pd.DataFrame(exact_rows)
+        exact["day"] = pd.to_datetime(exact["timestamp"], utc=True, format="ISO8601").dt.tz_localize(None).dt.normalize()
+        exact = exact.merge(uncovered, on=["day", "model_used"], how="inner")
+        # Same normalization as SpaceSavingSketch.add, so both sources count a skill under one key
+        skills = exact["missing_skills_list"].dropna().astype(str).str.split(",").explode().str.strip().str.lower()
+        for skill, count in skills[skills != ""].value_counts().items():
+            counts[skill] = counts.get(skill, 0) + int(count)
+
+    ranked = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+    return ranked[:k]
+
+
+def load_merged_sketch(start_date: date, end_date: date, model_used=None):
+    """
+    Loads and merges the per-day sketches between start_date and end_date (inclusive).
+    Returns None when no sketch rows exist for the range (e.g. history recorded before sketches).
+    """
+    supabase_client = get_supabase_client()
+    if not supabase_client:
+        print("Supabase client not initialized. Cannot load missing skills sketches.")
+        return None
+
+    try:
+        response = sketch_rows_query(supabase_client, start_date, end_date, model_used).execute()
+    except Exception as e:
+        print(f"Error loading missing skills sketches from Supabase: {e}")
+        return None
+    return merge_sketch_rows(response.data)
+
+
+def rebuild_sketches_from_history(history_df) -> int:
+    """
+    Rebuilds the per-day/per-model sketches from an existing prediction history DataFrame.
+    Intended as a one-off backfill for installs that logged predictions before sketches existed.
+    Returns the number of sketches written.
+    """
+    supabase_client = get_supabase_client()
+    if not supabase_client:
+        print("Supabase client not initialized. Cannot rebuild missing skills sketches.")
+        return 0
+    if history_df.empty or "missing_skills_list" not in history_df.columns:
+        return 0
+
+    days = history_df["timestamp"].dt.date
+    written = 0
+    for (day, model_used), group in history_df.groupby([days, "model_used"]):
+        sketch = SpaceSavingSketch()
+        for skills_entry in group["missing_skills_list"].dropna():
+            sketch.update(str(skills_entry).split(","))
+        try:
+            supabase_client.table(MISSING_SKILL_SKETCHES_TABLE_NAME).upsert(
+                {"day": day.isoformat(), "model_used": model_used, "sketch": sketch.to_dict(), "version": 1},
+                on_conflict="day,model_used",
+            ).execute()
+            written += 1
+        except Exception as e:
+            print(f"Error writing missing skills sketch for {model_used} on {day}: {e}")
+    return written
+
+
+if __name__ == "__main__":
+    print("Rebuilding missing skills sketches from the full prediction history...")
+    supabase_client = get_supabase_client()
+    history_response = supabase_client.table(PREDICTION_HISTORY_TABLE_NAME) \
+        .select("timestamp, model_used, missing_skills_list").execute()
+    history = pd.DataFrame(history_response.data or [])
+    if not history.empty:
+        history["timestamp"] = pd.to_datetime(history["timestamp"])
+    print(f"Wrote {rebuild_sketches_from_history(history)} sketches.")
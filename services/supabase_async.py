@@ -0,0 +1,107 @@
+"""
+Concurrent Supabase reads for the Streamlit pages.
+
+Streamlit scripts are synchronous, so the async client lives on one background event loop
+thread for the whole process. Pages hand run_queries() a batch of independent queries; they run
+concurrently with asyncio.gather over one shared, pooled HTTP client, each bounded by its own
+timeout, and the script run waits only for the slowest of them. A query that fails or times out
+returns None without affecting the others.
+"""
+import time
+import asyncio
+import threading
+
+from config.supabase_config import SUPABASE_URL, SUPABASE_KEY
+from config.constants import SUPABASE_ASYNC_MAX_CONNECTIONS, SUPABASE_QUERY_TIMEOUT_S
+
+_loop = None
+_loop_lock = threading.Lock()
+_async_client = None
+_async_client_lock = None  # asyncio.Lock, created on the background loop
+
+
+def _get_loop():
+    """The background event loop, started on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="supabase-async-loop", daemon=True).start()
+            _loop = loop
+    return _loop
+
+
+async def _get_async_client():
+    """The shared async Supabase client (created on the background loop), or None if it cannot be created."""
+    global _async_client, _async_client_lock
+    if _async_client is not None:
+        return _async_client
+    if _async_client_lock is None:
+        _async_client_lock = asyncio.Lock()
+    async with _async_client_lock:
+        if _async_client is None:
+            if not SUPABASE_URL or not SUPABASE_KEY:
+                print("Supabase URL and Key must be set in environment variables or .env file.")
+                return None
+            try:
+                import httpx
+                from supabase import create_async_client, AsyncClientOptions
+                # One connection pool for every query of every page
+                http_client = httpx.AsyncClient(
+                    limits=httpx.Limits(max_connections=SUPABASE_ASYNC_MAX_CONNECTIONS,
+                                        max_keepalive_connections=SUPABASE_ASYNC_MAX_CONNECTIONS),
+                    timeout=SUPABASE_QUERY_TIMEOUT_S,
+                )
+                _async_client = await create_async_client(
+                    SUPABASE_URL, SUPABASE_KEY, options=AsyncClientOptions(httpx_client=http_client)
+                )
+                print("Async Supabase client initialized successfully.")
+            except Exception as e:
+                print(f"Error initializing async Supabase client: {e}")
+                return None
+    return _async_client
+
+
+async def _run_query(name, build_query, client, timeout_s):
+    start = time.perf_counter()
+    try:
+        response = await asyncio.wait_for(build_query(client).execute(), timeout=timeout_s)
+        return response
+    except asyncio.TimeoutError:
+        print(f"Supabase query '{name}' timed out after {timeout_s}s.")
+    except Exception as e:
+        print(f"Error running Supabase query '{name}' ({time.perf_counter() - start:.2f}s): {e}")
+    return None
+
+
+async def _gather_queries(queries, timeouts):
+    client = await _get_async_client()
+    if client is None:
+        return {name: None for name in queries}
+    responses = await asyncio.gather(*(
+        _run_query(name, build_query, client, timeouts.get(name, SUPABASE_QUERY_TIMEOUT_S))
+        for name, build_query in queries.items()
+    ))
+    return dict(zip(queries, responses))
+
+
+def run_queries(queries, timeouts=None) -> dict:
+    """
+    Runs independent queries concurrently and returns {name: response or None}.
+
+    `queries` maps a name to a function that builds the query from the async client, e.g.
+    `lambda client: client.table("jobs").select("*").limit(10)` (without `.execute()`).
+    `timeouts` optionally maps names to a per-query timeout in seconds (default SUPABASE_QUERY_TIMEOUT_S).
+    """
+    if not queries:
+        return {}
+    timeouts = timeouts or {}
+    future = asyncio.run_coroutine_threadsafe(_gather_queries(queries, timeouts), _get_loop())
+    # Every query is bounded by its own timeout; the margin only covers client start-up
+    overall_timeout = max([SUPABASE_QUERY_TIMEOUT_S, *timeouts.values()]) + SUPABASE_QUERY_TIMEOUT_S
+    try:
+        return future.result(timeout=overall_timeout)
+    except Exception as e:
+        future.cancel()
+        print(f"Error running Supabase queries {list(queries)}: {e}")
+        return {name: None for name in queries}
@@ -0,0 +1,192 @@
+"""
+Handlers for the background task queue (services.task_queue), by task kind.
+
+Each handler takes (payload, context), reports progress through context.set_progress (which is
+also where a cancelled task stops) and returns a JSON-serializable result.
+"""
+import pandas as pd
+
+from services.resume_parser import parse_resume_bytes
+from services.matcher import screen_resumes_for_job, iter_model_comparison, COMPARISON_MODELS
+from services.job_service import get_job_by_id, load_jobs
+from services.job_normalizer import normalized_records
+from services.prediction_history import save_predictions
+from config.supabase_config import get_supabase_client, JOBS_TABLE_NAME
+
+TASK_SCREEN_RESUMES = "screen_resumes"
+TASK_RESCORE_JOB = "rescore_job"
+TASK_IMPORT_JOBS_CSV = "import_jobs_csv"
+TASK_COMPARE_MODELS = "compare_models"
+TASK_SYNC_JOB_EMBEDDINGS = "sync_job_embeddings"
+
+TASK_LABELS = {
+    TASK_SCREEN_RESUMES: "Bulk resume screening",
+    TASK_RESCORE_JOB: "Re-scoring after job edit",
+    TASK_IMPORT_JOBS_CSV: "Job CSV import",
+    TASK_COMPARE_MODELS: "Model comparison",
+    TASK_SYNC_JOB_EMBEDDINGS: "Job embeddings refresh",
+}
+
+JOBS_IMPORT_CHUNK_ROWS = 100  # Rows per insert request when importing a jobs CSV
+
+
+def screen_resumes(payload, context):
+    """
+    Parses the stored resume files and cascade-screens them against the job's current posting.
+    Payload: {"job_id", "final_model", "resumes": [{"name", "path"}]}. Also runs re-scoring
+    after a job edit (TASK_RESCORE_JOB), with the resumes of an earlier screening.
+    """
+    job = get_job_by_id(payload["job_id"])
+    if job is None:
+        raise ValueError(f"Job {payload['job_id']} no longer exists.")
+
+    resumes = payload["resumes"]
+    total_steps = len(resumes) + 1  # Parse every resume, then one cascade over all of them
+    parsed, parsed_names, unparsed = [], [], []
+    for index, resume in enumerate(resumes):
+        context.set_progress(index, total_steps, message=f"Parsing {resume['name']}")
+        try:
+            with open(resume["path"], "rb") as f:
+                resume_data = parse_resume_bytes(f.read(), resume["name"])
+        except OSError as e:
+            print(f"Resume file {resume['path']} is unavailable: {e}")
+            resume_data = None
+        if resume_data and resume_data.get("raw_text", "").strip():
+            parsed.append(resume_data)
+            parsed_names.append(resume["name"])
+        else:
+            unparsed.append(resume["name"])
+
+    context.set_progress(len(resumes), total_steps, message=f"Screening {len(parsed)} resumes")
+    screening = screen_resumes_for_job(parsed, job, final_model=payload["final_model"]) if parsed \
+        else {"results": [], "stage_counts": {"prefilter": 0, "lstm": 0, "final": 0, "near_duplicates": 0}}
+
+    ranked = [{
+        "resume_name": parsed_names[result["index"]],
+        "match_score": result["match"].get("match_score", 0),
+        "skill_match": result["match"].get("skill_match", 0),
+        "experience_match": result["match"].get("experience_match", 0),
+        "missing_skills": result["match"].get("missing_skills", []),
+        "stage": result["stage"],
+        "near_duplicate_of": parsed_names[result["near_duplicate_of"]] if "near_duplicate_of" in result else None,
+    } for result in screening["results"]]
+    context.set_progress(total_steps, total_steps, message="Done")
+    return {
+        "job_id": payload["job_id"],
+        "job_title": job.get("Job Title"),
+        "final_model": payload["final_model"],
+        "ranked": ranked,
+        "unparsed": unparsed,
+        "stage_counts": screening["stage_counts"],
+    }
+
+
+def import_jobs_csv(payload, context):
+    """
+    Inserts the jobs of an uploaded CSV in chunks, then syncs the retrieval index.
+    Payload: {"path", "file_name", "keep_duplicates" (optional)}. Near-duplicates of existing
+    jobs or earlier rows are skipped unless keep_duplicates is set; either way they are listed in
+    the result. A retried import resumes after the last chunk it recorded.
+    """
+    from upload_jobs_to_supabase import format_job_for_supabase, find_duplicate_jobs, describe_duplicate
+
+    supabase_client = get_supabase_client()
+    if not supabase_client:
+        raise RuntimeError("Supabase client not initialized. Cannot import jobs.")
+
+    df = pd.read_csv(payload["path"])
+    normalized_rows = normalized_records(df)
+    previous = context.previous_result or {}
+    rows_done = previous.get("rows_done", 0)
+    inserted, failed = previous.get("inserted", 0), previous.get("failed", 0)
+
+    # Rows imported by an earlier attempt are in the jobs table now, so only the remaining rows are checked
+    context.set_progress(rows_done, len(df), message="Checking for near-duplicate postings")
+    duplicates = find_duplicate_jobs(df.iloc[rows_done:], load_jobs().to_dict("records"))
+    duplicate_rows = [row for row in previous.get("duplicates", []) if row["row"] <= rows_done] + [
+        {"row": index + 1, "job_title": df.at[index, "Job Title"] if "Job Title" in df else None,
+         "duplicate_of": describe_duplicate(duplicate_of), "similarity": round(similarity, 3)}
+        for index, (duplicate_of, similarity) in sorted(duplicates.items())]
+    skipped = set() if payload.get("keep_duplicates") else set(duplicates)
+
+    for start in range(rows_done, len(df), JOBS_IMPORT_CHUNK_ROWS):
+        # Recorded before each chunk: if the insert raises, the retry starts again from this chunk
+        progress = {"rows_done": start, "inserted": inserted, "failed": failed, "duplicates": duplicate_rows}
+        context.set_progress(start, len(df), message=f"Imported {inserted} of {len(df)} jobs", partial_result=progress)
+        chunk = []
+        for index, row in df.iloc[start:start + JOBS_IMPORT_CHUNK_ROWS].iterrows():
+            if index in skipped:
+                continue
+            job = format_job_for_supabase(row.to_dict())
+            job.update(normalized_rows[index])
+            chunk.append(job)
+        if not chunk:
+            continue
+        response = supabase_client.table(JOBS_TABLE_NAME).insert(chunk).execute()
+        inserted += len(response.data or [])
+        failed += len(chunk) - len(response.data or [])
+
+    result = {"rows_done": len(df), "inserted": inserted, "failed": failed, "duplicates": duplicate_rows,
+              "duplicates_skipped": 0 if payload.get("keep_duplicates") else len(duplicate_rows)}
+    if inserted:
+        from services.retrieval_index import sync_index
+        from models.job_embeddings import has_job_embeddings, sync_job_embeddings
+        context.set_progress(len(df), len(df), message="Updating the job retrieval index", partial_result=result)
+        result["retrieval_index"] = sync_index()
+        if has_job_embeddings():
+            context.set_progress(len(df), len(df), message="Embedding the imported jobs", partial_result=result)
+            result["job_embeddings"] = sync_job_embeddings()
+    return dict(result, file_name=payload.get("file_name"))
+
+
+def run_model_comparison(payload, on_outcome=None):
+    """
+    Runs every model on one parsed resume (services.matcher.iter_model_comparison), calling
+    `on_outcome(outcomes so far)` as each one arrives, then saves the predictions to the history.
+    Models that timed out or failed are shown with the rule-based result but not saved under their
+    name. Used by the compare_models task and, without a task worker, by the applicant page itself.
+    Payload: {"resume", "job", "resume_name", "models" (optional)}.
+    """
+    models = payload.get("models") or COMPARISON_MODELS
+    outcomes = {}
+    for outcome in iter_model_comparison(payload["resume"], payload["job"], models):
+        outcomes[outcome["model"]] = outcome
+        if on_outcome:
+            on_outcome(outcomes)
+    outcomes = {model_name: outcomes[model_name] for model_name in models}
+    own_results = {model_name: outcome["result"] for model_name, outcome in outcomes.items() if outcome["status"] == "ok"}
+    saved = bool(own_results) and save_predictions(payload.get("resume_name"), payload["job"].get("Job Title", "N/A"),
+                                                   own_results)
+    return {"outcomes": outcomes, "saved": saved}
+
+
+def compare_models(payload, context):
+    """run_model_comparison as a task, storing each outcome as it arrives."""
+    models = payload.get("models") or COMPARISON_MODELS
+    context.set_progress(0, len(models), message="Running all models in parallel")
+
+    def on_outcome(outcomes):
+        latest = next(reversed(outcomes))
+        context.set_progress(len(outcomes), len(models), message=f"{latest} finished",
+                             partial_result={"outcomes": outcomes})
+
+    return run_model_comparison(payload, on_outcome)
+
+
+def sync_embeddings(payload, context):
+    """
+    Brings the job embeddings in line with the jobs table (models.job_embeddings), so the
+    Transformer encoder loads in a worker rather than in the app after a job edit.
+    """
+    from models.job_embeddings import sync_job_embeddings
+    context.set_progress(0, 1, message="Embedding new and edited jobs")
+    return sync_job_embeddings()
+
+
+TASK_HANDLERS = {
+    TASK_SCREEN_RESUMES: screen_resumes,
+    TASK_RESCORE_JOB: screen_resumes,
+    TASK_IMPORT_JOBS_CSV: import_jobs_csv,
+    TASK_COMPARE_MODELS: compare_models,
+    TASK_SYNC_JOB_EMBEDDINGS: sync_embeddings,
+}
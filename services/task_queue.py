@@ -0,0 +1,456 @@
+"""
+Durable background task queue backed by a local SQLite database (TASK_QUEUE_DB_PATH).
+
+Pages submit long-running work (bulk screening, re-scoring, CSV imports, model comparisons) with
+submit_task() and poll get_task() for status, progress and the stored result, so the work no
+longer lives in a Streamlit script run and survives the browser tab closing. Tasks are executed
+by the handlers in services.task_handlers, on worker processes sized to the hardware:
+
+    python -m services.task_queue --workers 4
+
+(or, for a small single-machine setup, on TASK_WORKERS_IN_APP threads inside the Streamlit process;
+none by default, so model inference stays off the interactive path).
+
+A task is claimed atomically by one worker (BEGIN IMMEDIATE), keeps a heartbeat while it runs,
+and is retried with exponential backoff up to its max_attempts when the handler raises. Tasks
+whose worker died (no heartbeat for TASK_STALE_AFTER_S) are requeued. Cancellation is
+cooperative: a queued task is cancelled at once, a running one stops at its next progress update.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import signal
+import shutil
+import sqlite3
+import argparse
+import threading
+import multiprocessing
+
+from config.constants import (
+    TASK_QUEUE_DB_PATH,
+    TASK_FILES_DIR,
+    TASK_WORKERS_IN_APP,
+    TASK_MAX_ATTEMPTS,
+    TASK_RETRY_BACKOFF_S,
+    TASK_POLL_INTERVAL_S,
+    TASK_HEARTBEAT_S,
+    TASK_STALE_AFTER_S,
+    TASK_RETENTION_DAYS
+)
+
+TASK_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    ref TEXT,                              -- Lookup key chosen by the submitter, e.g. "job:12"
+    status TEXT NOT NULL DEFAULT 'queued',
+    payload TEXT NOT NULL,                 -- JSON
+    result TEXT,                           -- JSON; partial results while running
+    error TEXT,
+    progress_done INTEGER NOT NULL DEFAULT 0,
+    progress_total INTEGER,
+    message TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    worker_id TEXT,
+    files_dir TEXT,                        -- Uploaded files it reads, removed with the last task using them
+    created_at REAL NOT NULL,
+    run_after REAL NOT NULL,
+    started_at REAL,
+    heartbeat_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS tasks_claim_idx ON tasks (status, run_after, id);
+CREATE INDEX IF NOT EXISTS tasks_kind_ref_idx ON tasks (kind, ref, id);
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id TEXT PRIMARY KEY,
+    seen_at REAL NOT NULL                  -- Refreshed by idle workers; running tasks keep heartbeat_at
+);
+"""
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+_app_workers = []
+_app_workers_lock = threading.Lock()
+
+
+class TaskCancelled(Exception):
+    """Raised inside a handler (by TaskContext.set_progress) once the task's cancellation was requested."""
+
+
+def _connect():
+    """A new autocommit connection (one per call, so any thread or process can use the queue)."""
+    global _schema_ready
+    if os.path.dirname(TASK_QUEUE_DB_PATH):
+        os.makedirs(os.path.dirname(TASK_QUEUE_DB_PATH), exist_ok=True)
+    conn = sqlite3.connect(TASK_QUEUE_DB_PATH, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    if not _schema_ready:
+        with _schema_lock:
+            conn.execute("PRAGMA journal_mode=WAL")  # Readers (page polls) never block the workers
+            conn.executescript(_SCHEMA)
+            _schema_ready = True
+    return conn
+
+
+def _dumps(value):
+    """JSON for payloads/results; NumPy scalars (model scores) become plain numbers."""
+    return json.dumps(value, default=lambda obj: obj.item() if hasattr(obj, "item") else str(obj))
+
+
+def _task_dict(row):
+    if row is None:
+        return None
+    task = dict(row)
+    task["payload"] = json.loads(task["payload"])
+    task["result"] = json.loads(task["result"]) if task["result"] is not None else None
+    task["cancel_requested"] = bool(task["cancel_requested"])
+    return task
+
+
+# --- Submitting and polling (pages) ---
+def submit_task(kind, payload, ref=None, max_attempts=TASK_MAX_ATTEMPTS, files_dir=None) -> int:
+    """Queues a task for the handler registered as `kind` and returns its id."""
+    now = time.time()
+    conn = _connect()
+    try:
+        cursor = conn.execute(
+            "INSERT INTO tasks (kind, ref, payload, max_attempts, files_dir, created_at, run_after) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (kind, ref, _dumps(payload), max_attempts, files_dir, now, now),
+        )
+        task_id = cursor.lastrowid
+    finally:
+        conn.close()
+    start_app_workers()
+    return task_id
+
+
+def workers_alive(within_s=TASK_STALE_AFTER_S) -> bool:
+    """
+    True if some worker (process or in-app thread) polled the queue or heartbeated a running task
+    in the last `within_s` seconds, i.e. a queued task will be picked up.
+    """
+    cutoff = time.time() - within_s
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT EXISTS (SELECT 1 FROM workers WHERE seen_at >= ?) "
+            "OR EXISTS (SELECT 1 FROM tasks WHERE status = 'running' AND heartbeat_at >= ?)",
+            (cutoff, cutoff),
+        ).fetchone()
+    finally:
+        conn.close()
+    return bool(row[0])
+
+
+def save_task_files(files) -> tuple:
+    """
+    Stores uploaded files [(file_name, bytes), ...] for a task to read later.
+    Returns (files_dir, [file paths]). Pass files_dir to submit_task (of every task reading the
+    files) so they are removed once the last of those tasks is purged.
+    """
+    files_dir = os.path.join(TASK_FILES_DIR, uuid.uuid4().hex)
+    os.makedirs(files_dir, exist_ok=True)
+    paths = []
+    for index, (file_name, data) in enumerate(files):
+        path = os.path.join(files_dir, f"{index:05d}_{os.path.basename(file_name) or 'file'}")
+        with open(path, "wb") as f:
+            f.write(data)
+        paths.append(path)
+    return files_dir, paths
+
+
+def get_task(task_id):
+    """The task as a dict (payload/result decoded), or None if it does not exist."""
+    conn = _connect()
+    try:
+        return _task_dict(conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone())
+    finally:
+        conn.close()
+
+
+def list_tasks(kind=None, ref=None, statuses=None, limit=20) -> list:
+    """Most recent tasks first, optionally of one kind / ref / set of statuses."""
+    clauses, params = [], []
+    if kind is not None:
+        clauses.append("kind = ?")
+        params.append(kind)
+    if ref is not None:
+        clauses.append("ref = ?")
+        params.append(ref)
+    if statuses:
+        clauses.append(f"status IN ({', '.join('?' * len(statuses))})")
+        params.extend(statuses)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    conn = _connect()
+    try:
+        rows = conn.execute(f"SELECT * FROM tasks {where} ORDER BY id DESC LIMIT ?", (*params, limit)).fetchall()
+        return [_task_dict(row) for row in rows]
+    finally:
+        conn.close()
+
+
+def cancel_task(task_id) -> bool:
+    """Requests cancellation. A queued task is cancelled immediately; returns False if it had already finished."""
+    conn = _connect()
+    try:
+        cursor = conn.execute(
+            "UPDATE tasks SET cancel_requested = 1, "
+            "status = CASE WHEN status = 'queued' THEN 'cancelled' ELSE status END, "
+            "finished_at = CASE WHEN status = 'queued' THEN ? ELSE finished_at END "
+            "WHERE id = ? AND status IN ('queued', 'running')",
+            (time.time(), task_id),
+        )
+        return cursor.rowcount > 0
+    finally:
+        conn.close()
+
+
+def purge_old_tasks(retention_days=TASK_RETENTION_DAYS) -> int:
+    """Deletes finished tasks older than retention_days, and their files. Returns how many were deleted."""
+    cutoff = time.time() - retention_days * 86400
+    conn = _connect()
+    try:
+        placeholders = ", ".join("?" * len(FINISHED_STATUSES))
+        rows = conn.execute(
+            f"DELETE FROM tasks WHERE status IN ({placeholders}) AND finished_at < ? RETURNING files_dir",
+            (*FINISHED_STATUSES, cutoff),
+        ).fetchall()
+        for files_dir in {row["files_dir"] for row in rows if row["files_dir"]}:
+            if conn.execute("SELECT 1 FROM tasks WHERE files_dir = ? LIMIT 1", (files_dir,)).fetchone() is None:
+                shutil.rmtree(files_dir, ignore_errors=True)
+        # Workers that were killed never removed themselves
+        conn.execute("DELETE FROM workers WHERE seen_at < ?", (time.time() - TASK_STALE_AFTER_S,))
+    finally:
+        conn.close()
+    return len(rows)
+
+
+# --- Worker side ---
+class TaskContext:
+    """Handed to a handler: progress reporting (with partial results) and cooperative cancellation."""
+
+    def __init__(self, task):
+        self.task_id = task["id"]
+        self.attempt = task["attempts"]
+        self.worker_id = task["worker_id"]
+        # Last partial result of an earlier attempt, so a retried handler can resume instead of redoing work
+        self.previous_result = task["result"]
+
+    def set_progress(self, done, total=None, message=None, partial_result=None):
+        """Records progress (and optionally a partial result); raises TaskCancelled if cancellation was requested."""
+        conn = _connect()
+        try:
+            row = conn.execute(
+                "UPDATE tasks SET progress_done = ?, progress_total = COALESCE(?, progress_total), "
+                "message = COALESCE(?, message), result = COALESCE(?, result), heartbeat_at = ? "
+                "WHERE id = ? AND worker_id = ? RETURNING cancel_requested",
+                (done, total, message, _dumps(partial_result) if partial_result is not None else None,
+                 time.time(), self.task_id, self.worker_id),
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None or row["cancel_requested"]:
+            # Cancelled, or the task was taken over after this worker was presumed dead
+            raise TaskCancelled()
+
+    def check_cancelled(self):
+        conn = _connect()
+        try:
+            row = conn.execute("SELECT cancel_requested, worker_id FROM tasks WHERE id = ?", (self.task_id,)).fetchone()
+        finally:
+            conn.close()
+        if row is None or row["cancel_requested"] or row["worker_id"] != self.worker_id:
+            raise TaskCancelled()
+
+
+def _claim_task(worker_id):
+    """Atomically takes the oldest runnable task (after requeuing tasks of dead workers), or None."""
+    now = time.time()
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            "UPDATE tasks SET "
+            "status = CASE WHEN cancel_requested THEN 'cancelled' "
+            "              WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END, "
+            "error = 'Worker stopped responding.', worker_id = NULL, run_after = ?, "
+            "finished_at = CASE WHEN cancel_requested OR attempts >= max_attempts THEN ? ELSE NULL END "
+            "WHERE status = 'running' AND heartbeat_at < ?",
+            (now, now, now - TASK_STALE_AFTER_S),
+        )
+        row = conn.execute(
+            "UPDATE tasks SET status = 'running', attempts = attempts + 1, worker_id = ?, "
+            "started_at = ?, heartbeat_at = ? "
+            "WHERE id = (SELECT id FROM tasks WHERE status = 'queued' AND run_after <= ? ORDER BY id LIMIT 1) "
+            "RETURNING *",
+            (worker_id, now, now, now),
+        ).fetchone()
+        conn.execute("COMMIT")
+        return _task_dict(row)
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+def _finish_task(task, status, result=None, error=None):
+    """Final state of a run: succeeded / cancelled / failed, or requeued with backoff if attempts remain."""
+    now = time.time()
+    run_after = now
+    if status == "failed" and task["attempts"] < task["max_attempts"]:
+        status = "queued"
+        run_after = now + TASK_RETRY_BACKOFF_S * 2 ** (task["attempts"] - 1)
+    conn = _connect()
+    try:
+        # A failed run whose cancellation was requested meanwhile is cancelled rather than retried
+        row = conn.execute(
+            "UPDATE tasks SET "
+            "status = CASE WHEN cancel_requested AND ? = 'queued' THEN 'cancelled' ELSE ? END, "
+            "result = COALESCE(?, result), error = ?, run_after = ?, "
+            "worker_id = CASE WHEN ? = 'queued' AND NOT cancel_requested THEN NULL ELSE worker_id END, "
+            "finished_at = CASE WHEN ? = 'queued' AND NOT cancel_requested THEN NULL ELSE ? END "
+            "WHERE id = ? AND worker_id = ? RETURNING status",
+            (status, status, _dumps(result) if result is not None else None, error, run_after,
+             status, status, now, task["id"], task["worker_id"]),
+        ).fetchone()
+    finally:
+        conn.close()
+    return row["status"] if row is not None else status
+
+
+def _heartbeat(task, stop_event):
+    while not stop_event.wait(TASK_HEARTBEAT_S):
+        conn = _connect()
+        try:
+            conn.execute("UPDATE tasks SET heartbeat_at = ? WHERE id = ? AND worker_id = ?",
+                         (time.time(), task["id"], task["worker_id"]))
+        except sqlite3.Error as e:
+            print(f"Task {task['id']}: heartbeat failed: {e}")
+        finally:
+            conn.close()
+
+
+def run_task(task):
+    """Runs one claimed task through its handler and records the outcome."""
+    from services.task_handlers import TASK_HANDLERS  # Handlers import the models; load them in workers only
+
+    handler = TASK_HANDLERS.get(task["kind"])
+    stop_heartbeat = threading.Event()
+    threading.Thread(target=_heartbeat, args=(task, stop_heartbeat), daemon=True).start()
+    start = time.perf_counter()
+    try:
+        if handler is None:
+            raise ValueError(f"No handler registered for task kind '{task['kind']}'.")
+        result = handler(task["payload"], TaskContext(task))
+        status = _finish_task(task, "succeeded", result=result)
+    except TaskCancelled:
+        status = _finish_task(task, "cancelled")
+    except Exception as e:
+        status = _finish_task(task, "failed", error=f"{type(e).__name__}: {e}")
+        print(f"Task {task['id']} ({task['kind']}) attempt {task['attempts']}/{task['max_attempts']} failed: {e}")
+    finally:
+        stop_heartbeat.set()
+    print(f"Task {task['id']} ({task['kind']}) {status} after {time.perf_counter() - start:.1f}s.")
+    return status
+
+
+def run_worker(worker_id=None, stop_event=None):
+    """Claims and runs tasks until stop_event is set."""
+    worker_id = worker_id or f"{os.getpid()}-{threading.get_ident()}"
+    stop_event = stop_event or threading.Event()
+    last_purge = last_seen = 0.0
+    while not stop_event.is_set():
+        if time.time() - last_seen >= TASK_HEARTBEAT_S:
+            _mark_worker_seen(worker_id)
+            last_seen = time.time()
+        if time.time() - last_purge > 3600:
+            purged = purge_old_tasks()
+            if purged:
+                print(f"Task worker {worker_id}: purged {purged} old task(s).")
+            last_purge = time.time()
+        try:
+            task = _claim_task(worker_id)
+        except sqlite3.Error as e:
+            print(f"Task worker {worker_id}: could not claim a task: {e}")
+            task = None
+        if task is None:
+            stop_event.wait(TASK_POLL_INTERVAL_S)
+            continue
+        run_task(task)
+    _mark_worker_seen(worker_id, stopped=True)
+
+
+def _mark_worker_seen(worker_id, stopped=False):
+    """Records that `worker_id` is polling the queue (see workers_alive), or removes it once it stops."""
+    conn = _connect()
+    try:
+        if stopped:
+            conn.execute("DELETE FROM workers WHERE worker_id = ?", (worker_id,))
+        else:
+            conn.execute("INSERT INTO workers (worker_id, seen_at) VALUES (?, ?) "
+                         "ON CONFLICT (worker_id) DO UPDATE SET seen_at = excluded.seen_at", (worker_id, time.time()))
+    except sqlite3.Error as e:
+        print(f"Task worker {worker_id}: could not update its liveness: {e}")
+    finally:
+        conn.close()
+
+
+def start_app_workers(count=TASK_WORKERS_IN_APP):
+    """Starts `count` worker threads in this process once (no-op when count is 0)."""
+    with _app_workers_lock:
+        while len(_app_workers) < count:
+            worker_id = f"app-{os.getpid()}-{len(_app_workers)}"
+            thread = threading.Thread(target=run_worker, args=(worker_id,), name=f"task-worker-{worker_id}", daemon=True)
+            thread.start()
+            _app_workers.append(thread)
+
+
+def _worker_process(index):
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    print(f"Task worker {index} ({os.getpid()}) started.")
+    run_worker(f"worker-{os.getpid()}", stop_event)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run background task workers for the resume screening app.")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="Worker processes (each runs one task at a time).")
+    parser.add_argument("--purge-days", type=int, default=None,
+                        help="Only delete finished tasks older than this many days, then exit.")
+    args = parser.parse_args(argv)
+
+    if args.purge_days is not None:
+        print(f"Purged {purge_old_tasks(args.purge_days)} task(s).")
+        return 0
+
+    processes = [multiprocessing.Process(target=_worker_process, args=(index,), daemon=False)
+                 for index in range(args.workers)]
+    for process in processes:
+        process.start()
+    # Workers stop after their current task; pass a service manager's SIGTERM on to them
+    signal.signal(signal.SIGTERM, lambda *_: [process.terminate() for process in processes])
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
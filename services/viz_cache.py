@@ -0,0 +1,210 @@
+import io
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+import seaborn as sns
+from matplotlib.figure import Figure
+from wordcloud import WordCloud
+
+from services.job_service import load_jobs, get_jobs_version
+from services.job_normalizer import normalize_jobs, NORMALIZED_COLUMNS
+from config.constants import VIZ_CACHE_DIR, VIZ_CACHE_KEEP_VERSIONS
+
+OVERVIEW_FILENAME = "overview.parquet"
+FIGURES_FILENAME = "figures.json"
+META_FILENAME = "meta.json"
+
+# version -> artifacts dict; shared by every session served by this process.
+_memory_cache = {}
+
+
+def _figure_to_png(fig) -> bytes:
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    return buffer.getvalue()
+
+
+def _dataset_hash(df: pd.DataFrame) -> str:
+    """Fallback version when the cheap version query is unavailable: hash the loaded rows."""
+    row_hashes = pd.util.hash_pandas_object(df.astype(str), index=False).values
+    return "data-" + hashlib.sha1(row_hashes.tobytes()).hexdigest()
+
+
+def build_visualization_artifacts(df: pd.DataFrame) -> dict:
+    """
+    Compute every aggregate and figure shown on the Data Visualization page.
+    Plotly figures are kept as Figure objects (serialized to JSON on disk),
+    matplotlib/seaborn and WordCloud output is rendered to PNG bytes.
+    """
+    # Typed columns are written at ingest; derive them here only for installs not yet backfilled
+    if not set(NORMALIZED_COLUMNS).issubset(df.columns):
+        df = normalize_jobs(df)
+    else:
+        df = df.copy()
+    df['Job Description'] = df['Job Description'].str.replace(r'\s+', ' ', regex=True).str.strip()
+    overview_df = df.copy()
+
+    figures = {}
+    images = {}
+    errors = {}
+
+    job_counts = df['Job Title'].value_counts()
+    figures["job_title_pie"] = px.pie(values=job_counts.values, names=job_counts.index, title='Job Title Distribution')
+
+    countplot_fig = Figure(figsize=(10, 6))
+    countplot_ax = countplot_fig.subplots()
+    sns.countplot(data=df, y='Job Title', order=job_counts.index, ax=countplot_ax)
+    countplot_ax.set_title("Job Title Count")
+    images["job_title_countplot"] = _figure_to_png(countplot_fig)
+
+    df = df.dropna(subset=['Job Title', 'country'])
+
+    figures["country_job_title"] = px.histogram(df, x='country', color='Job Title', barmode='group', title='Country - Job Title Distribution',
+                                                labels={'country': 'Country'})
+
+    employment_counts = df['Employment Mode'].value_counts()
+    figures["employment_mode_pie"] = px.pie(values=employment_counts.values, names=employment_counts.index, title='Employment Mode Distribution')
+
+    figures["job_title_employment_mode"] = px.histogram(df, x='Job Title', color='Employment Mode', barmode='group')
+    figures["job_title_employment_mode"].update_layout(xaxis_tickangle=45)
+
+    df_location_emp = df.dropna(subset=['country', 'Employment Mode'])
+    figures["country_employment_mode"] = px.histogram(df_location_emp, x='country', color='Employment Mode', barmode='group',
+                                                      labels={'country': 'Country'})
+    figures["country_employment_mode"].update_layout(xaxis_tickangle=45)
+
+    # --- WordCloud of Skills ---
+    skills = df['Skills Required'].dropna().str.split(', ').explode()
+    if not skills.empty:
+        wordcloud = WordCloud(width=800, height=400, background_color='white').generate(' '.join(skills))
+        wordcloud_buffer = io.BytesIO()
+        wordcloud.to_image().save(wordcloud_buffer, format="PNG")
+        images["skills_wordcloud"] = wordcloud_buffer.getvalue()
+
+    # --- Salary Scatter Plots (typed salary_min column, in thousands) ---
+    df = df.dropna(subset=['salary_min'])
+    df['Salary (k)'] = df['salary_min'] / 1000.0
+
+    df_exp = df.dropna(subset=['Experience Level'])
+    figures["salary_experience"] = px.scatter(df_exp, x='Salary (k)', y='Experience Level', color='Job Title', size_max=55)
+
+    df_emp = df.dropna(subset=['Employment Mode'])
+    figures["salary_employment_mode"] = px.scatter(df_emp, x='Salary (k)', y='Employment Mode', color='Job Title', size_max=55)
+
+    figures["experience_level"] = px.histogram(df, x='Experience Level', color='Job Title', barmode='group')
+
+    # --- Geospatial Visualization ---
+    country_counts = df['country'].dropna().value_counts().reset_index()
+    country_counts.columns = ['country', 'job_count']
+    try:
+        geo_fig = px.choropleth(country_counts, locations='country', locationmode='country names',
+                                color='job_count', color_continuous_scale='Plasma',
+                                title='Jobs per Country (Approximate)')
+        geo_fig.update_geos(projection_type="natural earth")
+        geo_fig.update_layout(margin={"r": 0, "t": 0, "l": 0, "b": 0})
+        geo_fig.update_geos(showcoastlines=True, coastlinecolor="Black")
+        figures["jobs_per_country"] = geo_fig
+    except Exception as e:
+        errors["jobs_per_country"] = str(e)
+
+    return {"overview": overview_df, "figures": figures, "images": images, "errors": errors}
+
+
+def _save_artifacts(version: str, artifacts: dict):
+    """Write artifacts to a temp dir and rename it into place so readers never see partial output."""
+    os.makedirs(VIZ_CACHE_DIR, exist_ok=True)
+    target_dir = os.path.join(VIZ_CACHE_DIR, version)
+    if os.path.isdir(target_dir):
+        return
+
+    staging_dir = tempfile.mkdtemp(prefix=".staging-", dir=VIZ_CACHE_DIR)
+    try:
+        artifacts["overview"].to_parquet(os.path.join(staging_dir, OVERVIEW_FILENAME), index=False)
+        with open(os.path.join(staging_dir, FIGURES_FILENAME), "w", encoding="utf-8") as f:
+            json.dump({name: fig.to_json() for name, fig in artifacts["figures"].items()}, f)
+        for name, png_bytes in artifacts["images"].items():
+            with open(os.path.join(staging_dir, f"{name}.png"), "wb") as f:
+                f.write(png_bytes)
+        with open(os.path.join(staging_dir, META_FILENAME), "w", encoding="utf-8") as f:
+            json.dump({"images": list(artifacts["images"]), "errors": artifacts["errors"]}, f)
+        os.rename(staging_dir, target_dir)
+    except (OSError, ImportError) as e:
+        # Another process may have published the same version first (that copy is equivalent), or
+        # pandas has no Parquet engine: without a cache the artifacts are just recomputed.
+        print(f"Visualization cache for version {version} not written: {e}")
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    _prune_old_versions(keep=version)
+
+
+def _prune_old_versions(keep: str):
+    entries = [
+        os.path.join(VIZ_CACHE_DIR, name) for name in os.listdir(VIZ_CACHE_DIR)
+        if not name.startswith(".") and name != keep
+    ]
+    entries.sort(key=os.path.getmtime, reverse=True)
+    for stale_dir in entries[max(VIZ_CACHE_KEEP_VERSIONS - 1, 0):]:
+        shutil.rmtree(stale_dir, ignore_errors=True)
+
+
+def _load_artifacts(version: str) -> dict | None:
+    version_dir = os.path.join(VIZ_CACHE_DIR, version)
+    if not os.path.isdir(version_dir):
+        return None
+
+    try:
+        with open(os.path.join(version_dir, META_FILENAME), encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(os.path.join(version_dir, FIGURES_FILENAME), encoding="utf-8") as f:
+            figure_specs = json.load(f)
+        images = {}
+        for name in meta["images"]:
+            with open(os.path.join(version_dir, f"{name}.png"), "rb") as f:
+                images[name] = f.read()
+        return {
+            "overview": pd.read_parquet(os.path.join(version_dir, OVERVIEW_FILENAME)),
+            "figures": {name: pio.from_json(spec, skip_invalid=True) for name, spec in figure_specs.items()},
+            "images": images,
+            "errors": meta.get("errors", {}),
+        }
+    except Exception as e:
+        print(f"Error loading cached visualization artifacts for version {version}: {e}")
+        return None
+
+
+def get_visualization_artifacts() -> dict | None:
+    """
+    Return the Data Visualization page artifacts for the current jobs dataset.
+    Served from memory, then disk, and rebuilt only when the jobs dataset version changes.
+    Returns None when there are no jobs.
+    """
+    version = get_jobs_version()
+    if version:
+        if version in _memory_cache:
+            return _memory_cache[version]
+        artifacts = _load_artifacts(version)
+        if artifacts is not None:
+            _memory_cache.clear()
+            _memory_cache[version] = artifacts
+            return artifacts
+
+    df = load_jobs()
+    if df.empty:
+        return None
+
+    version = version or _dataset_hash(df)
+    if version in _memory_cache:
+        return _memory_cache[version]
+
+    print(f"Building visualization artifacts for jobs version {version}...")
+    artifacts = build_visualization_artifacts(df)
+    _save_artifacts(version, artifacts)
+    _memory_cache.clear()
+    _memory_cache[version] = artifacts
+    return artifacts
@@ -12,7 +12,14 @@ CREATE TABLE IF NOT EXISTS public.jobs (
     "Industry" TEXT,
     "Posted Date" DATE, -- Stores only the date, e.g., YYYY-MM-DD
     "Employment Mode" TEXT, -- e.g., Remote, On-site, Hybrid
-    created_at TIMESTAMPTZ DEFAULT now() NOT NULL -- Timestamp of when the record was created
+    created_at TIMESTAMPTZ DEFAULT now() NOT NULL, -- Timestamp of when the record was created
+    updated_at TIMESTAMPTZ DEFAULT now() NOT NULL, -- Timestamp of the last change, maintained by trigger
+    -- Typed columns derived from the text fields at ingest (services/job_normalizer.py)
+    salary_min NUMERIC, -- Lower bound of "Salary Range" in currency units, NULL if unparseable
+    salary_max NUMERIC, -- Upper bound of "Salary Range" in currency units, NULL if unparseable
+    country TEXT, -- Last comma-separated component of "Location"
+    experience_min_years INTEGER, -- Minimum years implied by "Experience Level"
+    skills TEXT[] -- Lowercase, de-duplicated entries of "Skills Required"
 );
 
 COMMENT ON TABLE public.jobs IS 'Stores job postings for the AI Resume Screening System.';
@@ -21,13 +28,98 @@ COMMENT ON COLUMN public.jobs."Job Title" IS 'The title of the job position.';
 COMMENT ON COLUMN public.jobs."Skills Required" IS 'Comma-separated list of skills required for the job.';
 COMMENT ON COLUMN public.jobs."Posted Date" IS 'The date when the job was posted.';
 COMMENT ON COLUMN public.jobs.created_at IS 'Timestamp of when the job record was created in the database.';
+COMMENT ON COLUMN public.jobs.updated_at IS 'Timestamp of the last change to the job record; together with the row count it versions the jobs dataset.';
+
+COMMENT ON COLUMN public.jobs.salary_min IS 'Parsed lower salary bound; derived from "Salary Range" on insert/update.';
+COMMENT ON COLUMN public.jobs.skills IS 'Parsed lowercase skills; derived from "Skills Required" on insert/update.';
+
+-- Migration for existing installs: add the columns if the table predates them.
+-- Populate the typed columns afterwards with: python upload_jobs_to_supabase.py --backfill-normalized
+ALTER TABLE public.jobs ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT now() NOT NULL;
+ALTER TABLE public.jobs ADD COLUMN IF NOT EXISTS salary_min NUMERIC;
+ALTER TABLE public.jobs ADD COLUMN IF NOT EXISTS salary_max NUMERIC;
+ALTER TABLE public.jobs ADD COLUMN IF NOT EXISTS country TEXT;
+ALTER TABLE public.jobs ADD COLUMN IF NOT EXISTS experience_min_years INTEGER;
+ALTER TABLE public.jobs ADD COLUMN IF NOT EXISTS skills TEXT[];
+
+CREATE OR REPLACE FUNCTION public.set_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS jobs_set_updated_at ON public.jobs;
+CREATE TRIGGER jobs_set_updated_at
+    BEFORE UPDATE ON public.jobs
+    FOR EACH ROW EXECUTE FUNCTION public.set_updated_at();
+
+CREATE INDEX IF NOT EXISTS jobs_updated_at_idx ON public.jobs (updated_at DESC);
+
+-- GIN index over the normalized skills array: serves `skills && ...` (any) and `skills @> ...` (all)
+CREATE INDEX IF NOT EXISTS jobs_skills_gin_idx ON public.jobs USING GIN (skills);
+
+-- Distinct skills across all jobs (used for resume skill extraction)
+CREATE OR REPLACE FUNCTION public.distinct_job_skills()
+RETURNS SETOF TEXT
+LANGUAGE sql STABLE AS $$
+    SELECT DISTINCT unnest(skills) FROM public.jobs;
+$$;
+
+-- Number of jobs requiring each skill, most frequent first
+CREATE OR REPLACE FUNCTION public.job_skill_frequencies(p_limit INTEGER DEFAULT NULL)
+RETURNS TABLE (skill TEXT, job_count BIGINT)
+LANGUAGE sql STABLE AS $$
+    SELECT s AS skill, count(*) AS job_count
+    FROM public.jobs, unnest(skills) AS s
+    GROUP BY s
+    ORDER BY job_count DESC, skill
+    LIMIT p_limit;
+$$;
+
+-- Candidate jobs for a set of (lowercase) resume skills. The overlap filter uses the GIN index;
+-- rows are ranked by the share of the job's required skills covered, as in the rule-based matcher.
+CREATE OR REPLACE FUNCTION public.rank_jobs_by_skills(p_skills TEXT[], p_limit INTEGER DEFAULT 50)
+RETURNS SETOF JSONB
+LANGUAGE sql STABLE AS $$
+    SELECT to_jsonb(ranked.*) FROM (
+        SELECT j.*,
+               m.matched_skills_count,
+               m.matched_skills_count::NUMERIC / cardinality(j.skills) AS skill_match_ratio
+        FROM public.jobs j
+        CROSS JOIN LATERAL (
+            SELECT count(*)::INTEGER AS matched_skills_count FROM unnest(j.skills) AS s WHERE s = ANY (p_skills)
+        ) m
+        WHERE j.skills && p_skills
+        ORDER BY skill_match_ratio DESC, m.matched_skills_count DESC, j.id
+        LIMIT p_limit
+    ) ranked;
+$$;
 
 
 -- ========= PREDICTION HISTORY TABLE =========
+-- Range-partitioned by calendar month (UTC) on "timestamp", so date-bounded dashboard queries
+-- only touch the partitions they need and old months can be archived and detached whole
+-- (python -m services.history_retention). Rows outside every monthly partition land in the
+-- default partition until ensure_prediction_history_partitions() moves them to their month.
+
+-- Migration for existing installs: an unpartitioned prediction_history is renamed out of the
+-- way here; its rows are copied into the partitioned table further down and it is dropped.
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+               WHERE n.nspname = 'public' AND c.relname = 'prediction_history' AND c.relkind = 'r') THEN
+        ALTER TABLE public.prediction_history RENAME TO prediction_history_unpartitioned;
+        ALTER INDEX IF EXISTS public.prediction_history_pkey RENAME TO prediction_history_unpartitioned_pkey;
+    END IF;
+END $$;
+
+CREATE SEQUENCE IF NOT EXISTS public.prediction_history_row_id_seq AS BIGINT;
 
 CREATE TABLE IF NOT EXISTS public.prediction_history (
-    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
-    timestamp TIMESTAMPTZ NOT NULL, -- Timestamp of when the prediction was made
+    id BIGINT DEFAULT nextval('public.prediction_history_row_id_seq') NOT NULL,
+    timestamp TIMESTAMPTZ NOT NULL, -- Timestamp of when the prediction was made (partition key)
     resume_name TEXT, -- Filename or identifier of the resume
     job_title TEXT, -- Title of the job against which the resume was matched
     model_used TEXT NOT NULL, -- Name of the AI model used for the prediction
@@ -37,9 +129,200 @@ CREATE TABLE IF NOT EXISTS public.prediction_history (
     missing_skills_count INTEGER,
     missing_skills_list TEXT, -- Comma-separated list of missing skills
     suggestions TEXT, -- Suggestions provided by the model (especially Gemini)
-    created_at TIMESTAMPTZ DEFAULT now() NOT NULL -- Timestamp of when the record was created
-);
+    created_at TIMESTAMPTZ DEFAULT now() NOT NULL, -- Timestamp of when the record was created
+    PRIMARY KEY (id, timestamp) -- A partitioned table's primary key must include the partition key
+) PARTITION BY RANGE (timestamp);
 
-COMMENT ON TABLE public.prediction_history IS 'Logs the results of resume-to-job matching predictions.';
+ALTER SEQUENCE public.prediction_history_row_id_seq OWNED BY public.prediction_history.id;
+
+CREATE TABLE IF NOT EXISTS public.prediction_history_default PARTITION OF public.prediction_history DEFAULT;
+
+COMMENT ON TABLE public.prediction_history IS 'Logs the results of resume-to-job matching predictions. Partitioned by month on timestamp.';
 COMMENT ON COLUMN public.prediction_history.model_used IS 'The AI model used for the analysis (e.g., Gemini Pro, LSTM, Transformer).';
 COMMENT ON COLUMN public.prediction_history.match_score IS 'The overall calculated match score percentage.';
+
+-- Dashboard access patterns: a date range, optionally narrowed to one model and/or one job title,
+-- newest first. Created on the parent, so every partition gets them.
+CREATE INDEX IF NOT EXISTS prediction_history_timestamp_idx ON public.prediction_history (timestamp DESC);
+CREATE INDEX IF NOT EXISTS prediction_history_model_timestamp_idx ON public.prediction_history (model_used, timestamp DESC);
+CREATE INDEX IF NOT EXISTS prediction_history_job_timestamp_idx ON public.prediction_history (job_title, timestamp DESC);
+
+-- Creates the partition for p_month's calendar month (UTC) if it is missing. Rows of that month
+-- already sitting in the default partition are moved into it. Returns TRUE if it was created.
+CREATE OR REPLACE FUNCTION public.create_prediction_history_partition(p_month DATE)
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    month_start DATE := date_trunc('month', p_month)::DATE;
+    partition_name TEXT := 'prediction_history_' || to_char(date_trunc('month', p_month), 'YYYY_MM');
+    range_start TIMESTAMPTZ := date_trunc('month', p_month)::TIMESTAMP AT TIME ZONE 'UTC';
+    range_end TIMESTAMPTZ := (date_trunc('month', p_month) + INTERVAL '1 month')::TIMESTAMP AT TIME ZONE 'UTC';
+BEGIN
+    IF to_regclass('public.' || partition_name) IS NOT NULL THEN
+        RETURN FALSE;
+    END IF;
+    -- Build the partition standalone, move its rows out of the default partition, then attach
+    EXECUTE format('CREATE TABLE public.%I (LIKE public.prediction_history INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition_name);
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM public.prediction_history_default WHERE "timestamp" >= %L AND "timestamp" < %L RETURNING *) '
+        'INSERT INTO public.%I SELECT * FROM moved', range_start, range_end, partition_name);
+    EXECUTE format('ALTER TABLE public.prediction_history ATTACH PARTITION public.%I FOR VALUES FROM (%L) TO (%L)',
+                   partition_name, range_start, range_end);
+    RETURN TRUE;
+END;
+$$;
+
+-- Creates the monthly partitions from p_from's month through p_months_ahead months after the
+-- current one, plus one for every month that has rows in the default partition.
+-- Run it monthly (the retention job does), e.g. with pg_cron:
+--   SELECT cron.schedule('prediction-history-partitions', '0 0 1 * *', 'SELECT public.ensure_prediction_history_partitions()');
+CREATE OR REPLACE FUNCTION public.ensure_prediction_history_partitions(
+    p_from DATE DEFAULT (now() AT TIME ZONE 'UTC')::DATE,
+    p_months_ahead INTEGER DEFAULT 3
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    month_start DATE;
+    created INTEGER := 0;
+BEGIN
+    FOR month_start IN
+        SELECT generate_series(date_trunc('month', p_from),
+                               date_trunc('month', now() AT TIME ZONE 'UTC') + make_interval(months => p_months_ahead),
+                               INTERVAL '1 month')::DATE
+        UNION
+        SELECT DISTINCT date_trunc('month', "timestamp" AT TIME ZONE 'UTC')::DATE FROM public.prediction_history_default
+    LOOP
+        IF public.create_prediction_history_partition(month_start) THEN
+            created := created + 1;
+        END IF;
+    END LOOP;
+    RETURN created;
+END;
+$$;
+
+-- Monthly partitions with their UTC bounds and row counts, oldest first (used by the retention job)
+CREATE OR REPLACE FUNCTION public.prediction_history_partitions()
+RETURNS TABLE (partition_name TEXT, range_start TIMESTAMPTZ, range_end TIMESTAMPTZ, row_count BIGINT)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    FOR partition_name IN
+        SELECT c.relname::TEXT
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'public.prediction_history'::REGCLASS
+          AND c.relname ~ '^prediction_history_[0-9]{4}_[0-9]{2}$'
+        ORDER BY c.relname
+    LOOP
+        range_start := to_date(right(partition_name, 7), 'YYYY_MM')::TIMESTAMP AT TIME ZONE 'UTC';
+        range_end := (to_date(right(partition_name, 7), 'YYYY_MM') + INTERVAL '1 month')::TIMESTAMP AT TIME ZONE 'UTC';
+        EXECUTE format('SELECT count(*) FROM public.%I', partition_name) INTO row_count;
+        RETURN NEXT;
+    END LOOP;
+END;
+$$;
+
+-- Detaches a monthly partition once its archive is confirmed complete: p_expected_rows must equal
+-- the partition's row count, so rows inserted after the archive was written are never lost.
+-- With p_drop the detached table is dropped as well, freeing its storage.
+CREATE OR REPLACE FUNCTION public.detach_prediction_history_partition(
+    p_partition_name TEXT,
+    p_expected_rows BIGINT,
+    p_drop BOOLEAN DEFAULT TRUE
+)
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    actual_rows BIGINT;
+BEGIN
+    IF p_partition_name !~ '^prediction_history_[0-9]{4}_[0-9]{2}$' OR NOT EXISTS (
+        SELECT 1 FROM pg_inherits
+        WHERE inhparent = 'public.prediction_history'::REGCLASS
+          AND inhrelid = to_regclass('public.' || p_partition_name)
+    ) THEN
+        RAISE EXCEPTION 'Not an attached prediction_history monthly partition: %', p_partition_name;
+    END IF;
+
+    -- Lock against concurrent inserts so the count cannot change between the check and the detach
+    EXECUTE format('LOCK TABLE public.%I IN SHARE MODE', p_partition_name);
+    EXECUTE format('SELECT count(*) FROM public.%I', p_partition_name) INTO actual_rows;
+    IF actual_rows <> p_expected_rows THEN
+        RETURN FALSE;
+    END IF;
+
+    EXECUTE format('ALTER TABLE public.prediction_history DETACH PARTITION public.%I', p_partition_name);
+    IF p_drop THEN
+        EXECUTE format('DROP TABLE public.%I', p_partition_name);
+    END IF;
+    RETURN TRUE;
+END;
+$$;
+
+-- Partition management changes the schema: callable by the service role only, not by API clients
+REVOKE ALL ON FUNCTION public.create_prediction_history_partition(DATE) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.ensure_prediction_history_partitions(DATE, INTEGER) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.prediction_history_partitions() FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.detach_prediction_history_partition(TEXT, BIGINT, BOOLEAN) FROM PUBLIC;
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+        GRANT EXECUTE ON FUNCTION public.create_prediction_history_partition(DATE) TO service_role;
+        GRANT EXECUTE ON FUNCTION public.ensure_prediction_history_partitions(DATE, INTEGER) TO service_role;
+        GRANT EXECUTE ON FUNCTION public.prediction_history_partitions() TO service_role;
+        GRANT EXECUTE ON FUNCTION public.detach_prediction_history_partition(TEXT, BIGINT, BOOLEAN) TO service_role;
+    END IF;
+END $$;
+
+-- Migration for existing installs (continued): create partitions back to the oldest row, copy the
+-- old rows over, move the id sequence past them and drop the unpartitioned table.
+DO $$
+DECLARE
+    first_month DATE;
+BEGIN
+    IF to_regclass('public.prediction_history_unpartitioned') IS NOT NULL THEN
+        SELECT (min("timestamp") AT TIME ZONE 'UTC')::DATE INTO first_month FROM public.prediction_history_unpartitioned;
+        PERFORM public.ensure_prediction_history_partitions(COALESCE(first_month, (now() AT TIME ZONE 'UTC')::DATE));
+        INSERT INTO public.prediction_history (id, "timestamp", resume_name, job_title, model_used, match_score,
+                                               skill_match_score, experience_match_score, missing_skills_count,
+                                               missing_skills_list, suggestions, created_at)
+        SELECT id, "timestamp", resume_name, job_title, model_used, match_score,
+               skill_match_score, experience_match_score, missing_skills_count,
+               missing_skills_list, suggestions, created_at
+        FROM public.prediction_history_unpartitioned;
+        PERFORM setval('public.prediction_history_row_id_seq',
+                       GREATEST(COALESCE((SELECT max(id) FROM public.prediction_history), 0), 1));
+        DROP TABLE public.prediction_history_unpartitioned;
+    END IF;
+END $$;
+
+SELECT public.ensure_prediction_history_partitions();
+
+
+-- ========= MISSING SKILL SKETCHES TABLE =========
+-- One Space-Saving heavy-hitters sketch per (day, model). Updated whenever a prediction is
+-- recorded and merged over any date range by the dashboard's "Top Missing Skills" panel,
+-- so that panel no longer scans the whole prediction history.
+
+CREATE TABLE IF NOT EXISTS public.missing_skill_sketches (
+    day DATE NOT NULL, -- Local date of the predictions summarised by this sketch
+    model_used TEXT NOT NULL, -- Name of the AI model used for the predictions
+    sketch JSONB NOT NULL, -- {"capacity": int, "total": int, "counters": {skill: [count, error]}}
+    version INTEGER DEFAULT 1 NOT NULL, -- Optimistic concurrency token, bumped on every update
+    updated_at TIMESTAMPTZ DEFAULT now() NOT NULL,
+    PRIMARY KEY (day, model_used)
+);
+
+COMMENT ON TABLE public.missing_skill_sketches IS 'Per-day, per-model Space-Saving sketches of missing skills for top-k queries.';
+COMMENT ON COLUMN public.missing_skill_sketches.sketch IS 'Serialized Space-Saving sketch; counts are upper bounds, count - error is a lower bound.';
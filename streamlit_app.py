@@ -1,7 +1,6 @@
+import importlib
 import streamlit as st
 from ui.theme import apply_custom_theme
-from hide_sidebar.pages import hr_page, applicant_page, dashboard,data_visualization_page
-import app
 from config.constants import HOME, HR_PORTAL, APPLICANT_PORTAL, DASHBOARD,DATA_VISUALIZATION ,SYSTEM_THEME, LIGHT_THEME, DARK_THEME
 
 
@@ -43,12 +42,14 @@ else:
 #     "📊 Dashboard": dashboard
 # }
 
+# Page registry: each page module is imported only when it is first selected,
+# so a cold start does not pay for the dependencies of pages nobody opened.
 PAGES = {
-    HOME: app,
-    HR_PORTAL: hr_page,
-    APPLICANT_PORTAL: applicant_page,
-    DASHBOARD: dashboard,
-    DATA_VISUALIZATION: data_visualization_page
+    HOME: "app",
+    HR_PORTAL: "hide_sidebar.pages.hr_page",
+    APPLICANT_PORTAL: "hide_sidebar.pages.applicant_page",
+    DASHBOARD: "hide_sidebar.pages.dashboard",
+    DATA_VISUALIZATION: "hide_sidebar.pages.data_visualization_page"
 }
     
 # selected_page = st.sidebar.selectbox("Navigation", options=list(PAGES.keys()))
@@ -63,5 +64,4 @@ selected_page = st.sidebar.selectbox(
 
 # This allows programmatic navigation too
 st.session_state.selected_page = selected_page
-PAGES[selected_page].run()
-
+importlib.import_module(PAGES[selected_page]).run()
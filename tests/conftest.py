@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The modules under test are imported from the repository root, as the app runs them
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,19 @@
+import pandas as pd
+
+from services.job_normalizer import parse_salary_range, parse_experience_min_years, experience_min_years_from_record
+
+LEVELS = ["Entry", "Mid", "Senior", "Mid (3-5 years)", "Senior, 8+ years", "3+ years", "2-4 yrs", "Lead", "", None]
+
+
+def test_experience_keywords_win_over_explicit_years():
+    expected = [0, 2, 5, 2, 5, 3, 2, 0, 0, 0]
+    assert parse_experience_min_years(pd.Series(LEVELS)).tolist() == expected
+    assert [experience_min_years_from_record({"Experience Level": level}) for level in LEVELS] == expected
+
+
+def test_salary_units_need_salary_context():
+    salaries = pd.Series(["$84k - $96k", "60-80k", "$1.2M", "USD 80k", "90000", "401k match", "Competitive + 401k", None])
+    parsed = parse_salary_range(salaries)
+    assert parsed["salary_min"].tolist()[:5] == [84000, 60000, 1200000, 80000, 90000]
+    assert parsed["salary_max"].tolist()[:5] == [96000, 80000, 1200000, 80000, 90000]
+    assert parsed.iloc[5:].isna().all().all()
@@ -0,0 +1,63 @@
+import random
+
+import numpy as np
+import pytest
+
+from models.lstm_tokenizer import FastLSTMTokenizer
+
+TEXTS = [
+    "Senior Python developer; 5+ years of SQL & ML (TensorFlow/Keras).",
+    "Café-owner, naïve résumé: ÜBER skills!!",
+    "",
+    "   multiple   spaces\tand\nnewlines ",
+    "unknown words only zzz qqq",
+    "python python python " * 50,
+]
+
+
+def _keras_text_module():
+    # TensorFlow's Keras 2 preprocessing, or the standalone keras-preprocessing package
+    try:
+        from tensorflow.keras.preprocessing import text
+        return text
+    except ImportError:
+        return pytest.importorskip("keras_preprocessing.text")
+
+
+def _random_texts(rng, vocabulary, count):
+    words = vocabulary + ["oov1", "oov2", "Ünïcode", "x-y", "a.b"]
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(0, 40))) for _ in range(count)]
+
+
+@pytest.mark.parametrize("num_words,oov_token", [(None, None), (20, None), (None, "<OOV>"), (20, "<OOV>")])
+def test_texts_to_sequences_matches_keras(num_words, oov_token):
+    keras_tokenizer = _keras_text_module().Tokenizer(num_words=num_words, oov_token=oov_token)
+    keras_tokenizer.fit_on_texts(TEXTS)
+    fast = FastLSTMTokenizer.from_json(keras_tokenizer.to_json())
+
+    rng = random.Random(5)
+    texts = TEXTS + _random_texts(rng, list(keras_tokenizer.word_index), 50)
+    assert fast.texts_to_sequences(texts) == keras_tokenizer.texts_to_sequences(texts)
+
+
+@pytest.mark.parametrize("padding", ["pre", "post"])
+@pytest.mark.parametrize("truncating", ["pre", "post"])
+def test_texts_to_padded_pads_texts_to_sequences(padding, truncating):
+    word_index = {word: index for index, word in enumerate(["<OOV>", "python", "sql", "years", "senior", "ml"], 1)}
+    tokenizer = FastLSTMTokenizer(word_index, num_words=5, oov_token="<OOV>")
+    texts = TEXTS + _random_texts(random.Random(9), list(word_index), 30)
+    maxlen = 8
+
+    expected = np.zeros((len(texts), maxlen), dtype=np.int32)
+    for row, sequence in enumerate(tokenizer.texts_to_sequences(texts)):
+        sequence = sequence[-maxlen:] if truncating == "pre" else sequence[:maxlen]
+        if sequence:
+            if padding == "pre":
+                expected[row, maxlen - len(sequence):] = sequence
+            else:
+                expected[row, :len(sequence)] = sequence
+
+    out = np.full((len(texts) + 2, maxlen), 99, dtype=np.int32)
+    tokenizer.texts_to_padded(texts, maxlen, padding=padding, truncating=truncating, out=out)
+    assert np.array_equal(out[:len(texts)], expected)
+    assert np.array_equal(tokenizer.texts_to_padded(texts, maxlen, padding=padding, truncating=truncating), expected)
@@ -0,0 +1,52 @@
+import random
+
+from services.minhash import MinHashLSH, estimated_similarity, minhash_signature, shingles
+
+WORDS = [f"word{n}" for n in range(400)]
+
+
+def _text(rng, length=200):
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def _jaccard(a, b, size):
+    shingles_a, shingles_b = shingles(a, size), shingles(b, size)
+    return len(shingles_a & shingles_b) / len(shingles_a | shingles_b)
+
+
+def test_signature_is_deterministic_and_case_insensitive():
+    assert minhash_signature("Senior Python Developer with SQL") == minhash_signature("senior python developer, with sql")
+    assert minhash_signature("") is None
+    assert minhash_signature("   ") is None
+
+
+def test_estimated_similarity_tracks_jaccard():
+    rng = random.Random(1)
+    base = _text(rng).split()
+    for edits in (0, 5, 20, 60):
+        edited = list(base)
+        for position in rng.sample(range(len(edited)), edits):
+            edited[position] = rng.choice(WORDS)
+        a, b = " ".join(base), " ".join(edited)
+        estimate = estimated_similarity(minhash_signature(a, 3), minhash_signature(b, 3))
+        assert abs(estimate - _jaccard(a, b, 3)) < 0.15
+
+
+def test_lsh_finds_near_duplicates_only():
+    rng = random.Random(2)
+    texts = {key: _text(rng) for key in range(50)}
+    lsh = MinHashLSH(bands=32)
+    for key, text in texts.items():
+        lsh.add(key, minhash_signature(text, 3))
+    assert len(lsh) == 50
+
+    words = texts[7].split()
+    words[100] = "changed"
+    matches = lsh.near_duplicates(minhash_signature(" ".join(words), 3), 0.75)
+    assert [key for key, _ in matches] == [7]
+    assert lsh.near_duplicates(minhash_signature(_text(rng), 3), 0.75) == []
+
+    lsh.remove(7)
+    assert lsh.near_duplicates(minhash_signature(texts[7], 3), 0.75) == []
+    assert len(lsh) == 49
+    assert all(keys for bucket in lsh.buckets for keys in bucket.values())
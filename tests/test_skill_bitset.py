@@ -0,0 +1,56 @@
+import random
+
+from services.matcher import _fallback_result
+from services.skill_bitset import JobSkillIndex, get_job_skill_index
+from services.job_normalizer import skills_from_record, experience_min_years_from_record
+
+# More skills than one 64-bit word, so multi-word masks are exercised
+SKILLS = [f"Skill {n}" for n in range(150)] + ["Python", "SQL", "Machine Learning"]
+LEVELS = ["Entry Level", "Mid Level", "Senior Level", "3+ years", "2-4 years", "", None]
+
+
+def _jobs(count, rng):
+    jobs = []
+    for job_id in range(count):
+        skills = rng.sample(SKILLS, rng.randint(0, 8))
+        jobs.append({"id": job_id, "Skills Required": ", ".join(skills), "Experience Level": rng.choice(LEVELS)})
+    return jobs
+
+
+def _resumes(count, rng):
+    return [{"skills": [s.upper() if rng.random() < 0.3 else s for s in rng.sample(SKILLS, rng.randint(0, 20))],
+             "years_experience": rng.randint(0, 10)} for _ in range(count)]
+
+
+def test_match_results_equal_fallback_result():
+    rng = random.Random(7)
+    jobs = _jobs(300, rng)
+    index = JobSkillIndex(jobs)
+    for resume in _resumes(25, rng):
+        resume_skills = set(s.lower() for s in resume["skills"])
+        for job, result in zip(jobs, index.match_results(resume)):
+            expected = _fallback_result(resume_skills, set(skills_from_record(job)),
+                                        resume["years_experience"], experience_min_years_from_record(job))
+            for key in ("match_score", "skill_match", "experience_match", "suggestions"):
+                assert result[key] == expected[key]
+            assert sorted(result["missing_skills"]) == sorted(expected["missing_skills"])
+            assert sorted(result["matched_skills"]) == sorted(expected["matched_skills"])
+
+
+def test_match_results_for_selected_indices():
+    rng = random.Random(11)
+    jobs = _jobs(50, rng)
+    index = JobSkillIndex(jobs)
+    resume = _resumes(1, rng)[0]
+    everything = index.match_results(resume)
+    assert index.match_results(resume, [40, 3], index.score(resume)) == [everything[40], everything[3]]
+
+
+def test_cached_index_is_keyed_on_job_ids():
+    rng = random.Random(3)
+    first, second = _jobs(20, rng), _jobs(20, rng)
+    for job in second:
+        job["id"] += 100
+    assert get_job_skill_index(first, version="v1") is get_job_skill_index(first, version="v1")
+    index = get_job_skill_index(second, version="v1")
+    assert index.job_skill_sets == [set(skills_from_record(job)) for job in second]
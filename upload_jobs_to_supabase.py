@@ -1,16 +1,22 @@
 # scripts/upload_jobs_to_supabase.py
+import sys
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
 import time
 
+from services.job_normalizer import normalized_records
+from services.minhash import MinHashLSH, minhash_signature
+from config.constants import JOB_NEAR_DUPLICATE_THRESHOLD, JOB_MINHASH_SHINGLE_WORDS, JOB_MINHASH_BANDS
+
 try:
-    from config.supabase_config import supabase_client, JOBS_TABLE_NAME 
+    from config.supabase_config import get_supabase_client, JOBS_TABLE_NAME 
 except ImportError:
     print("Error: Could not import Supabase configuration. \n"
           "Ensure 'config.supabase_config' is accessible and SUPABASE_URL/KEY are set in .env.\n"
           "This script should ideally be run from the project root directory.")
-    supabase_client = None # Ensure it's None if import fails
+    def get_supabase_client(): # Ensure the client is None if import fails
+        return None
     JOBS_TABLE_NAME = "jobs" # Default
 
 
@@ -60,8 +66,47 @@ def format_job_for_supabase(job_row_dict):
             
     return formatted_job
 
-def upload_csv_to_supabase():
-    """Reads the job_dataset.csv and uploads its content to the Supabase 'jobs' table."""
+# Fields compared for near-duplicate postings: the same job re-posted with small edits
+DUPLICATE_CHECK_FIELDS = ["Job Title", "Company Name", "Location", "Job Description", "Skills Required"]
+
+def _job_duplicate_text(job_dict):
+    return "\n".join(str(job_dict.get(field)) for field in DUPLICATE_CHECK_FIELDS
+                     if isinstance(job_dict.get(field), str))
+
+def find_duplicate_jobs(df, existing_jobs, threshold=JOB_NEAR_DUPLICATE_THRESHOLD):
+    """
+    Near-duplicate postings in `df` (MinHash/LSH over title, company, location, description and
+    skills), compared with the `existing_jobs` (job dicts) and with earlier rows of the file.
+    Returns {row index: (duplicate_of, similarity)}, where duplicate_of is ("job", job id) or ("row", row index).
+    """
+    lsh = MinHashLSH(JOB_MINHASH_BANDS)
+    for job in existing_jobs:
+        signature = minhash_signature(_job_duplicate_text(job), JOB_MINHASH_SHINGLE_WORDS)
+        if signature is not None and job.get("id") is not None:
+            lsh.add(("job", job["id"]), signature)
+
+    duplicates = {}
+    for index, row in df.iterrows():
+        signature = minhash_signature(_job_duplicate_text(row.to_dict()), JOB_MINHASH_SHINGLE_WORDS)
+        if signature is None:
+            continue
+        matches = lsh.near_duplicates(signature, threshold)
+        if matches:
+            duplicates[index] = matches[0]
+        else:
+            lsh.add(("row", index), signature)
+    return duplicates
+
+def describe_duplicate(duplicate_of):
+    kind, key = duplicate_of
+    return f"job ID {key}" if kind == "job" else f"CSV row {key + 1}"
+
+def upload_csv_to_supabase(keep_duplicates=False):
+    """
+    Reads the job_dataset.csv and uploads its content to the Supabase 'jobs' table.
+    Near-duplicates of existing jobs or of earlier rows are skipped, or only reported with `keep_duplicates`.
+    """
+    supabase_client = get_supabase_client()
     if not supabase_client:
         print("Supabase client is not initialized. Aborting upload.")
         return
@@ -80,11 +125,26 @@ def upload_csv_to_supabase():
     successful_uploads = 0
     failed_uploads = 0
 
+    from services.job_service import load_jobs
+    duplicates = find_duplicate_jobs(df, load_jobs().to_dict("records"))
+    print(f"Found {len(duplicates)} near-duplicate posting(s)"
+          f"{' (uploading them anyway)' if keep_duplicates else ', which will be skipped'}.")
+
     print(f"\nStarting upload to Supabase table: '{JOBS_TABLE_NAME}'...")
 
+    # Typed salary/country/experience/skills columns, derived for the whole file in one vectorized pass
+    normalized_rows = normalized_records(df)
+
     for index, row in df.iterrows():
+        if index in duplicates:
+            duplicate_of, similarity = duplicates[index]
+            print(f"  Row {index + 1} ('{row.get('Job Title', 'N/A Title')}') is a near-duplicate of "
+                  f"{describe_duplicate(duplicate_of)} ({similarity:.0%} similar).")
+            if not keep_duplicates:
+                continue
         job_data_dict = row.to_dict()
         formatted_job_data = format_job_for_supabase(job_data_dict)
+        formatted_job_data.update(normalized_rows[index])
         
         print(f"  Uploading job: {formatted_job_data.get('Job Title', 'N/A Title')}...")
         
@@ -112,17 +172,33 @@ def upload_csv_to_supabase():
         # A small delay to avoid overwhelming the database or hitting rate limits
         time.sleep(0.1) 
 
+    if successful_uploads > 0:
+        # Vectorize only the newly inserted jobs into the TF-IDF retrieval index
+        from services.retrieval_index import sync_index
+        print(f"Retrieval index synchronized: {sync_index()}")
+        from models.job_embeddings import has_job_embeddings, sync_job_embeddings
+        if has_job_embeddings():  # Bi-encoder mode set up: embed the new jobs too
+            print(f"Job embeddings synchronized: {sync_job_embeddings()}")
+
     print("\n--- Upload Summary ---")
     print(f"Successfully uploaded: {successful_uploads} jobs.")
     print(f"Failed uploads: {failed_uploads} jobs.")
+    if duplicates and not keep_duplicates:
+        print(f"Skipped near-duplicates: {len(duplicates)} jobs (run with --keep-duplicates to upload them).")
     if failed_uploads > 0:
         print("Please check the error messages above for details on failed uploads.")
 
 if __name__ == "__main__":
+    if "--backfill-normalized" in sys.argv:
+        # Derive the typed columns for rows inserted before they existed
+        from services.job_service import backfill_normalized_columns
+        backfill_normalized_columns()
+        sys.exit(0)
+
     print("This script will upload data from 'job_dataset.csv' to your Supabase 'jobs' table.")
     confirmation = input("Are you sure you want to proceed? This may duplicate data if run multiple times without care. (yes/no): ")
     if confirmation.lower() == 'yes':
-        upload_csv_to_supabase()
+        upload_csv_to_supabase(keep_duplicates="--keep-duplicates" in sys.argv)
     else:
         print("Upload cancelled by user.")
 